@@ -3,7 +3,17 @@ from dotenv import load_dotenv
 # .env 파일 로드 (가장 먼저 실행!)
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException
+import os
+import hmac
+import json
+import time
+import asyncio
+import uuid
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, Dict, List
@@ -11,16 +21,205 @@ import pandas as pd
 import numpy as np
 from crypto_simulator import (
     collect_historical_data,
+    get_bithumb_candles,
     generate_sample_data,
     add_technical_indicators,
-    find_optimal_buy_sell_signals,
+    calculate_uptrend_probability_series,
+    UPTREND_INDICATORS,
     CryptoBacktester,
-    create_chart_image
+    create_chart_image,
+    create_chart_png
 )
+from walk_forward import run_walk_forward, shutdown_executor as shutdown_walk_forward_executor
+from monte_carlo import run_robustness_simulation
+from portfolio import build_price_panel, run_portfolio_backtest
+from screener import MarketScreener
+from market_catalog import MarketCatalog, fetch_bithumb_markets, load_fixture_markets
+from candle_store import CandleStore, INTERVAL_SECONDS
+from compact_candles import CompactCandles
+from indicator_cache import IndicatorCache
+from multi_timeframe import load_timeframe_indicators, find_multi_timeframe_signals
+from http_scheduler import scheduler, request_priority, PRIORITY_BACKGROUND
+from telemetry import registry, span, ratio, HTTP_SECONDS
+from profiler import SamplingProfiler, ProfileStore, ProfiledIterator, profiled_to_thread
+from chart_store import ChartStore
+from compression import CompressionMiddleware
+from price_hub import PriceHub, Subscriber, fetch_bithumb_tickers
+from signal_alerts import SignalAlertEngine, AlertBroker, SignalAlertService
+from tick_aggregator import TickAggregator, TradeFeed, TradeRecorder, fetch_bithumb_trades, store_candles
 import trade_journal_db as db
 import upbit_proxy
 
-app = FastAPI(title="Crypto Backtest API", version="1.0.0")
+# 마켓 카탈로그 설정 (bithumb: 거래소 조회, fixture: 로컬 fixture 파일)
+MARKET_CATALOG_SOURCE = os.getenv('MARKET_CATALOG_SOURCE', 'bithumb')
+MARKET_CATALOG_CACHE = os.getenv('MARKET_CATALOG_CACHE', 'data/market_catalog.json')
+MARKET_CATALOG_TTL_SECONDS = int(os.getenv('MARKET_CATALOG_TTL_SECONDS', '3600'))
+
+market_catalog = MarketCatalog(
+    load_fixture_markets if MARKET_CATALOG_SOURCE == 'fixture' else fetch_bithumb_markets,
+    cache_path=MARKET_CATALOG_CACHE,
+    ttl_seconds=MARKET_CATALOG_TTL_SECONDS
+)
+
+# 캔들 저장소 설정 (1분봉만 거래소에서 받고 나머지 주기는 리샘플링)
+CANDLE_STORE_DIR = os.getenv('CANDLE_STORE_DIR', 'data/candles')
+MAX_BASE_CANDLES = int(os.getenv('MAX_BASE_CANDLES', '100000'))
+TIMEFRAME_WARMUP_CANDLES = int(os.getenv('TIMEFRAME_WARMUP_CANDLES', '60'))  # 멀티 타임프레임 확인 주기별 지표 워밍업 봉 수
+
+candle_store = CandleStore(collect_historical_data, base_interval='1m', directory=CANDLE_STORE_DIR,
+                           max_fetch=MAX_BASE_CANDLES)
+# 기준 주기별 공용 저장소 (1분봉 외 기준 주기는 처음 필요할 때 만들고, 같은 디렉토리의 주기별 하위 폴더에 저장)
+candle_stores = {candle_store.base_interval: candle_store}
+candle_stores_lock = threading.Lock()
+
+# 지표 캐시 설정 (메모리 LRU + 디스크 memmap)
+INDICATOR_CACHE_DIR = os.getenv('INDICATOR_CACHE_DIR', 'data/indicators')
+INDICATOR_CACHE_ENTRIES = int(os.getenv('INDICATOR_CACHE_ENTRIES', '64'))
+
+indicator_cache = IndicatorCache(max_entries=INDICATOR_CACHE_ENTRIES, directory=INDICATOR_CACHE_DIR or None)
+
+# 요청 프로파일링 설정 (ADMIN_TOKEN 이 없으면 프로파일링 / 프로파일 다운로드 비활성화)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'data/profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '50'))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+
+profile_store = ProfileStore(PROFILE_DIR, max_profiles=PROFILE_MAX_FILES)
+
+# 스트리밍 백테스트 차트 보관 설정 (차트 URL 유효 시간)
+CHART_STORE_ENTRIES = int(os.getenv('CHART_STORE_ENTRIES', '32'))
+CHART_STORE_TTL_SECONDS = int(os.getenv('CHART_STORE_TTL_SECONDS', '600'))
+
+chart_store = ChartStore(max_entries=CHART_STORE_ENTRIES, ttl_seconds=CHART_STORE_TTL_SECONDS)
+
+# 응답 압축 최소 크기 (바이트, 이보다 작은 응답은 그대로 보냄)
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+
+# 실시간 시세 허브 설정 (업스트림 수집 주기, 클라이언트당 최대 마켓 수, 느린 클라이언트 전송 제한 시간)
+PRICE_HUB_INTERVAL_SECONDS = float(os.getenv('PRICE_HUB_INTERVAL_SECONDS', '1'))
+PRICE_HUB_MAX_MARKETS = int(os.getenv('PRICE_HUB_MAX_MARKETS', '20'))
+PRICE_HUB_SEND_TIMEOUT_SECONDS = float(os.getenv('PRICE_HUB_SEND_TIMEOUT_SECONDS', '10'))
+
+price_hub = PriceHub(fetch_bithumb_tickers, interval=PRICE_HUB_INTERVAL_SECONDS)
+
+# 실시간 신호 알림 설정 (전체 KRW 마켓의 마감된 봉을 주기마다 조회, 기본 비활성화)
+ALERT_ENABLED = os.getenv('ALERT_ENABLED', 'false').lower() == 'true'
+ALERT_INTERVAL = os.getenv('ALERT_INTERVAL', '1h')
+ALERT_COOLDOWN_SECONDS = int(os.getenv('ALERT_COOLDOWN_SECONDS', '3600'))
+ALERT_WARMUP_CANDLES = int(os.getenv('ALERT_WARMUP_CANDLES', '200'))
+ALERT_QUEUE_SIZE = int(os.getenv('ALERT_QUEUE_SIZE', '100'))
+ALERT_HISTORY = int(os.getenv('ALERT_HISTORY', '500'))
+
+def fetch_alert_candles(market: str, count: int) -> Optional[pd.DataFrame]:
+    """알림용 최근 봉 (백그라운드 우선순위)"""
+    return run_in_background(get_bithumb_candles, market, count, None, ALERT_INTERVAL)
+
+alert_engine = SignalAlertEngine(ALERT_INTERVAL, cooldown_seconds=ALERT_COOLDOWN_SECONDS)
+alert_broker = AlertBroker(history=ALERT_HISTORY, queue_size=ALERT_QUEUE_SIZE)
+alert_service = SignalAlertService(alert_engine, alert_broker, fetch_alert_candles, warmup=ALERT_WARMUP_CANDLES)
+
+# 체결 → 캔들 집계 설정 (TICK_MARKETS 마켓의 체결로 봉을 직접 만들고 마감된 1분봉은 캔들 저장소에 기록, 비어 있으면 비활성화)
+TICK_MARKETS = [code.strip() for code in os.getenv('TICK_MARKETS', '').split(',') if code.strip()]
+TICK_INTERVALS = [interval.strip() for interval in os.getenv('TICK_INTERVALS', '1m,5m,15m,1h').split(',') if interval.strip()]
+TICK_RING_SIZE = int(os.getenv('TICK_RING_SIZE', '1440'))
+TICK_POLL_SECONDS = float(os.getenv('TICK_POLL_SECONDS', '1'))
+TICK_POLL_COUNT = int(os.getenv('TICK_POLL_COUNT', '200'))
+TICK_FLUSH_SECONDS = float(os.getenv('TICK_FLUSH_SECONDS', '60'))
+TICK_RECORD_PATH = os.getenv('TICK_RECORD_PATH', '')
+
+def fetch_tick_trades(market: str, count: int) -> List[Dict]:
+    """집계용 최근 체결 (백그라운드 우선순위)"""
+    return run_in_background(fetch_bithumb_trades, market, count)
+
+tick_aggregator = TickAggregator(TICK_INTERVALS, capacity=TICK_RING_SIZE, flush_interval=candle_store.base_interval)
+trade_feed = TradeFeed(tick_aggregator, fetch_tick_trades, count=TICK_POLL_COUNT,
+                       recorder=TradeRecorder(TICK_RECORD_PATH) if TICK_RECORD_PATH else None)
+
+# 스크리너 설정 (백그라운드 갱신 주기, 마켓별 캔들 수, 실제 API 사용 여부)
+SCREENER_REFRESH_SECONDS = int(os.getenv('SCREENER_REFRESH_SECONDS', '300'))
+SCREENER_LOOKBACK = int(os.getenv('SCREENER_LOOKBACK', '200'))
+SCREENER_USE_API = os.getenv('SCREENER_USE_API', 'false').lower() == 'true'
+
+def run_in_background(func, *args):
+    """거래소 요청을 백그라운드 우선순위로 실행 (사용자 요청이 먼저 처리됨)"""
+    with request_priority(PRIORITY_BACKGROUND):
+        return func(*args)
+
+async def market_catalog_refresh_loop():
+    """마켓 목록이 만료되면 백그라운드에서 갱신 (실패 시 1분 뒤 재시도)"""
+    while True:
+        remaining = market_catalog.fetched_at + market_catalog.ttl_seconds - time.time()
+        await asyncio.sleep(max(remaining, 0))
+        with span('market_catalog.refresh'):
+            refreshed = await asyncio.to_thread(run_in_background, market_catalog.refresh)
+        if not refreshed:
+            await asyncio.sleep(min(60, market_catalog.ttl_seconds))
+
+async def screener_refresh_loop():
+    """스크리너 표를 주기적으로 갱신 (계산은 스레드에서 실행)"""
+    while True:
+        try:
+            with span('screener.refresh'):
+                await asyncio.to_thread(run_in_background, screener.refresh, market_catalog.market_codes('KRW'))
+        except Exception as e:
+            print(f"스크리너 갱신 실패: {e}")
+        await asyncio.sleep(SCREENER_REFRESH_SECONDS)
+
+async def signal_alert_loop():
+    """봉이 마감될 때마다 전체 KRW 마켓의 신호를 확인해 알림 전송 (첫 조회는 지표 상태 채우기)"""
+    while True:
+        try:
+            with span('alerts.poll'):
+                await alert_service.poll(market_catalog.market_codes('KRW'))
+        except Exception as e:
+            print(f"신호 알림 갱신 실패: {e}")
+        await asyncio.sleep(alert_service.seconds_until_next_close())
+
+async def flush_tick_candles():
+    """체결로 만든 마감된 1분봉을 캔들 저장소에 기록 (저장된 봉과 사이가 비면 거래소에서 먼저 채움)"""
+    pending = tick_aggregator.take_pending()
+    if pending:
+        with span('ticks.flush'):
+            await asyncio.to_thread(run_in_background, store_candles, candle_store, pending)
+
+async def tick_feed_loop():
+    """TICK_MARKETS 체결을 TICK_POLL_SECONDS 마다 받아 봉으로 집계하고 TICK_FLUSH_SECONDS 마다 저장소에 기록"""
+    flushed_at = time.monotonic()
+    while True:
+        started = time.monotonic()
+        try:
+            with span('ticks.poll'):
+                await trade_feed.poll(TICK_MARKETS)
+            if started - flushed_at >= TICK_FLUSH_SECONDS:
+                flushed_at = started
+                await flush_tick_candles()
+        except Exception as e:
+            print(f"체결 집계 실패: {e}")
+        await asyncio.sleep(max(TICK_POLL_SECONDS - (time.monotonic() - started), 0))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """백그라운드 작업 시작 / 종료"""
+    await asyncio.to_thread(market_catalog.load)
+    tasks = [
+        asyncio.create_task(market_catalog_refresh_loop()),
+        asyncio.create_task(screener_refresh_loop())
+    ]
+    if ALERT_ENABLED:
+        tasks.append(asyncio.create_task(signal_alert_loop()))
+    if TICK_MARKETS:
+        tasks.append(asyncio.create_task(tick_feed_loop()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await price_hub.close()
+    await flush_tick_candles()
+    await asyncio.to_thread(indicator_cache.flush)
+    await asyncio.to_thread(shutdown_walk_forward_executor)
+    if trade_feed.recorder is not None:
+        trade_feed.recorder.close()
+
+app = FastAPI(title="Crypto Backtest API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정 - 모든 origin 허용
 app.add_middleware(
@@ -31,12 +230,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 응답은 Accept-Encoding 에 따라 brotli / gzip 압축
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
+@app.middleware('http')
+async def record_request_latency(request: Request, call_next):
+    """API 요청 처리 시간 기록 (경로 템플릿 기준, 매칭되지 않은 경로는 하나로 묶음)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get('route')
+        HTTP_SECONDS.observe(time.perf_counter() - started, method=request.method,
+                             route=getattr(route, 'path', 'unmatched'), status=status)
+
+def is_admin(request: Request) -> bool:
+    """X-Admin-Token 헤더가 ADMIN_TOKEN 과 같은지 (ADMIN_TOKEN 미설정 시 항상 False)"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+@app.middleware('http')
+async def profile_request(request: Request, call_next):
+    """
+    X-Profile: 1 헤더 또는 ?profile=1 이 있는 관리자 요청을 샘플링 프로파일러로 실행
+    결과는 PROFILE_DIR 에 저장하고 X-Profile-Id / Link 헤더로 다운로드 경로를 알려줌
+    """
+    flag = request.headers.get('X-Profile') or request.query_params.get('profile')
+    if flag not in ('1', 'true'):
+        return await call_next(request)
+    if not is_admin(request):
+        return JSONResponse(status_code=403, content={'detail': 'Profiling requires a valid X-Admin-Token'})
+
+    # 이벤트 루프 스레드 + 이 요청이 profiled_to_thread / ProfiledIterator 로 넘긴 작업 스레드를 샘플링
+    # (같은 시각에 이벤트 루프에서 처리된 다른 요청도 섞일 수 있고, 다른 프로세스의 작업은 대기로만 보임)
+    profiler = SamplingProfiler(interval=PROFILE_INTERVAL_MS / 1000)
+    profiler.start()
+    try:
+        with profiler.activate():
+            response = await call_next(request)
+    except BaseException:
+        profiler.stop()
+        raise
+    profile_id = uuid.uuid4().hex
+    info = {
+        'method': request.method,
+        'path': request.url.path,
+        'query': str(request.url.query),
+        'status': response.status_code,
+    }
+    body = response.body_iterator
+
+    async def profiled_body():
+        # 스트리밍 응답은 본문을 다 보낼 때까지 프로파일 (끊긴 연결도 그때까지 저장)
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            profiler.stop()
+            profile_store.save(profiler, info, profile_id=profile_id)
+
+    response.body_iterator = profiled_body()
+    response.headers['X-Profile-Id'] = profile_id
+    response.headers['Link'] = (f'</api/profiles/{profile_id}?format=collapsed>; rel="profile"; type="text/plain", '
+                                f'</api/profiles/{profile_id}?format=json>; rel="profile-summary"; type="application/json"')
+    return response
+
 # Request 모델
 class BacktestRequest(BaseModel):
     market: str = 'KRW-BTC'
-    days: int = 500
+    days: int = 500  # 캔들 개수 (일봉이면 일수)
     initial_capital: float = 10000000
     use_api: bool = False
+    interval: str = '1d'  # '1m', '5m', '15m', '1h', '4h', '1d' 등
+    confirmations: Optional[Dict[str, str]] = None  # 다른 주기 확인 조건 (예: {'4h': 'rsi', '1h': 'macd'})
+    precision: Optional[str] = None  # 지표 / 가격 배열 자료형 ('float32' 로 메모리 절약, 기본 float64)
 
 # 매매 일지 Request 모델
 class TradeCreateRequest(BaseModel):
@@ -61,121 +331,857 @@ class TradeFilterRequest(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
 
+class WalkForwardRequest(BaseModel):
+    market: str = 'KRW-BTC'
+    days: int = 1000
+    initial_capital: float = 10000000
+    use_api: bool = False
+    train_size: int = 250
+    test_size: int = 60
+    mode: str = 'rolling'  # 'rolling' or 'anchored'
+    param_grid: Optional[Dict[str, List[float]]] = None
+    max_workers: Optional[int] = None
+
+class RobustnessRequest(BaseModel):
+    market: str = 'KRW-BTC'
+    days: int = 500
+    initial_capital: float = 10000000
+    use_api: bool = False
+    method: str = 'block_bootstrap'  # 'block_bootstrap' or 'trade_shuffle'
+    n_paths: int = 1000
+    block_size: int = 20
+    confidence: float = 0.95
+    seed: Optional[int] = None
+
+class PortfolioBacktestRequest(BaseModel):
+    markets: List[str] = ['KRW-BTC', 'KRW-ETH', 'KRW-XRP']
+    days: int = 500
+    initial_capital: float = 10000000
+    use_api: bool = False
+    sizing: str = 'equal_weight'  # 'equal_weight', 'equal_slot', 'inverse_volatility'
+    rebalance: str = 'on_signal'  # 'on_signal' or 'full'
+    rebalance_every: Optional[int] = None
+    fee_rate: float = 0.0
+
+def load_price_data(market: str, days: int, use_api: bool, interval: str = '1d') -> pd.DataFrame:
+    """
+    API 또는 샘플 데이터로 OHLCV 데이터 로드
+    일봉은 일봉 API 를 직접 사용하고, 분/시간봉은 1분봉 저장소에서 리샘플링한다.
+    """
+    if interval != '1d':
+        return load_intraday_data(market, days, use_api, interval)
+    if use_api:
+        print(f"API를 사용하여 {market} 데이터 수집 중...")
+        df = collect_historical_data(market, days)
+        if df is None or len(df) == 0:
+            print("API 데이터 수집 실패, 샘플 데이터 사용")
+            df = generate_sample_data(days)
+    else:
+        print("샘플 데이터 생성 중...")
+        df = generate_sample_data(days)
+    return df
+
+def shared_candle_store(base_interval: str) -> CandleStore:
+    """base_interval 캔들을 거래소에서 받는 공용 저장소"""
+    with candle_stores_lock:
+        store = candle_stores.get(base_interval)
+        if store is None:
+            store = candle_stores[base_interval] = CandleStore(collect_historical_data, base_interval=base_interval,
+                                                               directory=CANDLE_STORE_DIR, max_fetch=MAX_BASE_CANDLES)
+        return store
+
+def load_candle_store(market: str, count: int, use_api: bool, interval: str,
+                      base_interval: Optional[str] = None) -> CandleStore:
+    """
+    interval 캔들 count 개를 만들 수 있는 기준 주기 (기본 1분봉) 저장소 준비
+    API 사용 시 공용 저장소를 동기화하고 (네트워크는 기준 주기만 조회), 실패하거나 API 를 쓰지 않으면
+    샘플 기준 주기 캔들로 채운 임시 저장소를 반환한다.
+    """
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f'Unsupported candle interval: {interval}')
+    store = shared_candle_store(base_interval or candle_store.base_interval)
+    if INTERVAL_SECONDS[interval] % INTERVAL_SECONDS[store.base_interval]:
+        raise ValueError(f'Interval {interval} is not a multiple of the base interval {store.base_interval}')
+    base_count = count * INTERVAL_SECONDS[interval] // INTERVAL_SECONDS[store.base_interval]
+    if base_count > MAX_BASE_CANDLES:
+        raise ValueError(f'Too many {store.base_interval} candles required ({base_count} > {MAX_BASE_CANDLES})')
+
+    if use_api:
+        print(f"API를 사용하여 {market} {store.base_interval} 데이터 동기화 중...")
+        store.sync(market, base_count)
+        base = store.get(market, store.base_interval)
+        if base is not None and len(base) > 0:
+            return store
+        print("API 데이터 수집 실패, 샘플 데이터 사용")
+
+    print("샘플 데이터 생성 중...")
+    sample_store = CandleStore(collect_historical_data, base_interval=store.base_interval)
+    sample_store.append(market, generate_sample_data(
+        base_count, freq=pd.Timedelta(seconds=INTERVAL_SECONDS[store.base_interval])
+    ))
+    return sample_store
+
+def timeframe_base_interval(intervals: List[str]) -> str:
+    """주기들을 모두 리샘플링으로 만들 수 있는 가장 긴 기준 주기 (예: 4h / 1h -> 1h, 15m / 10m -> 5m)"""
+    return max((name for name in INTERVAL_SECONDS
+                if all(INTERVAL_SECONDS[interval] % INTERVAL_SECONDS[name] == 0 for interval in intervals)),
+               key=INTERVAL_SECONDS.get)
+
+def load_timeframe_frames(market: str, days: int, use_api: bool, interval: str,
+                          confirmations: Dict[str, str]) -> Dict[str, pd.DataFrame]:
+    """
+    멀티 타임프레임 백테스트용 주기별 지표 데이터프레임
+    일봉은 일봉 API 로 받고, 분/시간봉은 요청 주기를 모두 나누는 가장 긴 기준 주기 저장소
+    (예: 4h / 1h 확인이면 1시간봉) 에서 기준 주기 days 개 구간 (+ 워밍업) 을 덮을 만큼만 준비한다.
+    """
+    intervals = list(dict.fromkeys([interval, *confirmations]))
+    for name in intervals:
+        if name not in INTERVAL_SECONDS:
+            raise ValueError(f'Unsupported candle interval: {name}')
+    window = days * INTERVAL_SECONDS[interval]
+    intraday = [name for name in intervals if name != '1d']
+    store, daily = None, None
+    with span('backtest.fetch'):
+        if intraday:
+            base_interval = timeframe_base_interval(intraday)
+            base_seconds = INTERVAL_SECONDS[base_interval]
+            base_count = max(-(-(window + TIMEFRAME_WARMUP_CANDLES * INTERVAL_SECONDS[name]) // base_seconds)
+                             for name in intraday)
+            store = load_candle_store(market, base_count, use_api, base_interval, base_interval)
+        if '1d' in intervals:
+            daily = load_price_data(market, -(-window // INTERVAL_SECONDS['1d']) + TIMEFRAME_WARMUP_CANDLES,
+                                    use_api, '1d')
+
+    with span('backtest.indicators'):
+        frames = {}
+        if store is not None:
+            shared = candle_stores.get(store.base_interval) is store
+            frames.update(load_timeframe_indicators(store, market, intraday, cache=indicator_cache if shared else None))
+        if daily is not None:
+            frames['1d'] = add_technical_indicators(daily)
+        frames[interval] = frames[interval].iloc[-days:]
+    return frames
+
+def load_intraday_data(market: str, count: int, use_api: bool, interval: str) -> pd.DataFrame:
+    """1분봉 저장소를 거쳐 분/시간봉 데이터 로드"""
+    return load_candle_store(market, count, use_api, interval).get(market, interval, count)
+
+def format_timestamp(timestamp: pd.Timestamp, interval: str = '1d') -> str:
+    """응답용 시각 문자열 (분/시간봉은 시각 포함)"""
+    return timestamp.strftime('%Y-%m-%d' if interval == '1d' else '%Y-%m-%d %H:%M')
+
+screener = MarketScreener(lambda market: load_price_data(market, SCREENER_LOOKBACK, SCREENER_USE_API))
+
+def build_price_data(df: pd.DataFrame, interval: str) -> List[Dict]:
+    """백테스트 응답의 봉별 가격 / 지표 / 신호 목록"""
+    price_data = []
+    for idx, row in df.iterrows():
+        price_data.append({
+            'date': format_timestamp(idx, interval),
+            'close': float(row['Close']),
+            'sma20': float(row['SMA_20']) if pd.notna(row['SMA_20']) else None,
+            'sma50': float(row['SMA_50']) if pd.notna(row['SMA_50']) else None,
+            'rsi': float(row['RSI']) if pd.notna(row['RSI']) and row['RSI'] != np.inf else None,
+            'macd': float(row['MACD']) if pd.notna(row['MACD']) else None,
+            'macd_signal': float(row['MACD_Signal']) if pd.notna(row['MACD_Signal']) else None,
+            'uptrend_probability': float(row['Uptrend_Probability']),
+            'buy_signal': int(row['Buy_Signal']),
+            'sell_signal': int(row['Sell_Signal'])
+        })
+    return price_data
+
+def build_trades_data(trades_df: pd.DataFrame, interval: str) -> List[Dict]:
+    """백테스트 응답의 거래 목록"""
+    trades_data = []
+    if len(trades_df) > 0:
+        for _, trade in trades_df.iterrows():
+            trades_data.append({
+                'date': format_timestamp(trade['Date'], interval) if isinstance(trade['Date'], pd.Timestamp) else str(trade['Date']),
+                'type': trade['Type'],
+                'price': float(trade['Price']),
+                'amount': float(trade['Amount']),
+                'total_value': float(trade['Total_Value'])
+            })
+    return trades_data
+
+# /api/backtest 응답에서 고를 수 있는 항목 (success / market / interval / confirmations 는 항상 포함)
+BACKTEST_FIELDS = frozenset({'data_period', 'metrics', 'signals', 'price_data', 'trades', 'chart'})
+BACKTEST_FIELD_ALIASES = {'chart_image': 'chart'}
+
+def parse_backtest_fields(*values: Optional[str]) -> frozenset:
+    """
+    쉼표로 구분한 include / fields 값을 항목 집합으로 변환 (둘 다 없으면 전체)
+
+    예: 'metrics,signals' -> {'metrics', 'signals'}
+    """
+    names = [name.strip().lower() for value in values if value for name in value.split(',') if name.strip()]
+    if not names:
+        return BACKTEST_FIELDS
+    fields = frozenset(BACKTEST_FIELD_ALIASES.get(name, name) for name in names)
+    unknown = fields - BACKTEST_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown backtest fields: {', '.join(sorted(unknown))} "
+                         f"(available: {', '.join(sorted(BACKTEST_FIELDS))})")
+    return fields
+
 @app.get('/api/health')
 async def health_check():
     """헬스 체크 엔드포인트"""
     return {"status": "ok", "message": "API is running"}
 
-@app.post('/api/backtest')
-async def run_backtest(request: BacktestRequest):
-    """백테스팅 실행 API"""
-    try:
-        market = request.market
-        days = request.days
-        initial_capital = request.initial_capital
-        use_api = request.use_api
-
-        # 데이터 수집
-        if use_api:
-            print(f"API를 사용하여 {market} 데이터 수집 중...")
-            df = collect_historical_data(market, days)
-            if df is None or len(df) == 0:
-                print("API 데이터 수집 실패, 샘플 데이터 사용")
-                df = generate_sample_data(days)
-        else:
-            print("샘플 데이터 생성 중...")
-            df = generate_sample_data(days)
+def prepare_backtest(request: BacktestRequest, fields: frozenset = BACKTEST_FIELDS):
+    """
+    데이터 수집 -> 지표 -> 신호 -> 상승 확률 -> 백테스트 -> 성과 지표 (일반 / 스트리밍 응답 공통)
+    백테스트는 거래 / 성과 지표 / 차트 중 하나라도 필요할 때만, 성과 지표는 metrics 가 있을 때만 계산
+
+    Args:
+        request: 백테스트 요청
+        fields: 응답에 포함할 항목 (parse_backtest_fields 결과)
 
-        # 기술적 지표 추가
-        df = add_technical_indicators(df)
+    Returns:
+        (지표 / 신호 데이터프레임, 거래 데이터프레임, 성과 지표)
+    """
+    market = request.market
+    days = request.days
+    initial_capital = request.initial_capital
+    use_api = request.use_api
+    interval = request.interval
 
-        # 매매 신호 생성
-        df = find_optimal_buy_sell_signals(df)
-        df = df.dropna()
+    if request.confirmations and request.precision:
+        raise ValueError('precision is not supported with confirmations')
 
-        # 백테스팅 실행
+    if request.confirmations:
+        # 멀티 타임프레임: 주기별 지표를 한 번씩 계산 후 기준 주기 신호를 확인 (일봉은 일봉 API, 나머지는 기준 주기 저장소)
+        frames = load_timeframe_frames(market, days, use_api, interval, request.confirmations)
+        with span('backtest.signals'):
+            df = find_multi_timeframe_signals(frames, interval, request.confirmations)
+        with span('backtest.uptrend'):
+            # 봉별 상승 확률 (전체 이력 기준으로 계산 후 dropna)
+            df['Uptrend_Probability'] = calculate_uptrend_probability_series(df)
+            df = df.dropna()
+    else:
+        # 지연 계산 파이프라인: 신호 / 상승 확률 / 차트에 필요한 지표만 계산하고,
+        # 지표 / 신호 / 백테스트가 데이터프레임 복사 없이 같은 배열을 공유 (precision 으로 float32 선택 가능)
+        with span('backtest.fetch'):
+            candles = CompactCandles.from_frame(load_price_data(market, days, use_api, interval),
+                                                request.precision or 'float64')
+        with span('backtest.indicators'):
+            cache_key = market if use_api else f'SAMPLE-{market}'  # 샘플 데이터는 실제 데이터와 다른 캐시 항목
+            candles.add_cached_indicators(indicator_cache, cache_key, interval, UPTREND_INDICATORS)
+        with span('backtest.signals'):
+            candles.add_signals()
+        with span('backtest.uptrend'):
+            candles.indicators['Uptrend_Probability'] = calculate_uptrend_probability_series(
+                candles.to_frame()).to_numpy(dtype=candles.dtype)
+            df = candles.ready().to_frame()
+
+    trades_df, metrics = pd.DataFrame(), {}
+    if not fields & {'trades', 'metrics', 'chart'}:
+        return df, trades_df, metrics
+
+    # 백테스팅 실행
+    with span('backtest.run'):
         backtester = CryptoBacktester(initial_capital=initial_capital)
         trades_df = backtester.run_backtest(df)
 
-        # 성과 지표 계산
-        metrics = backtester.calculate_performance_metrics(df)
-
-        # 차트 이미지 생성
-        chart_image = create_chart_image(df, trades_df)
-
-        # 데이터를 JSON으로 변환
-        price_data = []
-        for idx, row in df.iterrows():
-            price_data.append({
-                'date': idx.strftime('%Y-%m-%d'),
-                'close': float(row['Close']),
-                'sma20': float(row['SMA_20']) if pd.notna(row['SMA_20']) else None,
-                'sma50': float(row['SMA_50']) if pd.notna(row['SMA_50']) else None,
-                'rsi': float(row['RSI']) if pd.notna(row['RSI']) and row['RSI'] != np.inf else None,
-                'macd': float(row['MACD']) if pd.notna(row['MACD']) else None,
-                'macd_signal': float(row['MACD_Signal']) if pd.notna(row['MACD_Signal']) else None,
-                'buy_signal': int(row['Buy_Signal']),
-                'sell_signal': int(row['Sell_Signal'])
+    # 성과 지표 계산 (최대 가능 수익률 계산이 포함되어 가장 무거운 단계 중 하나)
+    if 'metrics' in fields:
+        with span('backtest.metrics'):
+            metrics = backtester.calculate_performance_metrics(df)
+
+    return df, trades_df, metrics
+
+def build_backtest_summary(request: BacktestRequest, df: pd.DataFrame, metrics: Dict,
+                           fields: frozenset = BACKTEST_FIELDS) -> Dict:
+    """백테스트 응답의 요약 부분 (기간, 성과 지표, 신호 수 중 fields 에 있는 것)"""
+    interval = request.interval
+    summary = {
+        'success': True,
+        'market': request.market,
+        'interval': interval,
+        'confirmations': request.confirmations
+    }
+    if 'data_period' in fields:
+        summary['data_period'] = {
+            'start': format_timestamp(df.index[0], interval),
+            'end': format_timestamp(df.index[-1], interval),
+            'days': len(df)
+        }
+    if 'metrics' in fields:
+        summary['metrics'] = {
+            'initial_capital': metrics.get('초기 자본', 0),
+            'final_value': metrics.get('최종 자산', 0),
+            'total_return': round(metrics.get('총 수익률', 0), 2),
+            'buy_hold_return': round(metrics.get('Buy & Hold 수익률', 0), 2),
+            'num_trades': metrics.get('거래 횟수', 0),
+            'win_rate': round(metrics.get('승률', 0), 2),
+            'max_drawdown': round(metrics.get('최대 낙폭(MDD)', 0), 2),
+            'sharpe_ratio': round(metrics.get('Sharpe Ratio', 0), 2),
+            'uptrend_probability': round(metrics.get('상승 확률', 50.0), 2),
+            'oracle_return': round(metrics.get('최대 가능 수익률', 0), 2),
+            'oracle_efficiency': round(metrics.get('최대 대비 달성률', 0), 2)
+        }
+    if 'signals' in fields:
+        summary['signals'] = {
+            'buy_count': int(df['Buy_Signal'].sum()),
+            'sell_count': int(df['Sell_Signal'].sum())
+        }
+    return summary
+
+def build_backtest_response(request: BacktestRequest, selected: frozenset) -> Dict:
+    """백테스트 실행 + 차트 / JSON 변환 (거래소 호출 / 계산이 있으므로 스레드에서 실행)"""
+    df, trades_df, metrics = prepare_backtest(request, selected)
+
+    # 차트 이미지 생성
+    chart_image = None
+    if 'chart' in selected:
+        with span('backtest.chart'):
+            chart_image = create_chart_image(df, trades_df)
+
+    # 데이터를 JSON으로 변환
+    with span('backtest.serialize'):
+        result = build_backtest_summary(request, df, metrics, selected)
+        if 'price_data' in selected:
+            result['price_data'] = build_price_data(df, request.interval)
+        if 'trades' in selected:
+            result['trades'] = build_trades_data(trades_df, request.interval)
+        if 'chart' in selected:
+            result['chart_image'] = chart_image
+    return result
+
+@app.post('/api/backtest')
+async def run_backtest(request: BacktestRequest, include: Optional[str] = None, fields: Optional[str] = None):
+    """
+    백테스팅 실행 API
+    include (또는 fields) 로 응답 항목을 고르면 (예: include=metrics,signals) 나머지는 계산도 직렬화도 하지 않음
+    항목: data_period, metrics, signals, price_data, trades, chart (생략 시 전체)
+    """
+    try:
+        selected = parse_backtest_fields(include, fields)
+        # 거래소 스케줄러 대기 / 재시도와 계산이 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await profiled_to_thread(build_backtest_response, request, selected)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def backtest_events(request: BacktestRequest, df: pd.DataFrame, trades_df: pd.DataFrame, metrics: Dict,
+                    chunk_size: int):
+    """스트리밍 이벤트 (이름, 데이터) - 요약 -> 가격 데이터 묶음 -> 거래 -> 차트 URL -> 종료"""
+    interval = request.interval
+    yield 'summary', build_backtest_summary(request, df, metrics)
+    for offset in range(0, len(df), chunk_size):
+        yield 'price_data', {'offset': offset, 'rows': build_price_data(df.iloc[offset:offset + chunk_size], interval)}
+    yield 'trades', build_trades_data(trades_df, interval)
+    with span('backtest.chart'):
+        chart_id = chart_store.put(create_chart_png(df, trades_df))
+    yield 'chart', {'url': f'/api/backtest/charts/{chart_id}'}
+    yield 'end', {'rows': len(df)}
+
+def encode_events(events, sse: bool):
+    """이벤트를 NDJSON 한 줄 또는 SSE 블록으로 인코딩 (도중 오류는 error 이벤트로 보내고 종료)"""
+    def encode(name: str, data) -> str:
+        payload = json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+        if sse:
+            return f'event: {name}\ndata: {payload}\n\n'
+        return f'{{"event":"{name}","data":{payload}}}\n'
+
+    try:
+        for name, data in events:
+            yield encode(name, data)
+    except Exception as e:
+        yield encode('error', {'detail': str(e)})
+
+@app.post('/api/backtest/stream')
+async def stream_backtest(request: BacktestRequest, http_request: Request,
+                          format: Optional[str] = None, chunk_size: int = 500):
+    """
+    백테스팅 결과 스트리밍 API (기본 NDJSON, format=sse 또는 Accept: text/event-stream 이면 SSE)
+    성과 지표 / 신호 수를 먼저 보내고 price_data 를 chunk_size 행씩, 이어서 거래 목록, 마지막에 차트 URL 을 보낸다.
+    """
+    try:
+        if format not in (None, 'ndjson', 'sse'):
+            raise ValueError(f'Unsupported stream format: {format}')
+        if not 1 <= chunk_size <= 10000:
+            raise ValueError('chunk_size must be between 1 and 10000')
+        df, trades_df, metrics = await profiled_to_thread(prepare_backtest, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    sse = format == 'sse' or (format is None and 'text/event-stream' in http_request.headers.get('accept', ''))
+    # 동기 제너레이터라 차트 렌더링 / 직렬화는 스레드풀에서 실행됨
+    return StreamingResponse(
+        ProfiledIterator(encode_events(backtest_events(request, df, trades_df, metrics, chunk_size), sse)),
+        media_type='text/event-stream' if sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get('/api/backtest/charts/{chart_id}')
+async def get_backtest_chart(chart_id: str):
+    """스트리밍 백테스트의 차트 PNG (CHART_STORE_TTL_SECONDS 동안 유효)"""
+    png = chart_store.get(chart_id)
+    if png is None:
+        raise HTTPException(status_code=404, detail='Chart not found or expired')
+    return Response(png, media_type='image/png')
+
+def compute_walk_forward(request: WalkForwardRequest) -> Dict:
+    """데이터 로드 + walk-forward 실행 (스레드에서 실행)"""
+    df = load_price_data(request.market, request.days, request.use_api)
+
+    # 지표는 전체 구간에 대해 한 번만 계산
+    df = add_technical_indicators(df).dropna()
+
+    return run_walk_forward(
+        df,
+        train_size=request.train_size,
+        test_size=request.test_size,
+        mode=request.mode,
+        param_grid=request.param_grid,
+        initial_capital=request.initial_capital,
+        max_workers=request.max_workers
+    )
+
+@app.post('/api/backtest/walk-forward')
+async def run_walk_forward_backtest(request: WalkForwardRequest):
+    """Walk-forward 최적화 API (학습 구간 최적화 + 표본 외 검증)"""
+    try:
+        result = await profiled_to_thread(compute_walk_forward, request)
+
+        folds = []
+        for fold in result['folds']:
+            folds.append({
+                'train_start': fold['train_period']['start'].strftime('%Y-%m-%d'),
+                'train_end': fold['train_period']['end'].strftime('%Y-%m-%d'),
+                'test_start': fold['test_period']['start'].strftime('%Y-%m-%d'),
+                'test_end': fold['test_period']['end'].strftime('%Y-%m-%d'),
+                'best_params': fold['best_params'],
+                'train_return': round(fold['train_return'], 2),
+                'test_return': round(fold['test_return'], 2)
             })
 
-        trades_data = []
-        if len(trades_df) > 0:
-            for _, trade in trades_df.iterrows():
-                trades_data.append({
-                    'date': trade['Date'].strftime('%Y-%m-%d') if isinstance(trade['Date'], pd.Timestamp) else str(trade['Date']),
-                    'type': trade['Type'],
-                    'price': float(trade['Price']),
-                    'amount': float(trade['Amount']),
-                    'total_value': float(trade['Total_Value'])
-                })
-
-        result = {
+        return {
+            'success': True,
+            'market': request.market,
+            'mode': result['mode'],
+            'num_folds': result['num_folds'],
+            'folds': folds,
+            'summary': {key: round(value, 2) for key, value in result['summary'].items()}
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/api/backtest/robustness')
+async def run_robustness_backtest(request: RobustnessRequest):
+    """Monte Carlo 강건성 시뮬레이션 API (재표본화 경로별 수익률 / MDD / Sharpe 분포)"""
+    def simulate():
+        df = load_price_data(request.market, request.days, request.use_api)
+        return run_robustness_simulation(
+            df,
+            method=request.method,
+            n_paths=request.n_paths,
+            block_size=request.block_size,
+            initial_capital=request.initial_capital,
+            confidence=request.confidence,
+            seed=request.seed
+        )
+
+    try:
+        result = await profiled_to_thread(simulate)
+
+        return {'success': True, 'market': request.market, **result}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post('/api/portfolio/backtest')
+async def run_portfolio(request: PortfolioBacktestRequest):
+    """멀티 자산 포트폴리오 백테스팅 API"""
+    try:
+        if not request.markets:
+            raise HTTPException(status_code=400, detail="markets must not be empty")
+
+        def backtest():
+            frames = {market: load_price_data(market, request.days, request.use_api) for market in request.markets}
+            return run_portfolio_backtest(
+                build_price_panel(frames),
+                initial_capital=request.initial_capital,
+                sizing=request.sizing,
+                rebalance=request.rebalance,
+                rebalance_every=request.rebalance_every,
+                fee_rate=request.fee_rate
+            )
+
+        result = await profiled_to_thread(backtest)
+
+        equity_curve = [
+            {'date': date.strftime('%Y-%m-%d'), 'value': float(value)}
+            for date, value in zip(result['dates'], result['equity'])
+        ]
+
+        return {
             'success': True,
-            'market': market,
+            'markets': request.markets,
             'data_period': {
-                'start': df.index[0].strftime('%Y-%m-%d'),
-                'end': df.index[-1].strftime('%Y-%m-%d'),
-                'days': len(df)
+                'start': result['dates'][0].strftime('%Y-%m-%d'),
+                'end': result['dates'][-1].strftime('%Y-%m-%d'),
+                'days': len(result['dates'])
             },
             'metrics': {
-                'initial_capital': metrics.get('초기 자본', 0),
-                'final_value': metrics.get('최종 자산', 0),
-                'total_return': round(metrics.get('총 수익률', 0), 2),
-                'buy_hold_return': round(metrics.get('Buy & Hold 수익률', 0), 2),
-                'num_trades': metrics.get('거래 횟수', 0),
-                'win_rate': round(metrics.get('승률', 0), 2),
-                'max_drawdown': round(metrics.get('최대 낙폭(MDD)', 0), 2),
-                'sharpe_ratio': round(metrics.get('Sharpe Ratio', 0), 2),
-                'uptrend_probability': round(metrics.get('상승 확률', 50.0), 2)
+                key: round(value, 2) if isinstance(value, float) else value
+                for key, value in result['metrics'].items()
             },
-            'price_data': price_data,
-            'trades': trades_data,
-            'chart_image': chart_image,
-            'signals': {
-                'buy_count': int(df['Buy_Signal'].sum()),
-                'sell_count': int(df['Sell_Signal'].sum())
-            }
+            'assets': result['assets'],
+            'equity_curve': equity_curve
         }
 
-        return result
-
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get('/api/markets')
-async def get_markets():
-    """사용 가능한 마켓 목록 반환"""
-    markets = [
-        {'code': 'KRW-BTC', 'name': '비트코인 (BTC)'},
-        {'code': 'KRW-ETH', 'name': '이더리움 (ETH)'},
-        {'code': 'KRW-XRP', 'name': '리플 (XRP)'},
-        {'code': 'KRW-ADA', 'name': '에이다 (ADA)'},
-        {'code': 'KRW-DOT', 'name': '폴카닷 (DOT)'},
-        {'code': 'KRW-LINK', 'name': '체인링크 (LINK)'},
-        {'code': 'KRW-LTC', 'name': '라이트코인 (LTC)'},
-        {'code': 'KRW-BCH', 'name': '비트코인 캐시 (BCH)'}
+async def get_markets(request: Request, quote: Optional[str] = 'KRW'):
+    """사용 가능한 마켓 목록 반환 (캐시된 카탈로그, ETag 지원)"""
+    view = market_catalog.markets(None if quote == 'ALL' else quote)
+    headers = {'ETag': view['etag'], 'Cache-Control': 'public, max-age=60'}
+    if request.headers.get('if-none-match') == view['etag']:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse({'markets': view['markets']}, headers=headers)
+
+@app.get('/api/screener')
+async def get_screener(
+    signal: Optional[str] = None,
+    min_uptrend: Optional[float] = None,
+    max_rsi: Optional[float] = None,
+    sort_by: str = 'uptrend_probability',
+    order: str = 'desc',
+    limit: Optional[int] = None
+):
+    """마켓 스크리너 조회 (백그라운드에서 갱신된 캐시를 필터링 / 정렬)"""
+    try:
+        result = screener.query(
+            signal=signal,
+            min_uptrend=min_uptrend,
+            max_rsi=max_rsi,
+            sort_by=sort_by,
+            descending=order != 'asc',
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=503, detail="Screener is not ready yet")
+    return {'success': True, **result}
+
+@app.get('/api/scheduler/metrics')
+async def get_scheduler_metrics():
+    """거래소 요청 스케줄러의 호스트별 요청 / 재시도 / 대기 시간 통계"""
+    return {'success': True, 'hosts': scheduler.metrics()}
+
+def collect_indicator_cache_metrics():
+    """지표 캐시 조회 결과별 횟수 / 적중률 / 보관 항목 수"""
+    stats = dict(indicator_cache.stats)
+    lookups = stats['hits'] + stats['extends'] + stats['misses']
+    return [
+        ('indicator_cache_lookups_total', 'counter', '지표 캐시 조회 수 (hit: 그대로 재사용, extend: 추가 구간만 계산, miss: 전체 계산)',
+         [({'result': 'hit'}, stats['hits']), ({'result': 'extend'}, stats['extends']),
+          ({'result': 'miss'}, stats['misses'])]),
+        ('indicator_cache_disk_loads_total', 'counter', '디스크에서 다시 연 지표 캐시 항목 수',
+         [({}, stats['disk_loads'])]),
+        ('indicator_cache_disk_writes_total', 'counter', '디스크에 기록한 지표 캐시 항목 수 (메모리에서 밀려날 때 / 종료 시)',
+         [({}, stats['disk_writes'])]),
+        ('indicator_cache_hit_ratio', 'gauge', '전체 계산 없이 응답한 조회 비율 (hit + extend)',
+         [({}, ratio(stats['hits'] + stats['extends'], lookups))]),
+        ('indicator_cache_entries', 'gauge', '메모리에 보관 중인 지표 캐시 항목 수',
+         [({}, len(indicator_cache))]),
+    ]
+
+def collect_scheduler_metrics():
+    """거래소 호스트별 요청 / 재시도 / 429 횟수, 대기열 길이, 한도 여유"""
+    hosts = scheduler.metrics()
+    def samples(key):
+        return [({'host': host}, values[key]) for host, values in sorted(hosts.items())]
+    return [
+        ('exchange_requests_total', 'counter', '거래소 요청 수 (재시도 포함)', samples('requests')),
+        ('exchange_retries_total', 'counter', '거래소 요청 재시도 수', samples('retries')),
+        ('exchange_rate_limited_total', 'counter', '거래소 429 응답 수', samples('rate_limited')),
+        ('exchange_errors_total', 'counter', '거래소 연결 오류 / 타임아웃 수', samples('errors')),
+        ('exchange_queue_wait_seconds_total', 'counter', '한도 대기열 누적 대기 시간', samples('queue_wait_total')),
+        ('exchange_queue_depth', 'gauge', '한도 대기열에서 기다리는 요청 수', samples('waiting')),
+        ('exchange_rate_limit_tokens', 'gauge', '지금 바로 보낼 수 있는 요청 수 (토큰 버킷 잔량)', samples('tokens_available')),
+        ('exchange_rate_limit_headroom_ratio', 'gauge', '토큰 버킷 잔량 / 버스트 크기',
+         [({'host': host}, ratio(values['tokens_available'], values['burst'])) for host, values in sorted(hosts.items())]),
+        ('exchange_rate_limit_per_second', 'gauge', '호스트별 초당 요청 한도', samples('rate_per_second')),
+    ]
+
+def collect_price_hub_metrics():
+    """실시간 시세 구독자 / 업스트림 마켓 수, 수집 / 전달 / 누락(conflate) 횟수"""
+    stats = price_hub.stats
+    return [
+        ('price_hub_subscribers', 'gauge', '실시간 시세 WebSocket 구독자 수', [({}, price_hub.subscriber_count())]),
+        ('price_hub_markets', 'gauge', '업스트림에서 구독 중인 마켓 수', [({}, len(price_hub.markets))]),
+        ('price_hub_polls_total', 'counter', '업스트림 현재가 수집 횟수', [({}, stats['polls'])]),
+        ('price_hub_poll_errors_total', 'counter', '업스트림 현재가 수집 실패 횟수', [({}, stats['errors'])]),
+        ('price_hub_ticks_total', 'counter', '바뀐 시세 수 (마켓별)', [({}, stats['ticks'])]),
+        ('price_hub_deliveries_total', 'counter', '구독자에게 넘긴 시세 수', [({}, stats['deliveries'])]),
+        ('price_hub_conflated_total', 'counter', '느린 구독자에게 보내기 전에 새 시세로 대체된 시세 수',
+         [({}, stats['conflated'])]),
+    ]
+
+registry.register_collector(collect_indicator_cache_metrics)
+registry.register_collector(collect_scheduler_metrics)
+def collect_alert_metrics():
+    """신호 알림 마켓 수 / 봉 반영 / 알림 / 억제 횟수, 구독자 수와 대기열에서 버린 알림 수"""
+    engine, service = alert_engine.stats, alert_service.stats
+    return [
+        ('alert_markets', 'gauge', '지표 상태를 유지 중인 마켓 수', [({}, len(alert_engine.markets))]),
+        ('alert_candle_updates_total', 'counter', '반영한 마감 봉 수', [({}, engine['updates'])]),
+        ('alert_signals_total', 'counter', '매수 / 매도 조건이 성립한 봉 수', [({}, engine['signals'])]),
+        ('alert_sent_total', 'counter', '보낸 알림 수', [({}, engine['alerts'])]),
+        ('alert_suppressed_total', 'counter', '연속 신호 / 쿨다운으로 보내지 않은 알림 수', [({}, engine['suppressed'])]),
+        ('alert_fetch_errors_total', 'counter', '봉 조회 실패 수', [({}, service['fetch_errors'])]),
+        ('alert_poll_duration_seconds', 'gauge', '마지막 전체 마켓 조회 소요 시간', [({}, service['last_round_seconds'])]),
+        ('alert_subscribers', 'gauge', '알림 구독자 수 (WebSocket + SSE)', [({}, alert_broker.subscriber_count())]),
+        ('alert_dropped_total', 'counter', '느린 구독자 대기열에서 버린 알림 수 (현재 구독자 기준)',
+         [({}, alert_broker.dropped())]),
+    ]
+
+def collect_tick_metrics():
+    """체결 집계 마켓 수 / 체결 / 늦은 체결 / 마감된 봉 / 버린 봉 수, 체결 조회 실패 / 누락 의심 횟수"""
+    aggregator, feed = tick_aggregator.stats, trade_feed.stats
+    return [
+        ('tick_markets', 'gauge', '체결을 집계 중인 마켓 수', [({}, len(tick_aggregator.markets))]),
+        ('tick_trades_total', 'counter', '봉에 반영한 체결 수', [({}, aggregator['trades'])]),
+        ('tick_late_trades_total', 'counter', '이미 마감된 봉의 체결이라 버린 수', [({}, aggregator['late'])]),
+        ('tick_bars_total', 'counter', '마감된 봉 수 (전체 주기)', [({}, aggregator['bars'])]),
+        ('tick_partial_bars_total', 'counter', '놓친 체결이 있을 수 있어 보관하지 않은 봉 수', [({}, aggregator['partial'])]),
+        ('tick_fetch_errors_total', 'counter', '체결 조회 실패 수', [({}, feed['fetch_errors'])]),
+        ('tick_gaps_total', 'counter', '조회 간격 사이 체결을 놓쳤을 수 있는 횟수 (TICK_POLL_COUNT 부족)', [({}, feed['gaps'])]),
+        ('tick_poll_duration_seconds', 'gauge', '마지막 전체 마켓 체결 조회 소요 시간', [({}, feed['last_poll_seconds'])]),
+    ]
+
+registry.register_collector(collect_price_hub_metrics)
+registry.register_collector(collect_alert_metrics)
+registry.register_collector(collect_tick_metrics)
+
+@app.get('/metrics')
+async def get_metrics():
+    """Prometheus 형식 메트릭 (단계별 소요 시간 히스토그램, 캐시 적중률, 대기열 길이, 거래소 한도 여유)"""
+    return Response(registry.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.get('/api/profiles/{profile_id}')
+async def get_profile(profile_id: str, request: Request, format: str = 'collapsed'):
+    """
+    저장된 요청 프로파일 다운로드 (관리자 전용)
+    format=collapsed: flamegraph.pl / speedscope 입력 형식, format=json: 상위 함수 요약
+    """
+    if not is_admin(request):
+        raise HTTPException(status_code=403, detail='Admin token required')
+    try:
+        path = profile_store.path(profile_id, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if path is None:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    if format == 'json':
+        return FileResponse(path, media_type='application/json')
+    return FileResponse(path, media_type='text/plain; charset=utf-8', filename=f'{profile_id}.collapsed')
+
+# ===== 실시간 시세 =====
+
+def parse_market_codes(markets) -> List[str]:
+    """구독 요청 마켓 코드 목록 (쉼표 구분 문자열 또는 배열, 마켓 목록에 없는 코드는 ValueError)"""
+    if isinstance(markets, str):
+        markets = markets.split(',')
+    if not isinstance(markets, list):
+        raise ValueError('markets must be a list or a comma-separated string')
+    codes = [str(market).strip().upper() for market in markets if str(market).strip()]
+    known = set(market_catalog.market_codes(None))
+    unknown = [code for code in codes if code not in known]
+    if unknown:
+        raise ValueError(f"Unknown markets: {', '.join(unknown)}")
+    return codes
+
+def subscribe_prices(subscriber: Subscriber, markets) -> None:
+    """구독 추가 (연결당 PRICE_HUB_MAX_MARKETS 개까지)"""
+    codes = parse_market_codes(markets)
+    if len(subscriber.markets | set(codes)) > PRICE_HUB_MAX_MARKETS:
+        raise ValueError(f'At most {PRICE_HUB_MAX_MARKETS} markets per connection')
+    price_hub.subscribe(subscriber, codes)
+
+async def send_prices(websocket: WebSocket, subscriber: Subscriber):
+    """구독자 우편함의 시세를 전송 (PRICE_HUB_SEND_TIMEOUT_SECONDS 안에 못 보내면 중단)"""
+    while not subscriber.closed:
+        for message in await subscriber.next_batch():
+            await asyncio.wait_for(websocket.send_text(message), PRICE_HUB_SEND_TIMEOUT_SECONDS)
+
+async def receive_price_commands(websocket: WebSocket, subscriber: Subscriber):
+    """클라이언트의 구독 변경 메시지 처리 (연결이 끊기면 반환)"""
+    while True:
+        try:
+            command = await websocket.receive_json()
+            if not isinstance(command, dict):
+                raise ValueError('Expected a JSON object')
+            if 'subscribe' in command:
+                subscribe_prices(subscriber, command['subscribe'])
+            if 'unsubscribe' in command:
+                price_hub.unsubscribe(subscriber, parse_market_codes(command['unsubscribe']))
+        except WebSocketDisconnect:
+            return
+        except ValueError as e:
+            await websocket.send_json({'type': 'error', 'detail': str(e)})
+
+@app.websocket('/ws/prices')
+async def price_stream(websocket: WebSocket, markets: str = ''):
+    """
+    실시간 시세 WebSocket (예: /ws/prices?markets=KRW-BTC,KRW-ETH)
+    연결 수와 관계없이 마켓당 업스트림 수집은 하나이고, 바뀐 시세만 {"type": "ticker", ...현재가 필드} 로 보낸다.
+    연결 중 {"subscribe": [...]} / {"unsubscribe": [...]} 로 구독 변경, 잘못된 요청은 {"type": "error"} 로 응답
+    느린 클라이언트는 마켓별 최신 시세만 받고, PRICE_HUB_SEND_TIMEOUT_SECONDS 동안 전송이 막히면 연결 종료 (1013)
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    try:
+        try:
+            subscribe_prices(subscriber, markets)
+        except ValueError as e:
+            await websocket.send_json({'type': 'error', 'detail': str(e)})
+        receiver = asyncio.create_task(receive_price_commands(websocket, subscriber))
+        sender = asyncio.create_task(send_prices(websocket, subscriber))
+        done, pending = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if any(isinstance(task.exception(), asyncio.TimeoutError) for task in done):
+            await asyncio.wait_for(websocket.close(code=1013), PRICE_HUB_SEND_TIMEOUT_SECONDS)
+    except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError):
+        pass
+    finally:
+        price_hub.unsubscribe(subscriber)
+        subscriber.close()
+
+# ===== 신호 알림 =====
+
+@app.get('/api/alerts')
+async def get_alerts(markets: str = '', limit: int = 50):
+    """최근 알림 (오래된 순, ALERT_HISTORY 개까지 보관)"""
+    try:
+        codes = parse_market_codes(markets)
+        if not 1 <= limit <= ALERT_HISTORY:
+            raise ValueError(f'limit must be between 1 and {ALERT_HISTORY}')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    messages = [message for _, message in alert_broker.recent(codes, limit=limit)]
+    return Response('{"alerts":[' + ','.join(messages) + ']}', media_type='application/json')
+
+async def alert_events(subscription, replay):
+    """SSE 알림 이벤트 (재연결 시 놓친 알림 먼저, 15초마다 keep-alive 주석)"""
+    try:
+        for alert_id, message in replay:
+            yield f'id: {alert_id}\nevent: alert\ndata: {message}\n\n'
+        while True:
+            try:
+                alert_id, message = await asyncio.wait_for(subscription.get(), 15)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield f'id: {alert_id}\nevent: alert\ndata: {message}\n\n'
+    finally:
+        alert_broker.unsubscribe(subscription)
+
+@app.get('/api/alerts/stream')
+async def stream_alerts(request: Request, markets: str = ''):
+    """
+    매매 신호 알림 SSE (markets 생략 시 전체 마켓)
+    Last-Event-ID 헤더로 재연결하면 보관 중인 알림 중 놓친 것부터 보냄
+    """
+    try:
+        codes = parse_market_codes(markets)
+        last_event_id = int(request.headers.get('last-event-id') or 0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subscription = alert_broker.subscribe(codes)
+    replay = alert_broker.recent(codes, after=last_event_id) if last_event_id else []
+    return StreamingResponse(
+        alert_events(subscription, replay),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.websocket('/ws/alerts')
+async def alert_stream(websocket: WebSocket, markets: str = ''):
+    """매매 신호 알림 WebSocket ({"type": "alert", ...}, markets 생략 시 전체 마켓)"""
+    await websocket.accept()
+    try:
+        codes = parse_market_codes(markets)
+    except ValueError as e:
+        await websocket.send_json({'type': 'error', 'detail': str(e)})
+        await websocket.close(code=1008)
+        return
+    subscription = alert_broker.subscribe(codes)
+
+    async def send_alerts():
+        while True:
+            _, message = await subscription.get()
+            await asyncio.wait_for(websocket.send_text(message), PRICE_HUB_SEND_TIMEOUT_SECONDS)
+
+    async def wait_for_disconnect():
+        while True:
+            await websocket.receive_text()
+
+    try:
+        sender = asyncio.create_task(send_alerts())
+        receiver = asyncio.create_task(wait_for_disconnect())
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if any(isinstance(task.exception(), asyncio.TimeoutError) for task in done):
+            await asyncio.wait_for(websocket.close(code=1013), PRICE_HUB_SEND_TIMEOUT_SECONDS)
+    except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError):
+        pass
+    finally:
+        alert_broker.unsubscribe(subscription)
+
+# ===== 체결 집계 캔들 =====
+
+def bar_row(timestamp: pd.Timestamp, interval: str, open_, high, low, close, volume) -> Dict:
+    """응답용 봉 한 개"""
+    return {'date': format_timestamp(timestamp, interval), 'open': float(open_), 'high': float(high),
+            'low': float(low), 'close': float(close), 'volume': float(volume)}
+
+@app.get('/api/candles/live')
+async def get_live_candles(market: str, interval: str = '1m', count: int = 200):
+    """
+    체결로 직접 만든 최근 봉 + 진행 중인 봉 (실시간 차트용, TICK_MARKETS 마켓만)
+    current 의 partial 이 true 면 집계 시작 전 / 놓친 체결이 있을 수 있는 봉 (마감돼도 candles 에 남지 않음)
+    """
+    try:
+        if market not in TICK_MARKETS:
+            raise ValueError(f'Market is not aggregated from trades: {market} (TICK_MARKETS)')
+        if not 1 <= count <= TICK_RING_SIZE:
+            raise ValueError(f'count must be between 1 and {TICK_RING_SIZE}')
+        bars = tick_aggregator.bars(market, interval, count)
+        current = tick_aggregator.current(market, interval)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    candles = [] if bars is None else [
+        bar_row(timestamp, interval, *values)
+        for timestamp, values in zip(bars.index, bars.to_numpy().tolist())
     ]
-    return {'markets': markets}
+    if current is not None:
+        current = {**bar_row(current.date, interval, current.open, current.high, current.low, current.close,
+                             current.volume),
+                   'trades': current.trades, 'partial': tick_aggregator.is_partial(market, current)}
+    return {'market': market, 'interval': interval, 'candles': candles, 'current': current}
 
 # ===== 업비트 API 프록시 =====
 
@@ -183,7 +1189,7 @@ async def get_markets():
 async def get_upbit_accounts():
     """업비트 계정 잔고 조회 (프록시)"""
     try:
-        accounts = upbit_proxy.call_upbit_api('/v1/accounts')
+        accounts = await profiled_to_thread(upbit_proxy.call_upbit_api, '/v1/accounts')
         return accounts
     except ValueError as e:
         raise HTTPException(status_code=500, detail=f'API 키 설정 오류: {str(e)}')
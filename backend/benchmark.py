@@ -0,0 +1,360 @@
+"""
+백테스트 파이프라인 벤치마크
+시드 고정 합성 데이터(1k / 10k / 100k / 1M 봉)로 수집 / 지표 / 신호 / 백테스트 / 성과 지표 / 차트 /
+응답 직렬화 / 매매 일지 DB 단계의 소요 시간을 측정해 JSON 으로 저장하고,
+기준 결과(baseline)와 비교해 threshold 이상 느려진 항목을 표시하는 모듈
+
+실행 예:
+    python benchmark.py --save-baseline                 # 기준 결과 저장
+    python benchmark.py --sizes 1000,10000 --repeat 5   # 기준과 비교 (회귀가 있으면 종료 코드 1)
+"""
+import os
+import io
+import sys
+import json
+import time
+import uuid
+import platform
+import argparse
+import statistics
+import subprocess
+import contextlib
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+import crypto_simulator
+from crypto_simulator import (
+    collect_historical_data,
+    add_technical_indicators,
+    find_optimal_buy_sell_signals,
+    calculate_uptrend_probability_series,
+    CryptoBacktester,
+    create_chart_image
+)
+from synthetic_data import generate_market_data
+from fake_exchange import fake_exchange_process
+from http_scheduler import scheduler
+import trade_journal_db
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+STAGES = ('collect', 'indicators', 'signals', 'uptrend', 'backtest', 'metrics', 'chart', 'serialize', 'db')
+
+# 단계별 최대 봉 수 (넘는 크기는 건너뜀, --limit 으로 변경)
+# 차트는 10k 봉에서도 수십 초, 1M 수집은 요청 5000회, 행 단위 직렬화 / DB 는 1M 에서 수 분이 걸려 기본 제외
+DEFAULT_STAGE_LIMITS = {'collect': 100000, 'chart': 10000, 'serialize': 100000, 'db': 100000}
+DB_OPERATIONS = 50  # DB 작업별 측정 횟수
+INITIAL_CAPITAL = 10000000
+
+
+def measure(func: Callable[..., Any], repeat: int, warmup: int = 1,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    func 를 warmup 회 실행 후 repeat 회 측정 (print 출력은 버림)
+
+    Args:
+        func: 측정할 함수 (setup 이 있으면 setup 반환값을 인자로 받음)
+        repeat: 측정 횟수
+        warmup: 측정 전 실행 횟수
+        setup: 매 실행 전 호출할 준비 함수 (측정 시간에서 제외)
+
+    Returns:
+        {'runs', 'min', 'median', 'mean'} (초)
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(warmup + repeat):
+            args = (setup(),) if setup else ()
+            started = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - started
+            if index >= warmup:
+                times.append(elapsed)
+    return {
+        'runs': len(times),
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+    }
+
+
+# ===== 로컬 가짜 거래소 (collect_historical_data 측정용) =====
+
+@contextlib.contextmanager
+def fake_exchange_server(minute_history: int, seed: int):
+    """가짜 거래소를 별도 프로세스로 실행하고 수집 함수가 그 서버를 보도록 설정"""
+    previous_base = crypto_simulator.BITHUMB_API_BASE
+    with fake_exchange_process('--minute-history', str(minute_history), '--seed', str(seed)) as base:
+        # 로컬 서버는 거래소 요청 한도 대상이 아님 (스케줄러 대기 시간이 측정에 섞이지 않도록)
+        scheduler.host_limits['127.0.0.1'] = (1e9, 10 ** 9)
+        crypto_simulator.BITHUMB_API_BASE = base
+        try:
+            yield base
+        finally:
+            crypto_simulator.BITHUMB_API_BASE = previous_base
+
+
+# ===== 매매 일지 DB =====
+
+def _prefill_trades(rows: int, seed: int) -> None:
+    """trades 테이블을 rows 개 기록으로 채움 (측정 대상 아님)"""
+    rng = np.random.default_rng(seed)
+    now = datetime.now().isoformat()
+    dates = pd.date_range('2020-01-01', periods=rows, freq='h').strftime('%Y-%m-%d').tolist()
+    records = [
+        (str(uuid.uuid4()), f'KRW-{"BTC" if i % 2 else "ETH"}', 'BUY' if i % 3 else 'SELL',
+         100000.0, float(rate), dates[i], '', now, now)
+        for i, rate in enumerate(rng.normal(0, 5, rows))
+    ]
+    conn = trade_journal_db.get_connection()
+    conn.executemany('INSERT INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', records)
+    conn.commit()
+    conn.close()
+
+
+def measure_db(rows: int, repeat: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """rows 개 기록이 있는 임시 DB 에서 CRUD 작업별 1회 소요 시간 측정"""
+    previous_file = trade_journal_db.DB_FILE
+    with tempfile.TemporaryDirectory() as directory:
+        trade_journal_db.DB_FILE = os.path.join(directory, 'trade_journal.db')
+        try:
+            trade_journal_db.init_db()
+            _prefill_trades(rows, seed)
+            sample = {'symbol': 'KRW-BTC', 'type': 'BUY', 'investment_amount': 100000,
+                      'return_rate': 1.5, 'trade_date': '2024-01-01', 'memo': 'benchmark'}
+
+            def create_batch():
+                return [trade_journal_db.create_trade(sample)['id'] for _ in range(DB_OPERATIONS)]
+
+            def each(func):
+                return lambda trade_ids: [func(trade_id) for trade_id in trade_ids]
+
+            # (함수, 준비 함수, 1회당 작업 수) - 단건 작업은 DB_OPERATIONS 회 묶어서 측정 후 1회 시간으로 환산
+            operations = {
+                'create': (create_batch, None, DB_OPERATIONS),
+                'get': (each(trade_journal_db.get_trade_by_id), create_batch, DB_OPERATIONS),
+                'update': (each(lambda trade_id: trade_journal_db.update_trade(trade_id, {'memo': 'updated'})),
+                           create_batch, DB_OPERATIONS),
+                'delete': (each(trade_journal_db.delete_trade), create_batch, DB_OPERATIONS),
+                'list': (lambda: trade_journal_db.get_all_trades({'symbol': 'KRW-BTC'}), None, 1),
+                'statistics': (trade_journal_db.get_statistics, None, 1),
+            }
+            results = {}
+            for name, (func, setup, count) in operations.items():
+                result = measure(func, repeat, setup=setup)
+                results[name] = {key: (value if key == 'runs' else value / count) for key, value in result.items()}
+        finally:
+            trade_journal_db.DB_FILE = previous_file
+    return results
+
+
+# ===== 파이프라인 단계 =====
+
+def benchmark_size(size: int, stages: List[str], limits: Dict[str, int], repeat: int, seed: int,
+                   preset: str = 'gbm') -> Dict[str, Dict[str, Any]]:
+    """
+    size 개 1분봉 합성 데이터로 단계별 소요 시간 측정
+    각 단계의 입력은 앞 단계 결과를 한 번 계산해 두고 사용 (측정은 해당 단계만)
+
+    Returns:
+        '{단계}/{크기}' -> 측정 결과
+    """
+    results = {}
+
+    def record(stage: str, func: Callable[[], Any]) -> None:
+        if stage not in stages:
+            return
+        if size > limits.get(stage, size):
+            results[f'{stage}/{size}'] = {'skipped': f'size above limit {limits[stage]}'}
+            print(f"  {stage:<14} {size:>9,} bars  skipped (--limit {stage}={limits[stage]})")
+            return
+        result = measure(func, repeat)
+        result['bars_per_second'] = size / result['median'] if result['median'] else None
+        results[f'{stage}/{size}'] = result
+        print(f"  {stage:<14} {size:>9,} bars  median {result['median'] * 1000:10.2f} ms")
+
+    data = next(iter(generate_market_data(size, preset, interval='1m', seed=seed).values()))
+
+    record('indicators', lambda: add_technical_indicators(data))
+    with contextlib.redirect_stdout(io.StringIO()):
+        indicators = add_technical_indicators(data)
+    record('signals', lambda: find_optimal_buy_sell_signals(indicators))
+    signals = find_optimal_buy_sell_signals(indicators)
+    record('uptrend', lambda: calculate_uptrend_probability_series(signals))
+    df = signals.assign(Uptrend_Probability=calculate_uptrend_probability_series(signals)).dropna()
+
+    record('backtest', lambda: CryptoBacktester(initial_capital=INITIAL_CAPITAL).run_backtest(df))
+    backtester = CryptoBacktester(initial_capital=INITIAL_CAPITAL)
+    trades_df = backtester.run_backtest(df)
+    record('metrics', lambda: backtester.calculate_performance_metrics(df))
+    record('chart', lambda: create_chart_image(df, trades_df))
+
+    if 'serialize' in stages:
+        # /api/backtest 응답의 가격 / 거래 목록 생성 + FastAPI 와 같은 JSON 인코딩
+        from fastapi.encoders import jsonable_encoder
+        from app_fastapi import build_price_data, build_trades_data
+        record('serialize', lambda: json.dumps(jsonable_encoder({
+            'price_data': build_price_data(df, '1m'),
+            'trades': build_trades_data(trades_df, '1m'),
+        })))
+
+    if 'db' in stages:
+        if size > limits.get('db', size):
+            results[f'db/{size}'] = {'skipped': f'size above limit {limits["db"]}'}
+        else:
+            for operation, result in measure_db(size, repeat, seed).items():
+                results[f'db.{operation}/{size}'] = result
+                print(f"  {'db.' + operation:<14} {size:>9,} rows  median {result['median'] * 1000:10.3f} ms/op")
+    return results
+
+
+def benchmark_collect(sizes: List[int], limits: Dict[str, int], repeat: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    """로컬 가짜 거래소에서 size 개 1분봉 수집 (200개씩 반복 요청) 소요 시간"""
+    measured = [size for size in sizes if size <= limits.get('collect', size)]
+    results = {f'collect/{size}': {'skipped': f'size above limit {limits["collect"]}'}
+               for size in sizes if size not in measured}
+    if not measured:
+        return results
+    with fake_exchange_server(max(measured), seed):
+        for size in measured:
+            result = measure(lambda: collect_historical_data('KRW-BTC', size, '1m'), repeat)
+            result['bars_per_second'] = size / result['median'] if result['median'] else None
+            results[f'collect/{size}'] = result
+            print(f"  {'collect':<14} {size:>9,} bars  median {result['median'] * 1000:10.2f} ms")
+    return results
+
+
+# ===== 결과 저장 / 비교 =====
+
+def environment() -> Dict[str, Any]:
+    """결과 비교에 필요한 실행 환경 정보"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float,
+            min_delta: float) -> List[Dict[str, Any]]:
+    """
+    기준 결과와 최솟값 비교 (반복 측정 중 가장 빠른 값이 다른 작업 / 캐시 상태 영향을 가장 덜 받음)
+
+    Args:
+        threshold: 회귀로 표시할 상대 증가율 (0.25 = 25% 이상 느려짐)
+        min_delta: 회귀 / 개선으로 표시할 최소 절대 차이 (초, 측정 잡음 제외용)
+
+    Returns:
+        항목별 {'name', 'baseline', 'current', 'change', 'status'} (status: regression / improvement / ok)
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'min' not in base or 'min' not in result:
+            continue
+        delta = result['min'] - base['min']
+        change = delta / base['min'] if base['min'] else 0.0
+        if change > threshold and delta > min_delta:
+            status = 'regression'
+        elif change < -threshold and -delta > min_delta:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'baseline': base['min'], 'current': result['min'],
+                     'change': change, 'status': status})
+    return rows
+
+
+def _parse_limits(values: List[str]) -> Dict[str, int]:
+    limits = dict(DEFAULT_STAGE_LIMITS)
+    for value in values:
+        stage, _, size = value.partition('=')
+        if stage not in STAGES or not size.isdigit():
+            raise ValueError(f'Invalid --limit value: {value} (expected STAGE=N)')
+        limits[stage] = int(size)
+    return limits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='백테스트 파이프라인 벤치마크')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='봉 개수 목록 (쉼표 구분)')
+    parser.add_argument('--stages', default=','.join(STAGES), help='측정할 단계 (쉼표 구분)')
+    parser.add_argument('--repeat', type=int, default=3, help='단계별 측정 횟수 (준비 실행 1회 제외)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--preset', default='gbm', help='synthetic_data 프리셋')
+    parser.add_argument('--limit', action='append', default=[],
+                        help='단계별 최대 봉 수 (예: --limit chart=1000000)')
+    parser.add_argument('--output', default='data/benchmarks/latest.json')
+    parser.add_argument('--baseline', default='data/benchmarks/baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준 결과로 저장')
+    parser.add_argument('--threshold', type=float, default=0.25, help='회귀로 표시할 최솟값 증가율')
+    parser.add_argument('--min-delta', type=float, default=0.00005, help='회귀로 표시할 최소 차이 (초)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f'unknown stages: {", ".join(sorted(unknown))}')
+    try:
+        limits = _parse_limits(args.limit)
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = {}
+    for size in sizes:
+        print(f"=== {size:,} bars ===")
+        results.update(benchmark_size(size, stages, limits, args.repeat, args.seed, args.preset))
+    if 'collect' in stages:
+        print("=== collect (local fake exchange) ===")
+        results.update(benchmark_collect(sizes, limits, args.repeat, args.seed))
+
+    report = {
+        'environment': environment(),
+        'config': {'sizes': sizes, 'stages': stages, 'repeat': args.repeat, 'seed': args.seed,
+                   'preset': args.preset, 'limits': limits},
+        'results': results,
+    }
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline['results'], args.threshold, args.min_delta)
+        report['comparison'] = {'baseline': args.baseline, 'baseline_environment': baseline.get('environment'),
+                                'threshold': args.threshold, 'rows': rows}
+        print(f"\n=== baseline 비교 ({args.baseline}, threshold {args.threshold:.0%}) ===")
+        for row in rows:
+            marker = {'regression': '!! ', 'improvement': '++ '}.get(row['status'], '   ')
+            print(f"{marker}{row['name']:<28} {row['baseline'] * 1000:10.3f} ms -> "
+                  f"{row['current'] * 1000:10.3f} ms  ({row['change']:+.1%})")
+        regressions = [row for row in rows if row['status'] == 'regression']
+
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {path}")
+
+    if regressions:
+        print(f"성능 회귀 {len(regressions)}건: " + ', '.join(row['name'] for row in regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
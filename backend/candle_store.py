@@ -0,0 +1,227 @@
+"""
+캔들 저장소
+가장 짧은 주기(기본 1분봉)만 거래소에서 받아 한 번 저장하고,
+더 긴 주기(5분, 15분, 1시간, 4시간, 1일 등)는 로컬에서 벡터화된 OHLCV 리샘플링으로 만드는 모듈
+새 캔들이 추가되면 영향을 받는 마지막 구간만 다시 계산한다.
+"""
+import os
+import threading
+from typing import Optional, Dict, Tuple, Callable
+
+import numpy as np
+import pandas as pd
+
+# 주기 -> 초
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '10m': 600,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def resample_ohlcv(data: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    OHLCV 데이터를 더 긴 주기로 리샘플링 (정렬된 시간 인덱스 기준, reduceat 으로 벡터화)
+
+    Args:
+        data: 시간 인덱스의 OHLCV 데이터프레임
+        interval: 목표 주기 (INTERVAL_SECONDS 의 키)
+
+    Returns:
+        주기 시작 시각을 인덱스로 하는 OHLCV 데이터프레임 (마지막 구간은 진행 중일 수 있음)
+    """
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f'Unsupported candle interval: {interval}')
+    if len(data) == 0:
+        return data[OHLCV_COLUMNS].copy()
+
+    period = INTERVAL_SECONDS[interval] * 10 ** 9
+    buckets = data.index.as_unit('ns').asi8 // period
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    resampled = pd.DataFrame({
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(data['Volume'].to_numpy(), starts),
+    }, index=pd.DatetimeIndex(buckets[starts] * period, name=data.index.name))
+    return resampled
+
+
+def market_directory(directory: str, market: str, base_interval: str) -> str:
+    """마켓 / 기준 주기 캔들 파일 디렉토리"""
+    return os.path.join(directory, market, base_interval)
+
+
+def write_columns(market_dir: str, position: int, index: pd.DatetimeIndex, columns: Dict[str, np.ndarray]) -> None:
+    """
+    컬럼별 바이너리 파일에 position 번째 행부터 덮어쓰기 (position 이 기존 길이면 이어 쓰기)
+
+    Args:
+        market_dir: market_directory 경로
+        position: 기존 파일에서 유지할 행 수
+        index: 시간 인덱스 (Date.bin, int64 ns)
+        columns: OHLCV 컬럼 -> 값 (float64 로 저장)
+    """
+    os.makedirs(market_dir, exist_ok=True)
+    values_by_column = {'Date': index.as_unit('ns').asi8}
+    values_by_column.update((column, np.asarray(columns[column], dtype=np.float64)) for column in OHLCV_COLUMNS)
+    for column, values in values_by_column.items():
+        path = os.path.join(market_dir, f'{column}.bin')
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            f.truncate(position * values.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(values.tobytes())
+
+
+class CandleStore:
+    """마켓별 기준 주기 캔들 저장 + 파생 주기 캔들 증분 관리"""
+
+    def __init__(self, fetch_candles: Callable[[str, int, str], Optional[pd.DataFrame]],
+                 base_interval: str = '1m', directory: Optional[str] = None, max_fetch: Optional[int] = None):
+        """
+        Args:
+            fetch_candles: (마켓, 캔들 개수, 주기) -> OHLCV 데이터프레임 (예: collect_historical_data)
+            base_interval: 네트워크에서 받는 유일한 주기
+            directory: 기준 주기 캔들을 저장할 디렉토리 (None 이면 메모리만 사용)
+            max_fetch: sync 한 번에 빈 구간을 채우려 받는 최대 캔들 수 (sync 의 count 가 더 크면 count, None 이면 제한 없음)
+        """
+        if base_interval not in INTERVAL_SECONDS:
+            raise ValueError(f'Unsupported candle interval: {base_interval}')
+        self.fetch_candles = fetch_candles
+        self.base_interval = base_interval
+        self.max_fetch = max_fetch
+        self.directory = directory
+        self._base: Dict[str, pd.DataFrame] = {}
+        self._derived: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._lock = threading.RLock()
+
+    def sync(self, market: str, count: int) -> None:
+        """
+        기준 주기 캔들을 최신 상태로 갱신 (네트워크 호출은 여기서만 발생)
+        마지막 저장 시각 이후분은 count 보다 오래 비어 있었어도 모두 조회해 저장된 캔들과 사이에 구멍을 남기지 않고,
+        저장된 캔들이 count 보다 적으면 최근 count 개 이상을 조회한다.
+        빈 구간이 max(count, max_fetch) 개보다 길면 빈 구간 전체를 받지 않고 최근 count 개만 받아 오래된 저장분을 교체한다.
+        """
+        base = self._load(market)
+        replace = False
+        if base is None or len(base) == 0:
+            needed = count
+        else:
+            now = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None)
+            elapsed = (now - base.index[-1]).total_seconds() // INTERVAL_SECONDS[self.base_interval]
+            # 진행 중이던 마지막 캔들도 다시 받아 갱신
+            needed = int(max(elapsed, 0) + 1)
+            if len(base) < count:
+                needed = max(needed, count)
+            if self.max_fetch is not None and needed > max(count, self.max_fetch):
+                needed, replace = count, True
+        if needed <= 0:
+            return
+
+        candles = self.fetch_candles(market, needed, self.base_interval)
+        if candles is None or len(candles) == 0:
+            return
+        with self._lock:
+            if replace:
+                self._drop(market)
+            self.append(market, candles)
+
+    def append(self, market: str, candles: pd.DataFrame) -> None:
+        """기준 주기 캔들 추가 / 갱신 후 이미 만들어진 파생 주기의 영향받는 구간만 다시 계산"""
+        candles = candles[OHLCV_COLUMNS].sort_index()
+        candles = candles[~candles.index.duplicated(keep='last')]
+        first_changed = candles.index[0]
+
+        with self._lock:
+            base = self._load(market)
+            if base is None:
+                position, merged_tail = 0, candles
+                base = candles.iloc[:0]
+            else:
+                position = base.index.searchsorted(first_changed)
+                merged_tail = pd.concat([base.iloc[position:], candles])
+                merged_tail = merged_tail[~merged_tail.index.duplicated(keep='last')].sort_index()
+            self._base[market] = pd.concat([base.iloc[:position], merged_tail])
+            self._save(market, position, merged_tail)
+
+            for (derived_market, interval), derived in list(self._derived.items()):
+                if derived_market != market:
+                    continue
+                period = pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+                bucket_start = first_changed.floor(period)
+                new_base = self._base[market]
+                recomputed = resample_ohlcv(new_base.iloc[new_base.index.searchsorted(bucket_start):], interval)
+                kept = derived.iloc[:derived.index.searchsorted(bucket_start)]
+                self._derived[(market, interval)] = pd.concat([kept, recomputed])
+
+    def get(self, market: str, interval: str, count: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        저장된 캔들 조회 (네트워크 호출 없음)
+
+        Args:
+            market: 마켓 코드
+            interval: 주기 (기준 주기 이상)
+            count: 최근 캔들 개수 (None 이면 전체)
+        """
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f'Unsupported candle interval: {interval}')
+        if INTERVAL_SECONDS[interval] < INTERVAL_SECONDS[self.base_interval]:
+            raise ValueError(f'Interval {interval} is shorter than the base interval {self.base_interval}')
+
+        with self._lock:
+            base = self._load(market)
+            if base is None:
+                return None
+            if interval == self.base_interval:
+                result = base
+            else:
+                key = (market, interval)
+                if key not in self._derived:
+                    self._derived[key] = resample_ohlcv(base, interval)
+                result = self._derived[key]
+        return result.iloc[-count:] if count else result
+
+    def _drop(self, market: str) -> None:
+        """저장된 기준 / 파생 주기 캔들 비우기 (디스크 파일은 다음 append 가 처음부터 다시 씀)"""
+        self._base[market] = pd.DataFrame(
+            {column: np.empty(0) for column in OHLCV_COLUMNS},
+            index=pd.DatetimeIndex(np.empty(0, dtype='datetime64[ns]'), name='Date')
+        )
+        for key in [key for key in self._derived if key[0] == market]:
+            del self._derived[key]
+
+    # ===== 디스크 저장 (컬럼별 바이너리 파일, 변경된 위치부터만 다시 씀) =====
+
+    def _market_dir(self, market: str) -> str:
+        return market_directory(self.directory, market, self.base_interval)
+
+    def _load(self, market: str) -> Optional[pd.DataFrame]:
+        if market in self._base or not self.directory:
+            return self._base.get(market)
+        market_dir = self._market_dir(market)
+        date_path = os.path.join(market_dir, 'Date.bin')
+        if not os.path.exists(date_path):
+            return None
+        index = pd.DatetimeIndex(np.fromfile(date_path, dtype=np.int64).view('datetime64[ns]'), name='Date')
+        data = {
+            column: np.fromfile(os.path.join(market_dir, f'{column}.bin'), dtype=np.float64)
+            for column in OHLCV_COLUMNS
+        }
+        self._base[market] = pd.DataFrame(data, index=index)
+        return self._base[market]
+
+    def _save(self, market: str, position: int, rows: pd.DataFrame) -> None:
+        if not self.directory:
+            return
+        write_columns(self._market_dir(market), position, rows.index,
+                      {column: rows[column].to_numpy() for column in OHLCV_COLUMNS})
@@ -0,0 +1,46 @@
+"""
+차트 이미지 임시 보관소
+스트리밍 백테스트 응답이 차트를 base64 로 본문에 넣는 대신 URL 로 전달할 수 있도록
+렌더링한 PNG 를 메모리에 잠시(LRU + 만료 시간) 보관하는 모듈
+"""
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ChartStore:
+    """id -> PNG 바이트 (오래된 것부터 삭제, ttl_seconds 가 지나면 만료)"""
+
+    def __init__(self, max_entries: int = 32, ttl_seconds: float = 600):
+        """
+        Args:
+            max_entries: 보관할 최대 차트 수
+            ttl_seconds: 차트 보관 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, png: bytes) -> str:
+        """PNG 저장 후 id 반환"""
+        chart_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[chart_id] = (time.monotonic() + self.ttl_seconds, png)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return chart_id
+
+    def get(self, chart_id: str) -> Optional[bytes]:
+        """저장된 PNG (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get(chart_id)
+            if entry is None:
+                return None
+            expires_at, png = entry
+            if time.monotonic() > expires_at:
+                del self._entries[chart_id]
+                return None
+            return png
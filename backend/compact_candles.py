@@ -0,0 +1,147 @@
+"""
+컴팩트 캔들 컨테이너
+float32 가격 / 거래량, int64 epoch(ns) 시각, uint8 매매 신호로 캔들을 열 단위 배열에 보관하는 모듈
+지표 / 신호 / 백테스트 단계는 같은 배열의 view 를 사용하고 데이터프레임 전체 복사를 하지 않는다.
+지표는 IndicatorPipeline 으로 필요한 것만 계산한다.
+precision='float64' 로 기존과 같은 정밀도를 유지할 수도 있다.
+"""
+from typing import Optional, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from crypto_simulator import (
+    IndicatorPipeline,
+    INDICATOR_COLUMNS,
+    DEPENDENCY_ONLY_INDICATORS,
+    find_buy_sell_signal_arrays,
+    indicator_ready_mask
+)
+from candle_store import OHLCV_COLUMNS
+
+PRECISIONS = {'float32': np.float32, 'float64': np.float64}
+
+
+class CompactCandles:
+    """열 단위 캔들 배열 + 지표 / 신호"""
+
+    def __init__(self, timestamps: np.ndarray, columns: Dict[str, np.ndarray], precision: str = 'float32',
+                 indicators: Optional[Dict[str, np.ndarray]] = None, signals: Optional[Dict[str, np.ndarray]] = None,
+                 frozen: bool = False):
+        """
+        Args:
+            timestamps: epoch 나노초 int64 배열
+            columns: OHLCV 컬럼 -> 배열
+            precision: 'float32' 또는 'float64'
+            indicators: 이미 계산된 지표 이름 -> 배열
+            signals: 'Buy_Signal' / 'Sell_Signal' -> uint8 배열 (add_signals 결과)
+            frozen: True 면 지표를 새로 계산하지 않음 (행을 잘라낸 경우)
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f'Unsupported precision: {precision}')
+        self.precision = precision
+        self.dtype = PRECISIONS[precision]
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.columns = {name: np.asarray(values, dtype=self.dtype) for name, values in columns.items()}
+        self.pipeline = IndicatorPipeline(self.columns, self.dtype, computed=indicators, frozen=frozen)
+        self.signals = signals or {}
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, precision: str = 'float32') -> 'CompactCandles':
+        """OHLCV 데이터프레임에서 생성 (가격 / 거래량만 변환, 다른 컬럼은 무시)"""
+        if precision not in PRECISIONS:
+            raise ValueError(f'Unsupported precision: {precision}')
+        dtype = PRECISIONS[precision]
+        return cls(
+            pd.DatetimeIndex(data.index).as_unit('ns').asi8,
+            {column: data[column].to_numpy(dtype=dtype) for column in OHLCV_COLUMNS if column in data},
+            precision
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """timestamps 를 공유하는 DatetimeIndex (복사 없음)"""
+        return pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), copy=False, name='Date')
+
+    @property
+    def indicators(self) -> Dict[str, np.ndarray]:
+        """지금까지 계산된 지표"""
+        return self.pipeline.computed
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.columns['Close']
+
+    @property
+    def nbytes(self) -> int:
+        """보관 중인 배열의 총 바이트 수"""
+        arrays = [self.timestamps, *self.columns.values(), *self.indicators.values(), *self.signals.values()]
+        return int(sum(values.nbytes for values in arrays))
+
+    def add_indicators(self, names: Optional[List[str]] = None) -> 'CompactCandles':
+        """
+        지표를 precision 자료형으로 계산
+
+        Args:
+            names: 계산할 지표 (None 이면 add_technical_indicators 와 같은 전체 지표)
+        """
+        if names is None:
+            names = [name for name in INDICATOR_COLUMNS if name != 'Volume_MA' or 'Volume' in self.columns]
+        self.pipeline.compute(names)
+        return self
+
+    def add_cached_indicators(self, cache, market: str, interval: str, names: List[str]) -> 'CompactCandles':
+        """IndicatorCache 에서 지표를 가져오거나 계산해 저장 (시각 / 종가 / 거래량으로 캐시 구간 확인)"""
+        inputs = {name: self.columns[name] for name in ('Close', 'Volume') if name in self.columns}
+        self.indicators.update(cache.get(market, interval, self.timestamps, inputs, names, dtype=self.dtype))
+        return self
+
+    def add_signals(self, rsi_oversold: float = 30, rsi_overbought: float = 70) -> 'CompactCandles':
+        """find_optimal_buy_sell_signals 와 같은 매매 신호 (uint8, bool 배열의 view, 필요한 지표만 계산)"""
+        buy, sell = find_buy_sell_signal_arrays(self.close, self.pipeline, rsi_oversold, rsi_overbought)
+        self.signals = {'Buy_Signal': buy.view(np.uint8), 'Sell_Signal': sell.view(np.uint8)}
+        return self
+
+    def take(self, rows) -> 'CompactCandles':
+        """행 선택 (slice 면 view, bool / 정수 배열이면 복사) - 잘라낸 뒤에는 지표를 새로 계산하지 않음"""
+        return CompactCandles(
+            self.timestamps[rows],
+            {name: values[rows] for name, values in self.columns.items()},
+            self.precision,
+            {name: values[rows] for name, values in self.indicators.items()},
+            {name: values[rows] for name, values in self.signals.items()},
+            frozen=True
+        )
+
+    def tail(self, count: int) -> 'CompactCandles':
+        return self.take(slice(max(len(self) - count, 0), None))
+
+    def ready(self) -> 'CompactCandles':
+        """
+        모든 지표가 계산된 행만 남김 (데이터프레임 dropna 와 같은 결과)
+        준비되지 않은 행이 앞쪽 워밍업 구간뿐이면 복사 없이 view 로 자른다.
+        """
+        mask = indicator_ready_mask({**self.columns, **self.indicators})
+        if mask is None or mask.all():
+            return self
+        first = int(np.argmax(mask))
+        if mask[first:].all():
+            return self.take(slice(first, None))
+        return self.take(mask)
+
+    def to_frame(self, names: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        배열을 공유하는 데이터프레임 (기존 데이터프레임 기반 함수 / 차트에 전달용)
+
+        Args:
+            names: 포함할 컬럼 (None 이면 가격 / 지표 / 신호 전체, 의존 계산용 지표는 제외)
+        """
+        arrays = {**self.columns, **self.indicators, **self.signals}
+        if names is None:
+            arrays = {name: values for name, values in arrays.items() if name not in DEPENDENCY_ONLY_INDICATORS}
+        else:
+            arrays = {name: arrays[name] for name in names}
+        return pd.DataFrame(arrays, index=self.index, copy=False)
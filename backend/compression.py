@@ -0,0 +1,155 @@
+"""
+응답 압축 미들웨어
+Accept-Encoding 을 q 값까지 보고 brotli(설치된 경우) 또는 gzip 을 골라 큰 응답을 압축한다.
+스트리밍 응답(NDJSON 등)은 묶음마다 flush 해서 클라이언트가 바로 풀 수 있게 하고,
+이미 압축된 형식(PNG 등)과 SSE 는 그대로 보낸다.
+"""
+import zlib
+import asyncio
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# brotli 는 선택적 의존성 (pip install brotli, 없으면 gzip 만 사용)
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    pass
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # 동적 응답용 (11 은 JSON 수 MB 에 수 초가 걸림)
+THREAD_MINIMUM_SIZE = 256 * 1024  # 이보다 큰 본문은 스레드에서 압축 (이벤트 루프 차단 방지)
+
+EXCLUDED_CONTENT_TYPES = (
+    'image/', 'audio/', 'video/', 'font/', 'text/event-stream',
+    'application/zip', 'application/gzip', 'application/x-gzip',
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """서버 선호 순서의 지원 인코딩"""
+    return ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Accept-Encoding 에서 사용할 인코딩 선택 (q 값이 높은 것, 같으면 br > gzip)
+
+    예: 'gzip, br;q=0.5' -> 'gzip', 'br, gzip' -> 'br', 'identity' -> None
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """인코딩별 스트림 압축기 (flush 로 지금까지 받은 내용을 풀 수 있는 단위로 내보냄)"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == 'br':
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """minimum_size 바이트 이상 응답을 협상된 인코딩으로 압축하는 ASGI 미들웨어"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    """응답 한 개의 send 래퍼 (첫 본문을 보고 압축 여부 결정)"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message) -> None:
+        kind = message['type']
+        if kind == 'http.response.start':
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '').lower()
+            if ('content-encoding' in headers or message['status'] in (204, 206, 304)
+                    or content_type.startswith(EXCLUDED_CONTENT_TYPES)):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start_message = message  # 첫 본문 크기를 본 뒤 헤더를 정해서 보냄
+            return
+        if kind != 'http.response.body' or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start['headers'])
+            headers.add_vary_header('Accept-Encoding')
+            if len(body) < self.minimum_size and not more_body:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+            body = await self._compress(body, final=not more_body)
+            headers['Content-Encoding'] = self.encoding
+            if more_body:
+                if 'content-length' in headers:
+                    del headers['Content-Length']
+            else:
+                headers['Content-Length'] = str(len(body))
+            await self.send(start)
+        else:
+            body = await self._compress(body, final=not more_body)
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+
+    async def _compress(self, data: bytes, final: bool) -> bytes:
+        if len(data) >= THREAD_MINIMUM_SIZE:
+            return await asyncio.to_thread(self.compressor.compress, data, final)
+        return self.compressor.compress(data, final)
@@ -2,19 +2,25 @@
 # 암호화폐 포트폴리오 시뮬레이터 - LSTM 기반 백테스팅 및 최적 매매 타이밍 분석
 # ===========================================================================================
 
+import os
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # 백엔드에서 사용하기 위해
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import requests
+from scipy.signal import lfilter
 import json
+import heapq
 from datetime import datetime, timedelta
 import warnings
 import base64
 import io
+
+from http_scheduler import scheduler
+
 warnings.filterwarnings('ignore')
 
 # TensorFlow 및 Keras import (선택적)
@@ -42,17 +48,36 @@ plt.rcParams['axes.unicode_minus'] = False
 # 1. Bithumb API 데이터 수집 함수
 # ===========================================================================================
 
-def get_bithumb_candles(market='KRW-BTC', count=200, to=None):
+# Bithumb API 주소 (로컬 가짜 거래소 등으로 바꿀 수 있음)
+BITHUMB_API_BASE = os.getenv('BITHUMB_API_BASE', 'https://api.bithumb.com')
+
+# 캔들 주기 -> Bithumb 캔들 API 경로
+CANDLE_INTERVALS = {
+    '1m': 'minutes/1',
+    '3m': 'minutes/3',
+    '5m': 'minutes/5',
+    '10m': 'minutes/10',
+    '15m': 'minutes/15',
+    '30m': 'minutes/30',
+    '1h': 'minutes/60',
+    '4h': 'minutes/240',
+    '1d': 'days',
+}
+
+def get_bithumb_candles(market='KRW-BTC', count=200, to=None, interval='1d'):
     """
     Bithumb API를 사용하여 캔들 데이터 수집
     Args:
         market: 마켓 코드 (예: 'KRW-BTC', 'KRW-ETH')
         count: 조회할 캔들 개수 (최대 200)
         to: 마지막 캔들 시각 (YYYY-MM-DDTHH:MM:SS 형식)
+        interval: 캔들 주기 (CANDLE_INTERVALS 의 키, 예: '1m', '1h', '1d')
     Returns:
         DataFrame: OHLCV 데이터
     """
-    url = "https://api.bithumb.com/v1/candles/days"
+    if interval not in CANDLE_INTERVALS:
+        raise ValueError(f'Unsupported candle interval: {interval}')
+    url = f"{BITHUMB_API_BASE}/v1/candles/{CANDLE_INTERVALS[interval]}"
     headers = {"accept": "application/json"}
     params = {
         "market": market,
@@ -63,7 +88,7 @@ def get_bithumb_candles(market='KRW-BTC', count=200, to=None):
         params["to"] = to
     
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = scheduler.get(url, headers=headers, params=params)
         data = json.loads(response.text)
         if isinstance(data, list):
             df = pd.DataFrame(data)
@@ -87,12 +112,13 @@ def get_bithumb_candles(market='KRW-BTC', count=200, to=None):
         print(f"API 호출 중 오류 발생: {e}")
         return None
 
-def collect_historical_data(market='KRW-BTC', days=1000):
+def collect_historical_data(market='KRW-BTC', days=1000, interval='1d'):
     """
     여러 번의 API 호출로 긴 기간의 데이터 수집
     Args:
         market: 마켓 코드
-        days: 수집할 일수
+        days: 수집할 캔들 개수 (일봉이면 일수)
+        interval: 캔들 주기
     Returns:
         DataFrame: 전체 OHLCV 데이터
     """
@@ -103,7 +129,7 @@ def collect_historical_data(market='KRW-BTC', days=1000):
     
     while remaining > 0:
         count = min(200, remaining)
-        df = get_bithumb_candles(market, count, current_to)
+        df = get_bithumb_candles(market, count, current_to, interval)
         if df is None or len(df) == 0:
             break
         all_data.append(df)
@@ -169,39 +195,499 @@ def add_technical_indicators(data):
     df['Volume_MA'] = df['Volume'].rolling(window=20).mean()
     return df
 
+# -------------------------------------------------------------------------------------------
+# 2-1. 배열 기반 지표 계산 (여러 시계열을 한 번에 계산, 행 = 시간 / 열 = 시계열)
+# -------------------------------------------------------------------------------------------
+
+def _rolling_mean_std(values, window, with_std=False, center=True):
+    """
+    2D 배열의 열별 이동 평균 (및 표본 표준편차)
+    누적합으로 O(n) 계산하며, 창 안에 NaN 이 있으면 NaN (pandas rolling 과 동일)
+    center: 큰 가격 값의 누적합 오차를 줄이기 위해 열별 평균을 빼고 계산
+    """
+    valid = ~np.isnan(values)
+    has_nan = not valid.all()
+    offset = np.nan_to_num(np.nanmean(values, axis=0)) if center else np.zeros(values.shape[1:])
+    centered = np.where(valid, values - offset, 0.0) if has_nan else values - offset
+
+    csum = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(centered, axis=0, out=csum[1:])
+    window_sum = csum[window:] - csum[:-window]
+    if has_nan:
+        count = np.zeros(csum.shape)
+        np.cumsum(valid, axis=0, out=count[1:])
+        full = (count[window:] - count[:-window]) == window
+
+    mean = np.full(values.shape, np.nan)
+    mean[window - 1:] = window_sum / window + offset
+    if has_nan:
+        mean[window - 1:][~full] = np.nan
+    if not with_std:
+        return mean
+
+    np.cumsum(centered ** 2, axis=0, out=csum[1:])
+    var = np.maximum(csum[window:] - csum[:-window] - window_sum ** 2 / window, 0.0) / (window - 1)
+    std = np.full(values.shape, np.nan)
+    std[window - 1:] = np.sqrt(var)
+    if has_nan:
+        std[window - 1:][~full] = np.nan
+    return mean, std
+
+def _ewm_mean(values, span):
+    """
+    2D 배열의 열별 지수이동평균 (pandas ewm(span, adjust=False) 와 동일)
+    각 열의 첫 유효값부터 시작하며 중간 결측값은 직전 값으로 채운다.
+    """
+    alpha = 2 / (span + 1)
+    missing = np.isnan(values)
+    has_nan = missing.any()
+    filled = pd.DataFrame(values).ffill().bfill().to_numpy() if has_nan else values
+    result = lfilter([alpha], [1, alpha - 1], filled, axis=0, zi=(1 - alpha) * filled[:1])[0]
+    if has_nan:
+        # 상장 전 등 첫 유효값 이전 구간은 NaN 유지
+        result[~np.maximum.accumulate(~missing, axis=0)] = np.nan
+    return result
+
+# -------------------------------------------------------------------------------------------
+# 2-2. 지연 계산 지표 파이프라인 (요청된 지표와 그 의존 지표만 계산, 인스턴스별 메모이제이션)
+# -------------------------------------------------------------------------------------------
+
+INDICATOR_COLUMNS = [
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'BB_Upper', 'BB_Middle', 'BB_Lower',
+    'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'Volume_MA'
+]
+# 매매 신호 / 상승 확률(차트 포함)에 필요한 지표
+SIGNAL_INDICATORS = ['RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower']
+UPTREND_INDICATORS = SIGNAL_INDICATORS + ['MACD_Hist', 'BB_Middle', 'SMA_20', 'SMA_50']
+
+DEFAULT_INDICATOR_PARAMS = {
+    'rsi_period': 14, 'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9,
+    'bb_period': 20, 'bb_std': 2, 'sma_long': 50, 'volume_period': 20
+}
+
+# 지표 이름 -> (함께 계산되는 출력 이름들, 의존 이름들, 계산 함수)
+_INDICATOR_REGISTRY = {}
+
+def register_indicator(*outputs, depends=('Close',)):
+    """
+    지표 계산 함수 등록 데코레이터
+    함수는 (params, *의존 배열) 을 받아 출력 배열(출력이 여러 개면 튜플)을 반환한다.
+    """
+    def decorator(func):
+        for output in outputs:
+            _INDICATOR_REGISTRY[output] = (outputs, tuple(depends), func)
+        return func
+    return decorator
+
+@register_indicator('RSI')
+def _rsi(params, close):
+    # 결측 변화량은 0으로 취급 - calculate_rsi 와 동일
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = close[1:] - close[:-1]
+    period = params['rsi_period']
+    gain = _rolling_mean_std(np.where(delta > 0, delta, 0.0), period, center=False)
+    loss = _rolling_mean_std(np.where(delta < 0, -delta, 0.0), period, center=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+    # 상장 전 결측 종가까지 0 변화량으로 채워지지 않도록 첫 유효 종가부터 period 개가 쌓이기 전은 NaN
+    # (패널의 늦게 상장한 마켓도 해당 마켓만 계산한 결과와 같음)
+    rsi[np.cumsum(~np.isnan(close), axis=0) < period] = np.nan
+    return rsi
+
+@register_indicator('EMA_12')
+def _ema_fast(params, close):
+    return _ewm_mean(close, params['macd_fast'])
+
+@register_indicator('EMA_26')
+def _ema_slow(params, close):
+    return _ewm_mean(close, params['macd_slow'])
+
+@register_indicator('MACD', depends=('EMA_12', 'EMA_26'))
+def _macd(params, ema_fast, ema_slow):
+    return ema_fast - ema_slow
+
+@register_indicator('MACD_Signal', depends=('MACD',))
+def _macd_signal(params, macd):
+    return _ewm_mean(macd, params['macd_signal'])
+
+@register_indicator('MACD_Hist', depends=('MACD', 'MACD_Signal'))
+def _macd_hist(params, macd, macd_signal):
+    return macd - macd_signal
+
+@register_indicator('SMA_20', 'STD_20')
+def _sma_std(params, close):
+    return _rolling_mean_std(close, params['bb_period'], with_std=True)
+
+@register_indicator('BB_Middle', depends=('SMA_20',))
+def _bb_middle(params, sma):
+    return sma
+
+@register_indicator('BB_Upper', depends=('SMA_20', 'STD_20'))
+def _bb_upper(params, sma, std):
+    return sma + std * params['bb_std']
+
+@register_indicator('BB_Lower', depends=('SMA_20', 'STD_20'))
+def _bb_lower(params, sma, std):
+    return sma - std * params['bb_std']
+
+@register_indicator('SMA_50')
+def _sma_long(params, close):
+    return _rolling_mean_std(close, params['sma_long'])
+
+@register_indicator('Volume_MA', depends=('Volume',))
+def _volume_ma(params, volume):
+    return _rolling_mean_std(volume, params['volume_period'])
+
+# 다른 지표 계산에만 쓰이고 결과 컬럼으로 내보내지 않는 지표 (예: 볼린저 밴드용 STD_20)
+DEPENDENCY_ONLY_INDICATORS = frozenset(_INDICATOR_REGISTRY) - frozenset(INDICATOR_COLUMNS)
+
+class IndicatorPipeline:
+    """
+    지연 계산 지표 파이프라인
+    pipeline['RSI'] 처럼 요청할 때 의존 지표부터 계산하고 결과를 인스턴스에 저장해 재사용한다.
+    입력 컬럼은 복사하지 않고 (float64 이면) 그대로 사용하며, 결과는 dtype 으로 저장한다.
+    """
+
+    def __init__(self, columns, dtype=np.float64, params=None, computed=None, frozen=False):
+        """
+        Args:
+            columns: 'Close' (필수), 'Volume' 등 -> (시간,) 또는 (시간, 시계열 수) 배열
+            dtype: 지표 저장 자료형 (계산은 float64)
+            params: DEFAULT_INDICATOR_PARAMS 덮어쓰기
+            computed: 이미 계산된 지표 (이름 -> 배열)
+            frozen: True 면 새 지표를 계산하지 않음 (행을 잘라낸 파이프라인 등)
+        """
+        self.columns = columns
+        self.dtype = dtype
+        self.params = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
+        self.computed = dict(computed or {})
+        self.frozen = frozen
+
+    @classmethod
+    def from_frame(cls, data, dtype=np.float64, params=None):
+        """OHLCV 데이터프레임의 컬럼 배열(view)로 생성"""
+        columns = {column: data[column].to_numpy() for column in ('Open', 'High', 'Low', 'Close', 'Volume') if column in data}
+        return cls(columns, dtype, params)
+
+    def __contains__(self, name):
+        return name in self.computed or name in self.columns or name in _INDICATOR_REGISTRY
+
+    def __getitem__(self, name):
+        if name in self.computed:
+            return self.computed[name]
+        if name in self.columns:
+            return self.columns[name]
+        if name not in _INDICATOR_REGISTRY:
+            raise KeyError(name)
+        if self.frozen:
+            raise KeyError(f'{name} was not computed before the pipeline was sliced')
+
+        outputs, depends, func = _INDICATOR_REGISTRY[name]
+        is_1d = np.ndim(self.columns['Close']) == 1
+        arguments = []
+        for dep in depends:
+            # 의존 지표도 float64 로 계산 (dtype 이 float32 이면 저장된 값을 올려서 사용)
+            values = np.asarray(self[dep], dtype=np.float64)
+            arguments.append(values[:, None] if is_1d else values)
+        results = func(self.params, *arguments)
+        if len(outputs) == 1:
+            results = (results,)
+        for output, values in zip(outputs, results):
+            values = values[:, 0] if is_1d else values
+            self.computed[output] = values if self.dtype == np.float64 else values.astype(self.dtype)
+        return self.computed[name]
+
+    def compute(self, names):
+        """여러 지표를 계산해 이름 -> 배열 dict 로 반환"""
+        return {name: self[name] for name in names}
+
+    def values(self):
+        """계산된 지표 배열들 (indicator_ready_mask 등에 사용)"""
+        return self.computed.values()
+
+def calculate_indicator_arrays(close, volume=None, dtype=np.float64):
+    """
+    add_technical_indicators 와 같은 지표를 NumPy 배열로 계산 (IndicatorPipeline 으로 전체 지표 계산)
+    Args:
+        close: 종가 배열 (시간,) 또는 (시간, 시계열 수)
+        volume: 거래량 배열 (close 와 같은 모양, 없으면 Volume_MA 생략)
+        dtype: 결과 배열 자료형 (계산은 float64 로 하고 결과만 변환, 예: np.float32)
+    Returns:
+        dict: 지표 이름(컬럼명과 동일) -> close 와 같은 모양의 배열
+    """
+    columns = {'Close': close}
+    if volume is not None:
+        columns['Volume'] = volume
+    names = [name for name in INDICATOR_COLUMNS if name != 'Volume_MA' or volume is not None]
+    return IndicatorPipeline(columns, dtype).compute(names)
+
+def add_technical_indicators_panel(close, volume=None):
+    """
+    여러 마켓의 지표를 한 번에 계산 (마켓별 add_technical_indicators 반복 호출 대체)
+    Args:
+        close: (날짜 x 마켓) 종가 데이터프레임
+        volume: (날짜 x 마켓) 거래량 데이터프레임 (없으면 Volume, Volume_MA 생략)
+    Returns:
+        DataFrame: (항목, 마켓) MultiIndex 컬럼의 패널
+        - panel['RSI'] : (날짜 x 마켓) RSI
+        - panel.xs('KRW-BTC', axis=1, level=1) : 해당 마켓의 add_technical_indicators 결과와 같은 컬럼 (상장 전 구간은 NaN)
+        - panel.to_numpy().reshape(len(panel), -1, len(close.columns)) : (날짜, 항목, 마켓) 3D 배열
+    """
+    close_values = close.to_numpy(dtype=np.float64)
+    fields = {'Close': close_values}
+    volume_values = None
+    if volume is not None:
+        volume_values = volume.reindex(index=close.index, columns=close.columns).to_numpy(dtype=np.float64)
+        fields['Volume'] = volume_values
+
+    indicators = calculate_indicator_arrays(close_values, volume_values)
+    fields.update((name, indicators[name]) for name in INDICATOR_COLUMNS if name in indicators)
+
+    columns = pd.MultiIndex.from_product([list(fields), close.columns])
+    return pd.DataFrame(np.concatenate(list(fields.values()), axis=1), index=close.index, columns=columns)
+
+def indicator_ready_mask(indicators):
+    """모든 지표가 계산된 위치 (데이터프레임의 dropna 로 남는 행과 같음)"""
+    ready = None
+    for values in indicators.values():
+        ready = ~np.isnan(values) if ready is None else ready & ~np.isnan(values)
+    return ready
+
+def find_buy_sell_signal_arrays(close, indicators, rsi_oversold=30, rsi_overbought=70):
+    """
+    find_optimal_buy_sell_signals 와 같은 조건을 배열에 적용
+    Returns:
+        tuple: (매수 신호, 매도 신호) bool 배열
+    """
+    def prev(values):
+        shifted = np.full(values.shape, np.nan)
+        shifted[1:] = values[:-1]
+        return shifted
+
+    rsi, macd, macd_signal = indicators['RSI'], indicators['MACD'], indicators['MACD_Signal']
+    buy = (
+        ((rsi < rsi_oversold) & (macd > macd_signal) & (prev(macd) <= prev(macd_signal))) |
+        ((close < indicators['BB_Lower']) & (prev(close) >= prev(indicators['BB_Lower'])))
+    )
+    sell = (
+        ((rsi > rsi_overbought) & (macd < macd_signal) & (prev(macd) >= prev(macd_signal))) |
+        (close > indicators['BB_Upper'])
+    )
+    return buy, sell
+
 # ===========================================================================================
 # 3. 최적 매매 타이밍 분석 함수
 # ===========================================================================================
 
-def find_optimal_buy_sell_signals(data):
+def find_optimal_buy_sell_signals(data, rsi_oversold=30, rsi_overbought=70, buy_filter=None, sell_filter=None):
     """
     RSI, MACD를 기반으로 최적 매수/매도 신호 탐지
     매수 신호:
-    - RSI < 30 (과매도) 그리고 MACD 골든 크로스
+    - RSI < rsi_oversold (과매도, 기본 30) 그리고 MACD 골든 크로스
     - 볼린저 밴드 하단 돌파 후 반등
     매도 신호:
-    - RSI > 70 (과매수) 그리고 MACD 데드 크로스
+    - RSI > rsi_overbought (과매수, 기본 70) 그리고 MACD 데드 크로스
     - 볼린저 밴드 상단 도달
+    buy_filter / sell_filter: 추가 확인 조건 (data 와 같은 인덱스의 bool Series, 예: 다른 주기 지표)
     """
     df = data.copy()
     # 매수 신호
     df['Buy_Signal'] = 0
     buy_condition = (
-        ((df['RSI'] < 30) & (df['MACD'] > df['MACD_Signal']) & (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1))) |
+        ((df['RSI'] < rsi_oversold) & (df['MACD'] > df['MACD_Signal']) & (df['MACD'].shift(1) <= df['MACD_Signal'].shift(1))) |
         ((df['Close'] < df['BB_Lower']) & (df['Close'].shift(1) >= df['BB_Lower'].shift(1)))
     )
+    if buy_filter is not None:
+        buy_condition &= buy_filter
     df.loc[buy_condition, 'Buy_Signal'] = 1
     
     # 매도 신호
     df['Sell_Signal'] = 0
     sell_condition = (
-        ((df['RSI'] > 70) & (df['MACD'] < df['MACD_Signal']) & (df['MACD'].shift(1) >= df['MACD_Signal'].shift(1))) |
+        ((df['RSI'] > rsi_overbought) & (df['MACD'] < df['MACD_Signal']) & (df['MACD'].shift(1) >= df['MACD_Signal'].shift(1))) |
         (df['Close'] > df['BB_Upper'])
     )
+    if sell_filter is not None:
+        sell_condition &= sell_filter
     df.loc[sell_condition, 'Sell_Signal'] = 1
 
     return df
 
+def find_hindsight_optimal_trades(data, max_trades=None, fee_rate=0.0):
+    """
+    사후적으로 가능한 최대 수익 매매 (전략 성과의 상한선)
+    종가로만 전액 매수/매도하는 long 왕복 거래를 최대 max_trades 번 수행할 때의
+    복리 수익률과 매매 구간을 계산한다.
+    - max_trades 지정: 상승 / 하락 구간을 가장 작은 것부터 합치거나 지우는 O(n log n) 탐욕법
+    - max_trades=None: 횟수 제한 없음, O(n)
+    Args:
+        data: 'Close' 컬럼을 가진 데이터프레임
+        max_trades: 최대 왕복 거래 횟수 (None이면 제한 없음)
+        fee_rate: 매수/매도 시 각각 적용되는 수수료율 (예: 0.0005)
+    Returns:
+        dict: {'return': 수익률(%), 'num_trades': 거래 횟수, 'trades': [(매수일, 매도일), ...]}
+    """
+    close = data['Close'].to_numpy(dtype=np.float64)
+    n = len(close)
+    if n < 2 or (max_trades is not None and max_trades < 1):
+        return {'return': 0.0, 'num_trades': 0, 'trades': []}
+
+    # 복리 수익을 합으로 다루기 위해 로그 가격 사용
+    log_price = np.log(close)
+    fee_cost = -2 * np.log1p(-fee_rate)
+
+    if max_trades is None:
+        pairs = _optimal_trades_unlimited(log_price, fee_cost)
+    else:
+        pairs = _optimal_trades_limited(log_price, fee_cost, max_trades)
+
+    buys = np.array([buy for buy, _ in pairs], dtype=np.int64)
+    sells = np.array([sell for _, sell in pairs], dtype=np.int64)
+    log_profit = np.sum(log_price[sells] - log_price[buys] - fee_cost)
+    return {
+        'return': float(np.expm1(log_profit) * 100),
+        'num_trades': len(pairs),
+        'trades': list(zip(data.index[buys], data.index[sells]))
+    }
+
+def _optimal_trades_limited(log_price, fee_cost, max_trades):
+    """
+    최대 max_trades 번 왕복 거래의 최적 (매수, 매도) 위치 목록 (O(n log n), 메모리 O(n))
+    저점 / 고점이 번갈아 오는 꺾이는 점 사이의 구간(상승 = 거래, 하락 = 거래 사이)에서
+    값(양 끝 로그 가격 차이)이 가장 작은 구간의 양 끝점을 하나씩 지운다.
+    양 끝 거래면 그 거래가 빠지고, 가운데 구간이면 이웃 두 구간과 합쳐져 (거래를 빼거나 두 거래를 하나로 합침)
+    어느 쪽이든 거래가 하나 줄고 수익이 그 값만큼 준다. 지우는 값은 점점 커지므로
+    거래 수가 max_trades 이하이고 가장 작은 구간이 수수료보다 클 때 멈추면 최적이다.
+    """
+    rising = np.diff(log_price) > 0
+    edges = np.diff(rising.astype(np.int8), prepend=0, append=0)
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+    points = np.empty(2 * len(starts), dtype=np.int64)
+    points[0::2], points[1::2] = starts, ends
+
+    # 1단계 (벡터 연산): 이웃보다 작은 구간은 더 작은 구간이 먼저 지워져도 값이 그대로라
+    # 탐욕법이 언젠가 반드시 지우는 구간(수수료 이하, 또는 남은 삭제 횟수 안에 드는 순위)이면 한꺼번에 지워도 결과가 같다
+    while len(points) > 2:
+        values = np.abs(np.diff(log_price[points]))
+        padded = np.concatenate([[np.inf], values, [np.inf]])
+        removable = (values < padded[:-2]) & (values < padded[2:])
+        bound = values <= fee_cost
+        excess = len(points) // 2 - max_trades
+        if excess >= len(values):
+            bound[:] = True
+        elif excess > 0:
+            # i 번째로 지우는 값은 지금 값 중 i 번째로 작은 값 이상 -> 자기 이하 값이 excess 개 이하면 반드시 지워짐
+            bound |= values < np.partition(values, excess)[excess]
+        removable &= bound
+        segments = np.flatnonzero(removable)
+        if len(segments) == 0:
+            break
+        keep = np.ones(len(points), dtype=bool)
+        keep[segments] = False
+        keep[segments + 1] = False
+        points = points[keep]
+        if len(segments) < max(len(values) // 100, 16):
+            # 남은 구간이 적게 줄어들면 힙으로 마무리
+            break
+    if len(points) == 0:
+        return []
+    return _reduce_turning_points(log_price, points, fee_cost, max_trades)
+
+def _reduce_turning_points(log_price, points, fee_cost, max_trades):
+    """꺾이는 점 사이 구간을 가장 작은 것부터 하나씩 지우는 힙 탐욕법 (_optimal_trades_limited 의 2단계)"""
+    size = len(points) - 1
+    trades = len(points) // 2
+    prices = log_price.tolist()
+    left, right = points[:-1].tolist(), points[1:].tolist()
+    value = np.abs(np.diff(log_price[points])).tolist()
+    is_gain = [node % 2 == 0 for node in range(size)]
+    prev = list(range(-1, size - 1))
+    next_ = list(range(1, size + 1))
+    next_[-1] = -1
+    alive = [True] * size
+    version = [0] * size
+    heap = [(value[node], node, 0) for node in range(size)]
+    heapq.heapify(heap)
+    head = 0
+
+    while heap:
+        current, node, node_version = heap[0]
+        if not alive[node] or version[node] != node_version:
+            heapq.heappop(heap)
+            continue
+        if trades <= max_trades and current > fee_cost:
+            break
+        heapq.heappop(heap)
+        before, after = prev[node], next_[node]
+        if before == -1 or after == -1:
+            # 양 끝 거래(하락 구간은 항상 두 거래 사이)는 옆 하락 구간과 함께 삭제
+            alive[node] = False
+            if after != -1:
+                alive[after] = False
+                head = next_[after]
+                if head != -1:
+                    prev[head] = -1
+            elif before != -1:
+                alive[before] = False
+                next_[prev[before]] = -1
+        else:
+            # 가운데 구간은 이웃 두 구간과 합침 (같은 노드 번호 재사용)
+            alive[before] = alive[after] = False
+            left[node], right[node] = left[before], right[after]
+            value[node] = abs(prices[right[node]] - prices[left[node]])
+            is_gain[node] = is_gain[before]
+            prev[node], next_[node] = prev[before], next_[after]
+            if prev[node] == -1:
+                head = node
+            else:
+                next_[prev[node]] = node
+            if next_[node] != -1:
+                prev[next_[node]] = node
+            version[node] += 1
+            heapq.heappush(heap, (value[node], node, version[node]))
+        trades -= 1
+        if trades == 0:
+            return []
+
+    pairs = []
+    node = head
+    while node != -1:
+        if is_gain[node]:
+            pairs.append((left[node], right[node]))
+        node = next_[node]
+    return pairs
+
+def _optimal_trades_unlimited(log_price, fee_cost):
+    """거래 횟수 제한이 없을 때의 최적 (매수, 매도) 위치 목록"""
+    if fee_cost == 0:
+        # 수수료가 없으면 모든 상승 구간을 취하는 것이 최적
+        rising = np.diff(log_price) > 0
+        edges = np.diff(rising.astype(np.int8), prepend=0, append=0)
+        return list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+
+    # 수수료가 있으면 현금/보유 2상태 DP (보유 상태의 진입 시점을 함께 추적)
+    prices = log_price.tolist()
+    cash, cash_trades = 0.0, ()
+    hold, hold_buy, hold_trades = -prices[0], 0, ()
+    for t in range(1, len(prices)):
+        price = prices[t]
+        if hold + price - fee_cost > cash:
+            new_cash, new_cash_trades = hold + price - fee_cost, (hold_trades, (hold_buy, t))
+        else:
+            new_cash, new_cash_trades = cash, cash_trades
+        if cash - price > hold:
+            hold, hold_buy, hold_trades = cash - price, t, cash_trades
+        cash, cash_trades = new_cash, new_cash_trades
+
+    # 연결 리스트 형태의 거래 기록을 순서대로 펼침
+    pairs = []
+    while cash_trades:
+        cash_trades, pair = cash_trades
+        pairs.append(pair)
+    return pairs[::-1]
+
 def calculate_uptrend_probability(data):
     """
     기술적 지표를 기반으로 상승 확률을 계산
@@ -308,6 +794,84 @@ def calculate_uptrend_probability(data):
 
     return round(total_probability, 2)
 
+def calculate_uptrend_probability_series(data):
+    """
+    calculate_uptrend_probability 의 벡터화 버전 - 모든 봉에 대해 상승 확률을 한 번에 계산
+    i번째 값은 data.iloc[:i + 1] 로 calculate_uptrend_probability 를 호출한 결과와 같다.
+    add_technical_indicators_panel 의 패널을 넣으면 모든 마켓을 한 번에 계산한다.
+
+    Returns:
+        Series: 봉별 상승 확률 (0-100%), 패널 입력 시 (날짜 x 마켓) DataFrame
+    """
+    close = data['Close']
+    total = np.zeros(close.shape)
+    has_score = np.zeros(close.shape, dtype=bool)
+
+    # 1. RSI 기반 점수 (30점)
+    rsi = data['RSI']
+    rsi_score = np.select(
+        [rsi < 30, rsi < 40, rsi < 50, rsi < 60, rsi < 70],
+        [80, 70, 55, 50, 45],
+        default=30
+    )
+    rsi_valid = rsi.notna()
+    total += np.where(rsi_valid, rsi_score * 0.3, 0.0)
+    has_score |= rsi_valid
+
+    # 2. MACD 기반 점수 (25점)
+    hist = data['MACD_Hist']
+    prev_hist = hist.shift(1)
+    golden = data['MACD'] > data['MACD_Signal']
+    macd_score = np.select(
+        [golden & prev_hist.notna() & (hist > prev_hist), golden,
+         ~golden & prev_hist.notna() & (hist < prev_hist)],
+        [85, 75, 25],
+        default=35
+    )
+    macd_valid = data['MACD'].notna() & data['MACD_Signal'].notna()
+    total += np.where(macd_valid, macd_score * 0.25, 0.0)
+    has_score |= macd_valid
+
+    # 3. 이동평균선 기반 점수 (20점)
+    above_20 = close > data['SMA_20']
+    above_50 = close > data['SMA_50']
+    ma_score = np.select(
+        [above_20 & above_50 & (data['SMA_20'] > data['SMA_50']), above_20 & above_50, above_20, above_50],
+        [85, 65, 60, 45],
+        default=30
+    )
+    ma_valid = data['SMA_20'].notna() & data['SMA_50'].notna()
+    total += np.where(ma_valid, ma_score * 0.2, 0.0)
+    has_score |= ma_valid
+
+    # 4. 볼린저 밴드 기반 점수 (15점)
+    bb_position = (close - data['BB_Lower']) / (data['BB_Upper'] - data['BB_Lower'])
+    bb_score = np.select(
+        [bb_position < 0.2, bb_position < 0.4, bb_position < 0.6, bb_position < 0.8],
+        [75, 65, 50, 40],
+        default=30
+    )
+    bb_valid = data['BB_Upper'].notna() & data['BB_Lower'].notna() & data['BB_Middle'].notna()
+    total += np.where(bb_valid, bb_score * 0.15, 0.0)
+    has_score |= bb_valid
+
+    # 5. 최근 추세 기반 점수 (10점) - 최근 5봉 중 상승한 봉 수
+    positive_days = (close.pct_change() > 0).astype(np.int8).rolling(window=4).sum()
+    trend_score = np.select(
+        [positive_days >= 4, positive_days >= 3, positive_days >= 2],
+        [75, 60, 50],
+        default=35
+    )
+    trend_valid = (np.arange(len(data)) >= 4).reshape((-1,) + (1,) * (close.ndim - 1))
+    total += np.where(trend_valid, trend_score * 0.1, 0.0)
+    has_score |= trend_valid
+
+    # 점수가 하나도 없는 봉은 기본값, 0-100 범위로 제한
+    total = np.where(has_score, total, 50.0).clip(0, 100).round(2)
+    if close.ndim == 2:
+        return pd.DataFrame(total, index=close.index, columns=close.columns)
+    return pd.Series(total, index=close.index)
+
 # ===========================================================================================
 # 4. LSTM 모델 구축 및 학습
 # ===========================================================================================
@@ -394,28 +958,36 @@ class CryptoBacktester:
     
     def run_backtest(self, data):
         """백테스팅 실행"""
+        return self.run_backtest_arrays(
+            data.index, data['Close'].to_numpy(), data['Buy_Signal'].to_numpy(), data['Sell_Signal'].to_numpy()
+        )
+
+    def run_backtest_arrays(self, dates, close, buy_signal, sell_signal):
+        """
+        배열로 백테스팅 실행 (run_backtest 와 같은 규칙, 신호가 있는 봉만 순회)
+        Args:
+            dates: 봉 시각 (DatetimeIndex 등)
+            close: 종가 배열
+            buy_signal / sell_signal: 매수 / 매도 신호 배열 (0/1 또는 bool)
+        """
+        if len(close) == 0:
+            return pd.DataFrame(self.trades)
         position = None  # 'long' or None
-        for idx in range(len(data)):
-            row = data.iloc[idx]
-            date = data.index[idx]
-            price = row['Close']
-            
+        for idx in np.flatnonzero((buy_signal == 1) | (sell_signal == 1)):
             # 매수 신호
-            if row['Buy_Signal'] == 1 and position is None:
-                self.buy(date, price, amount_ratio=1.0)
+            if buy_signal[idx] == 1 and position is None:
+                self.buy(dates[idx], float(close[idx]), amount_ratio=1.0)
                 position = 'long'
-            
+
             # 매도 신호
-            elif row['Sell_Signal'] == 1 and position == 'long':
-                self.sell(date, price, amount_ratio=1.0)
+            elif sell_signal[idx] == 1 and position == 'long':
+                self.sell(dates[idx], float(close[idx]), amount_ratio=1.0)
                 position = None
-        
+
         # 마지막에 포지션이 있으면 청산
         if position == 'long':
-            last_date = data.index[-1]
-            last_price = data.iloc[-1]['Close']
-            self.sell(last_date, last_price, amount_ratio=1.0)
-        
+            self.sell(dates[-1], float(close[-1]), amount_ratio=1.0)
+
         return pd.DataFrame(self.trades)
     
     def calculate_performance_metrics(self, data):
@@ -431,7 +1003,8 @@ class CryptoBacktester:
         # 거래 횟수
         num_trades = len(trades_df)
         # Buy & Hold 수익률
-        buy_hold_return = ((data.iloc[-1]['Close'] - data.iloc[0]['Close']) / data.iloc[0]['Close']) * 100
+        first_close, last_close = float(data['Close'].iloc[0]), float(data['Close'].iloc[-1])
+        buy_hold_return = ((last_close - first_close) / first_close) * 100
         
         # 승률 계산
         buy_trades = trades_df[trades_df['Type'] == 'BUY']
@@ -458,7 +1031,7 @@ class CryptoBacktester:
         
         # Sharpe Ratio 계산 (간소화 버전)
         returns = trades_df['Total_Value'].pct_change().dropna()
-        if len(returns) > 0:
+        if len(returns) > 1:
             sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
         else:
             sharpe_ratio = 0
@@ -466,6 +1039,11 @@ class CryptoBacktester:
         # 상승 확률 계산
         uptrend_probability = calculate_uptrend_probability(data)
 
+        # 같은 거래 횟수로 사후적으로 가능한 최대 수익률 대비 달성률
+        oracle = find_hindsight_optimal_trades(data, max_trades=max(len(buy_trades), 1))
+        oracle_return = oracle['return']
+        oracle_efficiency = (total_return / oracle_return * 100) if oracle_return > 0 else 0
+
         metrics = {
             '초기 자본': self.initial_capital,
             '최종 자산': final_value,
@@ -475,7 +1053,9 @@ class CryptoBacktester:
             '승률': win_rate,
             '최대 낙폭(MDD)': max_dd,
             'Sharpe Ratio': sharpe_ratio,
-            '상승 확률': uptrend_probability
+            '상승 확률': uptrend_probability,
+            '최대 가능 수익률': oracle_return,
+            '최대 대비 달성률': oracle_efficiency
         }
         return metrics
 
@@ -485,7 +1065,15 @@ class CryptoBacktester:
 
 def create_chart_image(data, trades_df=None):
     """차트를 이미지로 생성하고 base64로 인코딩"""
-    fig, axes = plt.subplots(3, 1, figsize=(15, 10))
+    return base64.b64encode(create_chart_png(data, trades_df)).decode('utf-8')
+
+def create_chart_png(data, trades_df=None):
+    """
+    가격 / RSI / MACD 차트 PNG 바이트
+    pyplot 의 전역 현재 figure 를 쓰지 않는 Figure 객체로 그려 여러 스레드에서 동시에 호출해도 서로 섞이지 않음
+    """
+    fig = Figure(figsize=(15, 10))
+    axes = fig.subplots(3, 1)
     
     # 가격 차트
     axes[0].plot(data.index, data['Close'], label='Close Price', linewidth=1)
@@ -523,28 +1111,29 @@ def create_chart_image(data, trades_df=None):
     axes[2].legend()
     axes[2].grid(True, alpha=0.3)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
-    # 이미지를 base64로 인코딩
+    # PNG 로 저장
     img_buffer = io.BytesIO()
-    plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-    img_buffer.seek(0)
-    img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
-    plt.close()
+    fig.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
     
-    return img_base64
+    return img_buffer.getvalue()
 
-def generate_sample_data(days=500):
-    """샘플 데이터 생성 (API 호출 실패 시 사용)"""
-    dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-    np.random.seed(42)
-    close_prices = 50000000 + np.cumsum(np.random.randn(days) * 500000)
+def generate_sample_data(days=500, freq='D', seed=42):
+    """
+    샘플 데이터 생성 (API 호출 실패 시 사용, freq 로 분봉 등 생성 가능)
+    전역 난수 상태를 바꾸지 않도록 호출마다 독립된 난수 생성기를 사용한다.
+    대용량 / 다중 자산 / 국면 전환 데이터는 synthetic_data 모듈 사용
+    """
+    dates = pd.date_range(end=datetime.now(), periods=days, freq=freq, normalize=True)
+    rng = np.random.RandomState(seed)
+    close_prices = 50000000 + np.cumsum(rng.randn(days) * 500000)
     data = pd.DataFrame({
-        'Open': close_prices * (1 + np.random.randn(days) * 0.01),
-        'High': close_prices * (1 + abs(np.random.randn(days)) * 0.02),
-        'Low': close_prices * (1 - abs(np.random.randn(days)) * 0.02),
+        'Open': close_prices * (1 + rng.randn(days) * 0.01),
+        'High': close_prices * (1 + abs(rng.randn(days)) * 0.02),
+        'Low': close_prices * (1 - abs(rng.randn(days)) * 0.02),
         'Close': close_prices,
-        'Volume': np.random.randint(100, 1000, days)
+        'Volume': rng.randint(100, 1000, days)
     }, index=dates)
     return data
 
@@ -0,0 +1,424 @@
+"""
+로컬 가짜 거래소 서버
+Bithumb 캔들 / 마켓 목록 / 현재가 / 체결 내역과 업비트 계정 API 를 같은 형식으로 흉내 내는 서버
+녹화된 1분봉(CandleStore 디렉토리) 또는 시드 고정 합성 데이터를 제공하고
+(현재가는 조회할 때마다 한 번 체결되는 랜덤 워크, 체결 내역은 초당 trade_rate 건 정도로 쌓이는 랜덤 워크),
+지연 시간 / 요청 한도 / 오류 주입을 설정할 수 있어 네트워크 없이 수집 / 프록시 / 캐시 성능을 재현 가능하게 측정한다.
+
+실행 예:
+    python fake_exchange.py --port 5900 --latency-ms 50 --rate-limit 10 --error-rate 0.01
+    BITHUMB_API_BASE=http://127.0.0.1:5900 UPBIT_API_BASE=http://127.0.0.1:5900 python app_fastapi.py
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import socket
+import asyncio
+import argparse
+import threading
+import subprocess
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any
+
+import numpy as np
+import pandas as pd
+import requests
+from fastapi import FastAPI, Request, Query
+from fastapi.responses import JSONResponse
+
+from candle_store import CandleStore, INTERVAL_SECONDS, resample_ohlcv
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+MAX_CANDLE_COUNT = 200
+MAX_TRADE_COUNT = 500
+
+
+def _error(status_code: int, name: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """거래소 형식의 오류 응답"""
+    return JSONResponse({'error': {'name': name, 'message': message}}, status_code=status_code, headers=headers)
+
+
+def synthetic_candles(market: str, count: int, interval_seconds: int, end: pd.Timestamp, seed: int = 0) -> pd.DataFrame:
+    """
+    마켓 / 시드별로 항상 같은 값이 나오는 합성 OHLCV (end 직전 봉까지 count 개)
+
+    Args:
+        market: 마켓 코드 (난수 스트림 구분용)
+        count: 캔들 개수
+        interval_seconds: 캔들 주기 (초)
+        end: 마지막 캔들 다음 시각
+        seed: 서버 시드
+    """
+    rng = np.random.default_rng([seed, zlib.crc32(market.encode()), interval_seconds])
+    volatility = 0.02 * np.sqrt(interval_seconds / 86400)
+    log_returns = rng.normal(0, volatility, count)
+    close = 50000000 * np.exp(np.cumsum(log_returns)) * (1 + zlib.crc32(market.encode()) % 100 / 100)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, volatility / 2, (2, count)))
+    index = pd.date_range(end=end - pd.Timedelta(seconds=interval_seconds), periods=count,
+                          freq=pd.Timedelta(seconds=interval_seconds), name='Date')
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread[0]),
+        'Low': np.minimum(open_, close) * (1 - spread[1]),
+        'Close': close,
+        'Volume': rng.lognormal(2, 1, count) * interval_seconds / 60,
+    }, index=index)
+
+
+class FakeExchange:
+    """가짜 거래소 상태 (캔들 데이터, 요청 한도, 오류 주입)"""
+
+    def __init__(self, markets: List[Dict[str, Any]], accounts: List[Dict[str, Any]],
+                 candle_store_dir: Optional[str] = None, minute_history: int = 100000, day_history: int = 2000,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, rate_limit: Optional[float] = None,
+                 burst: Optional[int] = None, error_rate: float = 0.0, trade_rate: float = 5.0, seed: int = 0):
+        """
+        Args:
+            markets: 마켓 목록 (Bithumb /v1/market/all 형식)
+            accounts: 계정 잔고 목록 (업비트 /v1/accounts 형식)
+            candle_store_dir: 녹화된 1분봉 CandleStore 디렉토리 (없는 마켓은 합성 데이터)
+            minute_history: 합성 분봉 데이터 길이 (1분봉 개수)
+            day_history: 합성 일봉 데이터 길이
+            latency_ms / jitter_ms: 응답 지연 시간과 무작위 편차 (밀리초)
+            rate_limit / burst: 클라이언트별 초당 요청 수와 버스트 크기 (None 이면 제한 없음)
+            error_rate: 500 오류를 반환할 확률
+            trade_rate: 마켓별 초당 평균 체결 수 (체결 내역 API)
+            seed: 합성 데이터 / 지연 / 오류 주입 난수 시드
+        """
+        self.markets = markets
+        self.accounts = accounts
+        self.recorded = CandleStore(None, directory=candle_store_dir) if candle_store_dir else None
+        self.minute_history = minute_history
+        self.day_history = day_history
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.burst = burst or (int(rate_limit) if rate_limit else 0)
+        self.error_rate = error_rate
+        self.trade_rate = trade_rate
+        self.seed = seed
+        # 서버 시작 시각(KST, 분 단위)까지의 데이터 제공
+        self.anchor = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None).floor('min')
+        self.rng = np.random.default_rng(seed)
+        self.stats = {'requests': 0, 'rate_limited': 0, 'injected_errors': 0}
+        self._candles: Dict[Any, pd.DataFrame] = {}
+        self._buckets: Dict[str, List[float]] = {}
+        self._tickers: Dict[str, Dict[str, Any]] = {}
+        self._trades: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def candles(self, market: str, interval: str) -> Optional[pd.DataFrame]:
+        """마켓 / 주기별 전체 캔들 (녹화 데이터 우선, 처음 요청 시 생성 후 캐시)"""
+        if not any(item['market'] == market for item in self.markets):
+            return None
+        key = (market, interval)
+        with self._lock:
+            if key not in self._candles:
+                recorded = self.recorded.get(market, interval) if self.recorded else None
+                if recorded is not None and len(recorded) > 0:
+                    self._candles[key] = recorded
+                elif interval == '1d':
+                    end = self.anchor.floor('D') + pd.Timedelta(days=1)
+                    self._candles[key] = synthetic_candles(market, self.day_history, 86400, end, self.seed)
+                else:
+                    minutes = self._candles.get((market, '1m'))
+                    if minutes is None:
+                        minutes = synthetic_candles(market, self.minute_history, 60,
+                                                    self.anchor + pd.Timedelta(minutes=1), self.seed)
+                        self._candles[(market, '1m')] = minutes
+                    self._candles[key] = minutes if interval == '1m' else resample_ohlcv(minutes, interval)
+            return self._candles[key]
+
+    def ticker(self, market: str) -> Optional[Dict[str, Any]]:
+        """
+        현재가 (Bithumb / 업비트 /v1/ticker 형식)
+        마지막 1분봉 종가에서 시작해 조회할 때마다 한 번 체결되는 랜덤 워크
+        """
+        if market not in self._tickers:
+            minutes = self.candles(market, '1m')
+            if minutes is None:
+                return None
+            day_open = float(self.candles(market, '1d')['Open'].iloc[-1])
+            close = float(minutes['Close'].iloc[-1])
+            with self._lock:
+                self._tickers.setdefault(market, {
+                    'market': market, 'opening_price': day_open, 'prev_closing_price': day_open,
+                    'high_price': max(day_open, close), 'low_price': min(day_open, close), 'trade_price': close,
+                    'acc_trade_volume_24h': 0.0, 'acc_trade_price_24h': 0.0,
+                })
+        with self._lock:
+            ticker = self._tickers[market]
+            price = ticker['trade_price'] * float(np.exp(self.rng.normal(0, 0.0005)))
+            volume = float(self.rng.lognormal(-3, 1))
+            now = pd.Timestamp.now(tz='UTC')
+            change_price = price - ticker['prev_closing_price']
+            ticker.update({
+                'trade_date': now.strftime('%Y%m%d'),
+                'trade_time': now.strftime('%H%M%S'),
+                'trade_timestamp': int(now.timestamp() * 1000),
+                'trade_price': price,
+                'high_price': max(ticker['high_price'], price),
+                'low_price': min(ticker['low_price'], price),
+                'change': 'RISE' if change_price > 0 else 'FALL' if change_price < 0 else 'EVEN',
+                'change_price': abs(change_price),
+                'change_rate': abs(change_price) / ticker['prev_closing_price'],
+                'signed_change_price': change_price,
+                'signed_change_rate': change_price / ticker['prev_closing_price'],
+                'trade_volume': volume,
+                'acc_trade_volume_24h': ticker['acc_trade_volume_24h'] + volume,
+                'acc_trade_price_24h': ticker['acc_trade_price_24h'] + volume * price,
+                'timestamp': int(now.timestamp() * 1000),
+            })
+            return dict(ticker)
+
+    def trades(self, market: str, count: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        최근 체결 count 개 (Bithumb / 업비트 /v1/trades/ticks 형식, 최신순)
+        마지막 1분봉 종가에서 시작해 지난 조회 이후 흐른 시간만큼 초당 trade_rate 건 정도의 체결을 만들어 둠
+        """
+        if market not in self._trades:
+            minutes = self.candles(market, '1m')
+            if minutes is None:
+                return None
+            with self._lock:
+                self._trades.setdefault(market, {
+                    'price': float(minutes['Close'].iloc[-1]), 'prev_closing_price': float(minutes['Close'].iloc[-1]),
+                    'timestamp': int(time.time() * 1000) - 1000, 'sequence': 0,
+                    'recent': deque(maxlen=MAX_TRADE_COUNT),
+                })
+        with self._lock:
+            state = self._trades[market]
+            now = int(time.time() * 1000)
+            # 오래 조회하지 않았으면 보관 개수만큼만 만듦
+            start = max(state['timestamp'], now - int(MAX_TRADE_COUNT / max(self.trade_rate, 1e-9) * 1000))
+            size = int(self.rng.poisson(max(now - start, 0) / 1000 * self.trade_rate))
+            timestamps = np.sort(self.rng.integers(start + 1, now + 1, size)) if size and now > start else []
+            prices = state['price'] * np.exp(np.cumsum(self.rng.normal(0, 0.0002, len(timestamps))))
+            volumes = self.rng.lognormal(-3, 1, len(timestamps))
+            sides = self.rng.random(len(timestamps)) < 0.5
+            for timestamp, price, volume, ask in zip(timestamps, prices, volumes, sides):
+                state['sequence'] += 1
+                traded_at = pd.Timestamp(int(timestamp), unit='ms')
+                state['recent'].append({
+                    'market': market,
+                    'trade_date_utc': traded_at.strftime('%Y-%m-%d'),
+                    'trade_time_utc': traded_at.strftime('%H:%M:%S'),
+                    'timestamp': int(timestamp),
+                    'trade_price': float(price),
+                    'trade_volume': float(volume),
+                    'prev_closing_price': state['prev_closing_price'],
+                    'change_price': float(price) - state['prev_closing_price'],
+                    'ask_bid': 'ASK' if ask else 'BID',
+                    'sequential_id': int(timestamp) * 1000 + state['sequence'] % 1000,
+                })
+            if len(timestamps):
+                state['price'] = float(prices[-1])
+            state['timestamp'] = now
+            recent = list(state['recent'])
+        return recent[::-1][:max(1, min(count, MAX_TRADE_COUNT))]
+
+    def take_token(self, client: str) -> bool:
+        """클라이언트별 토큰 버킷에서 토큰 하나 사용 (한도 초과 시 False)"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(client, [float(self.burst), now])
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate_limit)
+            allowed = tokens >= 1
+            self._buckets[client] = [tokens - 1 if allowed else tokens, now]
+        return allowed
+
+    def next_delay(self) -> float:
+        """이번 요청에 적용할 지연 시간 (초)"""
+        with self._lock:
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def inject_error(self) -> bool:
+        with self._lock:
+            return bool(self.error_rate) and self.rng.random() < self.error_rate
+
+
+def _to_bithumb_candles(market: str, candles: pd.DataFrame, unit: Optional[int]) -> List[Dict[str, Any]]:
+    """OHLCV 데이터프레임을 Bithumb 캔들 응답 형식(최신순)으로 변환"""
+    rows = []
+    for date, row in zip(candles.index[::-1], candles.iloc[::-1].itertuples(index=False)):
+        item = {
+            'market': market,
+            'candle_date_time_utc': (date - pd.Timedelta(hours=9)).strftime('%Y-%m-%dT%H:%M:%S'),
+            'candle_date_time_kst': date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'opening_price': float(row.Open),
+            'high_price': float(row.High),
+            'low_price': float(row.Low),
+            'trade_price': float(row.Close),
+            'timestamp': int((date - pd.Timedelta(hours=9)).timestamp() * 1000),
+            'candle_acc_trade_price': float(row.Close * row.Volume),
+            'candle_acc_trade_volume': float(row.Volume),
+        }
+        if unit:
+            item['unit'] = unit
+        rows.append(item)
+    return rows
+
+
+def create_fake_exchange_app(exchange: FakeExchange) -> FastAPI:
+    """가짜 거래소 FastAPI 앱 생성"""
+    app = FastAPI(title="Fake Exchange", version="1.0.0")
+    app.state.exchange = exchange
+
+    @app.middleware('http')
+    async def simulate_network(request: Request, call_next):
+        """지연 시간 / 요청 한도 / 오류 주입 적용"""
+        exchange.stats['requests'] += 1
+        delay = exchange.next_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if request.url.path.startswith('/v1/'):
+            client = request.client.host if request.client else ''
+            if not exchange.take_token(client):
+                exchange.stats['rate_limited'] += 1
+                retry_after = f'{1 / exchange.rate_limit:.3f}'
+                return _error(429, 'too_many_requests', 'Too many requests', {'Retry-After': retry_after})
+            if exchange.inject_error():
+                exchange.stats['injected_errors'] += 1
+                return _error(500, 'internal_server_error', 'Injected error')
+        return await call_next(request)
+
+    def candle_response(market: str, interval: str, count: int, to: Optional[str], unit: Optional[int]):
+        candles = exchange.candles(market, interval)
+        if candles is None:
+            return _error(404, 'invalid_market', f'Unknown market: {market}')
+        count = max(1, min(count, MAX_CANDLE_COUNT))
+        # to 는 KST 기준, 해당 시각 이전(미포함) 캔들만 반환
+        end = candles.index.searchsorted(pd.Timestamp(to), side='left') if to else len(candles)
+        return _to_bithumb_candles(market, candles.iloc[max(end - count, 0):end], unit)
+
+    @app.get('/v1/candles/minutes/{unit}')
+    async def get_minute_candles(unit: int, market: str, count: int = 1, to: Optional[str] = None):
+        interval = next((key for key, seconds in INTERVAL_SECONDS.items() if seconds == unit * 60), None)
+        if interval is None or interval == '1d':
+            return _error(400, 'invalid_unit', f'Unsupported unit: {unit}')
+        return await asyncio.to_thread(candle_response, market, interval, count, to, unit)
+
+    @app.get('/v1/candles/days')
+    async def get_day_candles(market: str, count: int = 1, to: Optional[str] = None):
+        return await asyncio.to_thread(candle_response, market, '1d', count, to, None)
+
+    @app.get('/v1/market/all')
+    async def get_markets(isDetails: bool = Query(False)):
+        return exchange.markets
+
+    def ticker_response(markets: str):
+        tickers = [exchange.ticker(code.strip()) for code in markets.split(',') if code.strip()]
+        if not tickers or any(ticker is None for ticker in tickers):
+            return _error(404, 'not_found', 'Code not found')
+        return tickers
+
+    @app.get('/v1/ticker')
+    async def get_ticker(markets: str):
+        return await asyncio.to_thread(ticker_response, markets)
+
+    @app.get('/v1/trades/ticks')
+    async def get_trades(market: str, count: int = 1):
+        trades = await asyncio.to_thread(exchange.trades, market, count)
+        if trades is None:
+            return _error(404, 'invalid_market', f'Unknown market: {market}')
+        return trades
+
+    @app.get('/v1/accounts')
+    async def get_accounts(request: Request):
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return _error(401, 'jwt_verification', 'Missing authorization token')
+        return exchange.accounts
+
+    @app.get('/stats')
+    async def get_stats():
+        """가짜 거래소 요청 통계 (벤치마크 검증용)"""
+        return exchange.stats
+
+    return app
+
+
+@contextmanager
+def fake_exchange_process(*args: str, host: str = '127.0.0.1', timeout: float = 30.0):
+    """
+    가짜 거래소를 별도 프로세스로 실행하고 base URL 반환 (블록이 끝나면 종료)
+
+    Args:
+        args: main() 명령행 옵션 (예: '--latency-ms', '20')
+        host: 바인드 주소
+        timeout: 서버 시작 대기 시간 (초)
+    """
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        port = sock.getsockname()[1]
+    base = f'http://{host}:{port}'
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--host', host, '--port', str(port), *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                requests.get(f'{base}/stats', timeout=1)
+                break
+            except requests.ConnectionError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('fake exchange server did not start')
+                time.sleep(0.1)
+        yield base
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _load_json(path: str) -> Any:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 가짜 거래소 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5900)
+    parser.add_argument('--markets', default=os.path.join(FIXTURE_DIR, 'markets.json'), help='마켓 목록 JSON')
+    parser.add_argument('--accounts', default=os.path.join(FIXTURE_DIR, 'accounts.json'), help='계정 잔고 JSON')
+    parser.add_argument('--candle-store', default=None, help='녹화된 1분봉 CandleStore 디렉토리')
+    parser.add_argument('--minute-history', type=int, default=100000, help='합성 1분봉 개수')
+    parser.add_argument('--day-history', type=int, default=2000, help='합성 일봉 개수')
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None, help='클라이언트별 초당 요청 수')
+    parser.add_argument('--burst', type=int, default=None)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500 오류 주입 확률')
+    parser.add_argument('--trade-rate', type=float, default=5.0, help='마켓별 초당 평균 체결 수')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    exchange = FakeExchange(
+        _load_json(args.markets), _load_json(args.accounts),
+        candle_store_dir=args.candle_store,
+        minute_history=args.minute_history,
+        day_history=args.day_history,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        trade_rate=args.trade_rate,
+        seed=args.seed
+    )
+
+    import uvicorn
+    print(f"가짜 거래소 서버: http://{args.host}:{args.port}")
+    uvicorn.run(create_fake_exchange_app(exchange), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
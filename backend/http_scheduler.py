@@ -0,0 +1,243 @@
+"""
+거래소 HTTP 요청 스케줄러
+프로세스 전체의 거래소 호출을 호스트별 토큰 버킷으로 제한하고,
+대기 중인 요청은 우선순위(사용자 요청 > 백그라운드 수집) 순으로 내보내며,
+429 / 5xx / 연결 오류는 백오프 후 재시도하는 모듈
+"""
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Tuple, Callable
+from urllib.parse import urlsplit
+
+import requests
+
+from telemetry import EXCHANGE_SECONDS
+
+# 우선순위 (값이 작을수록 먼저 처리)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# 호스트별 (초당 요청 수, 버스트 크기) - 거래소 공개 한도보다 보수적으로 설정
+DEFAULT_HOST_LIMITS = {
+    'api.bithumb.com': (10.0, 10),
+    'api.upbit.com': (8.0, 8),
+}
+DEFAULT_LIMIT = (5.0, 5)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'DELETE')
+
+# 현재 실행 흐름의 요청 우선순위 (스레드 / asyncio.to_thread 마다 독립)
+_current_priority = contextvars.ContextVar('request_priority', default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """블록 안에서 발생하는 스케줄러 요청의 기본 우선순위 지정 (예: 백그라운드 수집)"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """호스트 한 곳의 토큰 버킷 + 우선순위 대기열"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+        self.condition = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, priority: int, sequence: int) -> None:
+        """대기열 맨 앞이 되고 토큰이 생길 때까지 대기"""
+        entry = (priority, sequence)
+        with self.condition:
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self.waiters[0] == entry and self.tokens >= 1 and now >= self.blocked_until:
+                        self.tokens -= 1
+                        return
+                    if self.waiters[0] != entry:
+                        self.condition.wait()
+                    else:
+                        wait = max((1 - self.tokens) / self.rate, self.blocked_until - now)
+                        self.condition.wait(max(wait, 0.001))
+            finally:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+    def available(self) -> float:
+        """지금 바로 쓸 수 있는 토큰 수 (한도 여유)"""
+        with self.condition:
+            now = time.monotonic()
+            self._refill(now)
+            return 0.0 if now < self.blocked_until else self.tokens
+
+    def block(self, seconds: float) -> None:
+        """429 등으로 호스트 전체를 잠시 멈춤"""
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.condition.notify_all()
+
+
+class RequestScheduler:
+    """프로세스 전역 거래소 요청 스케줄러"""
+
+    def __init__(self, host_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 default_limit: Tuple[float, int] = DEFAULT_LIMIT, max_retries: int = 3,
+                 backoff_seconds: float = 0.5, max_backoff_seconds: float = 10.0, timeout: float = 10.0):
+        """
+        Args:
+            host_limits: 호스트 -> (초당 요청 수, 버스트 크기)
+            default_limit: 목록에 없는 호스트의 한도
+            max_retries: 최대 재시도 횟수
+            backoff_seconds: 첫 재시도 대기 시간 (이후 2배씩 증가)
+            max_backoff_seconds: 재시도 대기 시간 상한
+            timeout: 요청 타임아웃 (초)
+        """
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_limits.get(host, self.default_limit)
+                bucket = TokenBucket(rate, burst)
+                self._buckets[host] = bucket
+                self._metrics[host] = {
+                    'requests': 0, 'retries': 0, 'rate_limited': 0, 'errors': 0,
+                    'queue_wait_total': 0.0, 'queue_wait_max': 0.0, 'waiting': 0,
+                }
+            return bucket
+
+    def _record(self, host: str, **values) -> None:
+        with self._lock:
+            metrics = self._metrics[host]
+            for key, value in values.items():
+                if key == 'queue_wait':
+                    metrics['queue_wait_total'] += value
+                    metrics['queue_wait_max'] = max(metrics['queue_wait_max'], value)
+                else:
+                    metrics[key] += value
+
+    def request(self, method: str, url: str, priority: Optional[int] = None,
+                headers_factory: Optional[Callable[[], Dict[str, str]]] = None, **kwargs) -> requests.Response:
+        """
+        호스트 한도 / 우선순위에 맞춰 요청 실행 (requests.request 와 같은 인자)
+        재시도 대상 오류가 계속되면 마지막 응답을 반환하거나 마지막 예외를 다시 발생시킨다.
+
+        Args:
+            method: HTTP 메서드
+            url: 요청 URL
+            priority: 우선순위 (None 이면 request_priority 로 지정된 현재 값)
+            headers_factory: 시도마다 호출해 headers 에 덮어쓸 헤더를 만드는 함수
+                (예: nonce 가 매번 달라야 하는 JWT 인증 헤더, 재시도에 같은 토큰을 다시 보내지 않도록)
+        """
+        method = method.upper()
+        host = urlsplit(url).hostname or ''
+        bucket = self._bucket(host)
+        priority = _current_priority.get() if priority is None else priority
+        kwargs.setdefault('timeout', self.timeout)
+        # 비멱등 요청(POST 주문 등)은 서버가 처리하지 않았음이 확실한 429 만 재시도
+        retryable = RETRY_STATUS_CODES if method in IDEMPOTENT_METHODS else (429,)
+
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            self._record(host, waiting=1)
+            try:
+                bucket.acquire(priority, next(self._sequence))
+            finally:
+                self._record(host, waiting=-1, queue_wait=time.monotonic() - queued_at, requests=1)
+
+            if headers_factory is not None:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **headers_factory()}
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                EXCHANGE_SECONDS.observe(time.perf_counter() - started, host=host, method=method, status='error')
+                self._record(host, errors=1)
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                EXCHANGE_SECONDS.observe(time.perf_counter() - started, host=host, method=method,
+                                         status=response.status_code)
+                if response.status_code not in retryable or attempt >= self.max_retries:
+                    return response
+                delay = self._backoff(attempt)
+                if response.status_code == 429:
+                    self._record(host, rate_limited=1)
+                    delay = max(delay, self._retry_after(response))
+                    bucket.block(delay)
+
+            attempt += 1
+            self._record(host, retries=1)
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_seconds * 2 ** attempt, self.max_backoff_seconds)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        try:
+            return float(response.headers.get('Retry-After', 0))
+        except ValueError:
+            return 0.0
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """호스트별 요청 수, 재시도, 429 횟수, 대기열 대기 시간, 남은 토큰 통계"""
+        with self._lock:
+            result = {}
+            for host, metrics in self._metrics.items():
+                rate, burst = self.host_limits.get(host, self.default_limit)
+                result[host] = {
+                    **metrics,
+                    'queue_wait_avg': metrics['queue_wait_total'] / metrics['requests'] if metrics['requests'] else 0.0,
+                    'rate_per_second': rate,
+                    'burst': burst,
+                    'tokens_available': self._buckets[host].available(),
+                }
+            return result
+
+
+# 백엔드의 모든 거래소 호출이 공유하는 스케줄러
+scheduler = RequestScheduler()
@@ -0,0 +1,297 @@
+"""
+지표 계산 캐시
+같은 마켓 / 주기 / 지표 파라미터의 지표 배열을 메모리 LRU 와 디스크(memory-mapped 바이너리)에 보관하는 모듈
+캐시 항목은 지금까지 본 가장 긴 시계열(시각 / 입력 / 지표 배열)이고, 요청한 캔들이 그 안에 있으면
+해당 구간을 잘라 돌려준다 (시작 시각이 밀린 최근 N개 창도 적중). 뒤에 새 캔들이 붙었거나 마지막 캔들이 바뀌었으면
+같은 앞부분은 그대로 두고 달라진 구간만 계산해 이어 붙인다.
+디스크에는 메모리에서 밀려날 때와 flush() 때만 기록한다 (이어 붙인 항목은 추가된 행만 기록).
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Tuple
+
+import numpy as np
+
+from crypto_simulator import IndicatorPipeline, DEFAULT_INDICATOR_PARAMS
+
+# 이어서 계산할 때 앞쪽에 다시 포함하는 행 수
+# (이동 창 최대 길이보다 길고, EMA 의 시작값 영향이 float64 정밀도 아래로 줄어드는 길이)
+DEFAULT_WARMUP = 1000
+
+TIMESTAMPS_FILE = 'timestamps'
+INPUT_PREFIX = 'input-'
+
+
+def _leading_nan(values: np.ndarray) -> int:
+    """앞쪽 NaN 행 수 (지표 계산에 필요한 이력이 모자란 구간)"""
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def _matching_rows(entry: Dict[str, Any], start: int, timestamps: np.ndarray,
+                   columns: Dict[str, np.ndarray]) -> int:
+    """캐시 항목의 start 행부터와 요청 캔들이 앞에서부터 몇 행 같은지 (시각 / 입력 값 비교, NaN 끼리는 같음)"""
+    rows = min(len(entry['timestamps']) - start, len(timestamps))
+    same = entry['timestamps'][start:start + rows] == timestamps[:rows]
+    for name, values in columns.items():
+        cached = entry['inputs'][name][start:start + rows]
+        requested = values[:rows]
+        same &= (cached == requested) | ((cached != cached) & (requested != requested))
+    return rows if same.all() else int(np.argmin(same))
+
+
+class IndicatorCache:
+    """지표 배열 2단계 캐시 (메모리 LRU + 디스크 memmap)"""
+
+    def __init__(self, max_entries: int = 64, directory: Optional[str] = None, warmup: int = DEFAULT_WARMUP):
+        """
+        Args:
+            max_entries: 메모리에 보관할 최대 시계열 수
+            directory: 디스크 캐시 디렉토리 (None 이면 메모리만 사용)
+            warmup: 이어서 계산할 때 다시 포함하는 앞쪽 행 수
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.warmup = warmup
+        self.stats = {'hits': 0, 'extends': 0, 'misses': 0, 'disk_loads': 0, 'disk_writes': 0}
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()  # _entries / _key_locks / stats 보호 (계산 / 디스크 입출력 중에는 잡지 않음)
+
+    def __len__(self) -> int:
+        """메모리에 보관 중인 시계열 수"""
+        return len(self._entries)
+
+    def get(self, market: str, interval: str, timestamps: np.ndarray, columns: Dict[str, np.ndarray],
+            names: List[str], params: Optional[Dict[str, Any]] = None, dtype=np.float64) -> Dict[str, np.ndarray]:
+        """
+        지표 배열 조회 (없거나 달라졌으면 계산 후 저장)
+        같은 항목은 항목별 잠금으로 한 번만 계산하고, 다른 항목은 동시에 계산한다.
+
+        Args:
+            market / interval: 시계열 구분
+            timestamps: int64 시각 배열 (오름차순)
+            columns: 'Close' (필수), 'Volume' 등 입력 배열
+            names: 필요한 지표 이름
+            params: 지표 파라미터 (DEFAULT_INDICATOR_PARAMS 덮어쓰기)
+            dtype: 결과 자료형
+
+        Returns:
+            지표 이름 -> 배열 (읽기 전용으로 취급)
+            캐시된 더 긴 이력에서 잘라낸 구간이어도 앞쪽 NaN 행 수는 요청 캔들만으로 계산한 것과 같다.
+        """
+        params = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
+        key = self._key(market, interval, params, dtype)
+
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load_disk(key, dtype)
+            entry, start, result = self._resolve(entry, np.asarray(timestamps), columns, names, params, dtype)
+            with self._lock:
+                self.stats[result] += 1
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                evicted = []
+                while len(self._entries) > self.max_entries:
+                    evicted.append(self._entries.popitem(last=False))
+            arrays = self._window(entry, start, len(timestamps), names)
+
+        # 밀려난 항목은 자기 잠금을 놓은 뒤 저장 (다른 항목 잠금과 엇갈려 기다리지 않도록)
+        for evicted_key, evicted_entry in evicted:
+            self._persist(evicted_key, evicted_entry)
+        return arrays
+
+    def flush(self):
+        """메모리에만 있는 항목 / 추가된 행을 디스크에 기록 (종료 시 호출)"""
+        with self._lock:
+            items = list(self._entries.items())
+        for key, entry in items:
+            with self._key_lock(key):
+                self._save_disk(key, entry)
+
+    def _key(self, market: str, interval: str, params: Dict[str, Any], dtype) -> str:
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+        return f'{market}/{interval}/{np.dtype(dtype).name}-{digest}'
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _resolve(self, entry: Optional[Dict[str, Any]], timestamps: np.ndarray, columns: Dict[str, np.ndarray],
+                 names: List[str], params: Dict[str, Any], dtype) -> Tuple[Dict[str, Any], int, str]:
+        """
+        요청 캔들을 담는 캐시 항목 준비
+
+        Returns:
+            (항목, 항목 안에서 요청 캔들의 시작 행, 'hits' / 'extends' / 'misses')
+        """
+        start, same = 0, 0
+        if entry is not None and len(timestamps) and set(entry['inputs']) == set(columns):
+            start = int(np.searchsorted(entry['timestamps'], timestamps[0]))
+            if start < len(entry['timestamps']) and entry['timestamps'][start] == timestamps[0]:
+                same = _matching_rows(entry, start, timestamps, columns)
+
+        if same == 0:
+            # 겹치는 구간이 없음: 요청 캔들로 새 항목 (디스크 파일은 전부 다시 씀)
+            entry = {
+                'timestamps': np.array(timestamps),
+                'inputs': {name: np.array(values) for name, values in columns.items()},
+                'arrays': {}, 'saved': {}, 'lead': {}
+            }
+            start, result = 0, 'misses'
+        elif same < len(timestamps):
+            entry = self._extend(entry, start + same, timestamps[same:],
+                                 {name: values[same:] for name, values in columns.items()}, params, dtype)
+            result = 'extends'
+        else:
+            result = 'hits'
+
+        missing = [name for name in names if name not in entry['arrays']]
+        if missing:
+            # 캐시에 없는 지표만 항목 전체 구간으로 계산 (기존 지표는 의존 지표로 재사용)
+            pipeline = IndicatorPipeline(entry['inputs'], dtype, params, computed=entry['arrays'])
+            pipeline.compute(missing)
+            entry = {**entry, 'arrays': pipeline.computed}
+        return entry, start, result
+
+    def _extend(self, entry: Dict[str, Any], keep: int, timestamps: np.ndarray, columns: Dict[str, np.ndarray],
+                params: Dict[str, Any], dtype) -> Dict[str, Any]:
+        """
+        항목의 앞 keep 행 뒤에 새 캔들을 붙이고, 추가된 행의 지표만 warmup 구간을 포함해 계산
+        (keep 뒤의 기존 행은 바뀐 캔들이므로 버림)
+        """
+        inputs = {name: np.concatenate([values[:keep], columns[name]]) for name, values in entry['inputs'].items()}
+        start = max(keep - self.warmup, 0)
+        tail = IndicatorPipeline({name: values[start:] for name, values in inputs.items()}, dtype, params)
+        tail.compute(list(entry['arrays']))
+        arrays = {
+            name: np.concatenate([values[:keep], tail.computed[name][keep - start:]])
+            for name, values in entry['arrays'].items()
+        }
+        # 디스크에 맞게 기록된 행 수 (앞부분이 잘렸으면 사용 중인 memmap 이 깨지지 않도록 파일을 새로 씀)
+        saved = {name: (rows if rows <= keep else 0) for name, rows in entry['saved'].items()}
+        return {
+            'timestamps': np.concatenate([entry['timestamps'][:keep], timestamps]),
+            'inputs': inputs, 'arrays': arrays, 'saved': saved, 'lead': entry['lead']
+        }
+
+    @staticmethod
+    def _window(entry: Dict[str, Any], start: int, rows: int, names: List[str]) -> Dict[str, np.ndarray]:
+        """
+        항목의 [start, start + rows) 구간 지표 (처음부터면 view)
+        더 긴 이력에서 자른 구간은 앞쪽 NaN 행 수를 처음부터 계산한 것과 맞춰 응답 행 수가 캐시 상태와 무관하게 한다.
+        """
+        arrays = {}
+        for name in names:
+            values = entry['arrays'][name][start:start + rows]
+            if start:
+                lead = entry['lead'].get(name)
+                if lead is None:
+                    lead = entry['lead'][name] = _leading_nan(entry['arrays'][name])
+                if lead:
+                    values = np.array(values)
+                    values[:lead] = np.nan
+            arrays[name] = values
+        return arrays
+
+    # ===== 디스크 저장 ({directory}/{market}/{interval}/{dtype-params}/{이름}.bin + meta.json) =====
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.directory, *key.split('/'))
+
+    def _persist(self, key: str, entry: Dict[str, Any]):
+        """메모리에서 밀려난 항목 저장 (그 사이 다시 메모리에 올라왔으면 그쪽이 최신이므로 건너뜀)"""
+        with self._key_lock(key):
+            with self._lock:
+                if key in self._entries:
+                    return
+            self._save_disk(key, entry)
+
+    def _load_disk(self, key: str, dtype) -> Optional[Dict[str, Any]]:
+        if not self.directory:
+            return None
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+            rows = meta['rows']
+            entry = {
+                'timestamps': self._memmap(entry_dir, TIMESTAMPS_FILE, rows, np.int64),
+                'inputs': {name: self._memmap(entry_dir, INPUT_PREFIX + name, rows, input_dtype)
+                           for name, input_dtype in meta['inputs'].items()},
+                'arrays': {name: self._memmap(entry_dir, name, rows, dtype) for name in meta['names']},
+                'lead': {}
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        entry['saved'] = {name: rows for name in self._files(entry)}
+        with self._lock:
+            self.stats['disk_loads'] += 1
+        return entry
+
+    @staticmethod
+    def _memmap(entry_dir: str, name: str, rows: int, dtype) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(entry_dir, f'{name}.bin'), dtype=dtype, mode='r', shape=(rows,))
+
+    @staticmethod
+    def _files(entry: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """디스크 파일 이름 -> 배열 (시각 / 입력 / 지표)"""
+        return {
+            TIMESTAMPS_FILE: entry['timestamps'],
+            **{INPUT_PREFIX + name: values for name, values in entry['inputs'].items()},
+            **entry['arrays']
+        }
+
+    def _save_disk(self, key: str, entry: Dict[str, Any]):
+        """
+        항목을 디스크에 기록 (디스크 캐시가 없거나 이미 기록된 항목이면 아무것도 하지 않음)
+        entry['saved']: 파일별로 디스크에 이미 올바르게 저장된 앞쪽 행 수 (그 뒤만 이어 씀)
+        """
+        rows = len(entry['timestamps'])
+        files = self._files(entry)
+        if not self.directory or all(entry['saved'].get(name) == rows for name in files):
+            return
+        entry_dir = self._entry_dir(key)
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            meta_path = os.path.join(entry_dir, 'meta.json')
+            # 기록 도중 읽히지 않도록 meta 를 먼저 지우고 마지막에 다시 씀
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            for name, values in files.items():
+                path = os.path.join(entry_dir, f'{name}.bin')
+                keep = entry['saved'].get(name, 0) if os.path.exists(path) else 0
+                if keep == rows:
+                    continue
+                values = np.ascontiguousarray(values[keep:])
+                if keep:
+                    # 이어 붙이기: 기존 memmap 영역은 그대로 두고 뒤에만 추가
+                    with open(path, 'r+b') as f:
+                        f.truncate(keep * values.itemsize)
+                        f.seek(0, os.SEEK_END)
+                        f.write(values.tobytes())
+                else:
+                    # 새로 쓰기: 사용 중인 memmap 이 깨지지 않도록 새 파일로 교체
+                    values.tofile(f'{path}.tmp')
+                    os.replace(f'{path}.tmp', path)
+                entry['saved'][name] = rows
+
+            tmp_path = f'{meta_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'rows': rows,
+                    'names': sorted(entry['arrays']),
+                    'inputs': {name: np.asarray(values).dtype.str for name, values in entry['inputs'].items()}
+                }, f)
+            os.replace(tmp_path, meta_path)
+            with self._lock:
+                self.stats['disk_writes'] += 1
+        except (OSError, ValueError) as e:
+            print(f"지표 캐시 저장 실패: {e}")
@@ -0,0 +1,339 @@
+"""
+FastAPI 서비스 부하 테스트
+가짜 거래소(fake_exchange.py)를 띄우고 백엔드를 앱 내부 호출(ASGI) 또는 로컬 uvicorn 프로세스로 실행한 뒤,
+가상 사용자 수(동시 요청 수)를 단계적으로 늘리며 백테스트 / 매매 일지 CRUD / 통계 / 업비트 프록시 요청을
+설정한 비율로 보내 엔드포인트별 처리량, 지연 시간 백분위수, 오류율을 측정하는 모듈
+
+실행 예:
+    python load_test.py --concurrency 1,2,4,8,16 --duration 20
+    python load_test.py --target uvicorn --mix backtest=1,crud=4,list=2,statistics=2,upbit=1
+    python load_test.py --url http://127.0.0.1:5000   # 이미 실행 중인 서버 (거래소 설정은 서버 쪽)
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from contextlib import contextmanager, ExitStack
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import httpx
+
+from fake_exchange import fake_exchange_process
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MIX = 'backtest=1,crud=4,list=2,statistics=2,upbit=1'
+DEFAULT_CONCURRENCY = '1,2,4,8,16'
+MARKETS = ('KRW-BTC', 'KRW-ETH', 'KRW-XRP', 'KRW-SOL')
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LatencyRecorder:
+    """엔드포인트별 응답 시간 / 상태 기록"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.server_errors: Dict[str, int] = {}
+        self.client_errors: Dict[str, int] = {}
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        """status 가 None 이면 연결 오류 / 타임아웃"""
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        if status is None or status >= 500:
+            self.server_errors[endpoint] = self.server_errors.get(endpoint, 0) + 1
+        elif status >= 400:
+            self.client_errors[endpoint] = self.client_errors.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """엔드포인트별 + 전체('*') 요청 수, 초당 처리량, 오류율, 지연 시간 백분위수 (ms)"""
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        groups = dict(self.latencies)
+        groups['*'] = [value for values in self.latencies.values() for value in values]
+        result = {}
+        for endpoint, values in sorted(groups.items()):
+            if not values:
+                continue
+            if endpoint == '*':
+                server_errors = sum(self.server_errors.values())
+                client_errors = sum(self.client_errors.values())
+            else:
+                server_errors = self.server_errors.get(endpoint, 0)
+                client_errors = self.client_errors.get(endpoint, 0)
+            latencies = np.asarray(values) * 1000
+            result[endpoint] = {
+                'requests': len(values),
+                'throughput': len(values) / elapsed if elapsed else 0.0,
+                'error_rate': server_errors / len(values),
+                'client_error_rate': client_errors / len(values),
+                **{f'p{p}': float(np.percentile(latencies, p)) for p in PERCENTILES},
+                'max': float(latencies.max()),
+            }
+        return result
+
+
+# ===== 요청 시나리오 =====
+
+class Scenario:
+    """가상 사용자 한 명이 보내는 요청 묶음 (비율에 따라 하나씩 선택)"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: LatencyRecorder, rng: random.Random,
+                 backtest_body: Dict[str, Any]):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.backtest_body = backtest_body
+
+    async def call(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """요청 1회 실행 후 기록 (endpoint: 집계용 경로 템플릿)"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, time.perf_counter() - started, None)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def backtest(self) -> None:
+        body = {**self.backtest_body, 'market': self.rng.choice(MARKETS)}
+        await self.call('POST /api/backtest', 'POST', '/api/backtest', json=body)
+
+    async def crud(self) -> None:
+        """생성 -> 조회 -> 수정 -> 삭제"""
+        response = await self.call('POST /api/trades', 'POST', '/api/trades', json={
+            'symbol': self.rng.choice(MARKETS),
+            'type': self.rng.choice(('BUY', 'SELL')),
+            'investment_amount': self.rng.randint(1, 100) * 10000,
+            'return_rate': round(self.rng.gauss(0, 5), 2),
+            'trade_date': f'2024-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d}',
+            'memo': 'load test',
+        })
+        if response is None or response.status_code != 200:
+            return
+        trade_id = response.json()['data']['id']
+        await self.call('GET /api/trades/{trade_id}', 'GET', f'/api/trades/{trade_id}')
+        await self.call('PUT /api/trades/{trade_id}', 'PUT', f'/api/trades/{trade_id}', json={'memo': 'updated'})
+        await self.call('DELETE /api/trades/{trade_id}', 'DELETE', f'/api/trades/{trade_id}')
+
+    async def list(self) -> None:
+        await self.call('GET /api/trades', 'GET', '/api/trades', params={'symbol': self.rng.choice(MARKETS)})
+
+    async def statistics(self) -> None:
+        await self.call('GET /api/trades/statistics/summary', 'GET', '/api/trades/statistics/summary')
+
+    async def upbit(self) -> None:
+        await self.call('GET /api/upbit/accounts', 'GET', '/api/upbit/accounts')
+
+
+OPERATIONS = ('backtest', 'crud', 'list', 'statistics', 'upbit')
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'backtest=1,crud=4' -> {'backtest': 1.0, 'crud': 4.0}"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f'Unknown operation in mix: {name} (choose from {", ".join(OPERATIONS)})')
+        mix[name] = float(weight or 1)
+    if not any(mix.values()):
+        raise ValueError('Mix weights must not all be zero')
+    return mix
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, duration: float, warmup: float,
+                    mix: Dict[str, float], backtest_body: Dict[str, Any], seed: int,
+                    think_time: float = 0.0) -> Dict[str, Dict[str, Any]]:
+    """
+    가상 사용자 concurrency 명이 duration 초 동안 쉬지 않고(think_time 제외) 요청
+
+    warmup 초 동안의 요청은 집계에서 제외한다.
+    """
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + warmup + duration
+    warmup_recorder, recorder = LatencyRecorder(), None
+
+    async def user(index: int) -> None:
+        nonlocal recorder
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            if recorder is None and time.perf_counter() >= deadline - duration:
+                recorder = LatencyRecorder()
+            scenario = Scenario(client, recorder or warmup_recorder, rng, backtest_body)
+            await getattr(scenario, rng.choices(names, weights)[0])()
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    recorder = recorder or warmup_recorder
+    recorder.finished_at = time.perf_counter()
+    return recorder.summary()
+
+
+# ===== 대상 서버 =====
+
+def app_environment(exchange_base: str) -> Dict[str, str]:
+    """가짜 거래소를 보도록 하는 백엔드 환경 변수 (데이터 / DB 는 작업 디렉토리 기준 상대 경로)"""
+    return {
+        'BITHUMB_API_BASE': exchange_base,
+        'UPBIT_API_BASE': exchange_base,
+        'UPBIT_ACCESS_KEY': 'load-test-access-key',
+        'UPBIT_SECRET_KEY': 'load-test-secret-key',
+        'MARKET_CATALOG_SOURCE': 'fixture',
+    }
+
+
+@contextmanager
+def uvicorn_process(environment: Dict[str, str], workdir: str, workers: int = 1, timeout: float = 60.0):
+    """백엔드를 로컬 uvicorn 프로세스로 실행하고 base URL 반환"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    base = f'http://127.0.0.1:{port}'
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app_fastapi:app', '--app-dir', BACKEND_DIR,
+         '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers), '--log-level', 'warning'],
+        cwd=workdir, env={**os.environ, **environment}, stdout=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                httpx.get(f'{base}/api/health', timeout=1)
+                break
+            except httpx.HTTPError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('backend server did not start')
+                time.sleep(0.2)
+        yield base
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def inprocess_app(environment: Dict[str, str], workdir: str):
+    """
+    백엔드 앱을 현재 프로세스에 불러옴 (환경 변수는 import 시점에 읽히므로 먼저 설정)
+    DB / 캐시 파일은 workdir 에 생성된다.
+    """
+    os.environ.update(environment)
+    os.chdir(workdir)
+    import app_fastapi
+    return app_fastapi.app
+
+
+# ===== 보고서 =====
+
+def print_level(concurrency: int, summary: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n=== concurrency {concurrency} ===")
+    print(f"{'endpoint':<36} {'reqs':>6} {'req/s':>8} {'err%':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for endpoint, row in summary.items():
+        print(f"{endpoint:<36} {row['requests']:>6} {row['throughput']:>8.1f} {row['error_rate'] * 100:>6.1f} "
+              f"{row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f} {row['max']:>9.1f}")
+
+
+def find_knee(levels: List[Dict[str, Any]], factor: float) -> Dict[str, Any]:
+    """
+    전체 p99 가 첫 단계의 factor 배를 넘거나 오류가 생긴 첫 동시 요청 수
+
+    Returns:
+        {'max_healthy_concurrency', 'degraded_at'} (끝까지 유지되면 degraded_at 은 None)
+    """
+    if not levels:
+        return {'max_healthy_concurrency': None, 'degraded_at': None}
+    reference = levels[0]['summary'].get('*', {}).get('p99')
+    healthy = None
+    for level in levels:
+        total = level['summary'].get('*')
+        if total is None or reference is None or total['p99'] > reference * factor or total['error_rate'] > 0:
+            return {'max_healthy_concurrency': healthy, 'degraded_at': level['concurrency']}
+        healthy = level['concurrency']
+    return {'max_healthy_concurrency': healthy, 'degraded_at': None}
+
+
+async def run(args, base_url: Optional[str], app=None) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    backtest_body = {'days': args.backtest_days, 'interval': args.backtest_interval, 'use_api': not args.sample_data}
+    levels = []
+    for concurrency in [int(value) for value in args.concurrency.split(',')]:
+        transport = httpx.ASGITransport(app=app) if app is not None else None
+        async with httpx.AsyncClient(base_url=base_url or 'http://backend', transport=transport,
+                                     timeout=args.timeout,
+                                     limits=httpx.Limits(max_connections=max(concurrency, 1))) as client:
+            summary = await run_level(client, concurrency, args.duration, args.warmup, mix, backtest_body,
+                                      args.seed, args.think_ms / 1000)
+        print_level(concurrency, summary)
+        levels.append({'concurrency': concurrency, 'summary': summary})
+    return {'mix': mix, 'backtest': backtest_body, 'levels': levels, 'knee': find_knee(levels, args.p99_factor)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='FastAPI 서비스 부하 테스트')
+    parser.add_argument('--target', choices=('inprocess', 'uvicorn'), default='inprocess',
+                        help='inprocess: ASGI 앱 직접 호출 / uvicorn: 로컬 서버 프로세스')
+    parser.add_argument('--url', default=None, help='이미 실행 중인 서버 주소 (지정하면 target / 가짜 거래소 무시)')
+    parser.add_argument('--workers', type=int, default=1, help='uvicorn 워커 수')
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY, help='동시 가상 사용자 수 단계 (쉼표 구분)')
+    parser.add_argument('--duration', type=float, default=15.0, help='단계별 측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='단계별 집계 제외 시간 (초)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'요청 비율 ({", ".join(OPERATIONS)})')
+    parser.add_argument('--think-ms', type=float, default=0.0, help='가상 사용자 요청 간 대기 시간')
+    parser.add_argument('--timeout', type=float, default=60.0, help='요청 타임아웃 (초)')
+    parser.add_argument('--backtest-days', type=int, default=200)
+    parser.add_argument('--backtest-interval', default='1d')
+    parser.add_argument('--sample-data', action='store_true', help='백테스트에 거래소 대신 샘플 데이터 사용')
+    parser.add_argument('--exchange-latency-ms', type=float, default=20.0, help='가짜 거래소 응답 지연')
+    parser.add_argument('--exchange-error-rate', type=float, default=0.0, help='가짜 거래소 500 오류 비율')
+    parser.add_argument('--p99-factor', type=float, default=2.0, help='첫 단계 대비 p99 가 몇 배가 되면 저하로 볼지')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='결과 JSON 경로')
+    args = parser.parse_args()
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with ExitStack() as stack:
+        app, base_url = None, args.url
+        if base_url is None:
+            exchange = stack.enter_context(fake_exchange_process(
+                '--latency-ms', str(args.exchange_latency_ms), '--error-rate', str(args.exchange_error_rate),
+                '--seed', str(args.seed)))
+            workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix='load-test-'))
+            print(f"가짜 거래소: {exchange} / 작업 디렉토리: {workdir}")
+            if args.target == 'uvicorn':
+                base_url = stack.enter_context(uvicorn_process(app_environment(exchange), workdir, args.workers))
+            else:
+                cwd = os.getcwd()
+                stack.callback(os.chdir, cwd)
+                app = inprocess_app(app_environment(exchange), workdir)
+        report = asyncio.run(run(args, base_url, app))
+
+    knee = report['knee']
+    if knee['degraded_at'] is None:
+        print(f"\np99 유지: 최대 측정 동시 요청 수 {knee['max_healthy_concurrency']} 까지 저하 없음")
+    else:
+        print(f"\np99 저하 / 오류 시작: 동시 요청 {knee['degraded_at']} (저하 없는 최대: {knee['max_healthy_concurrency']})")
+
+    if args.output:
+        report.update({'timestamp': datetime.now().isoformat(timespec='seconds'),
+                       'target': args.url or args.target, 'duration': args.duration})
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+마켓 카탈로그
+거래소의 전체 마켓 목록을 불러와 메모리 / 디스크에 TTL 캐시하는 모듈
+스크리너, 대량 수집 등은 네트워크 호출 없이 캐시된 목록을 순회한다.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, List, Any, Callable
+
+from http_scheduler import scheduler
+
+BITHUMB_API_BASE = os.getenv('BITHUMB_API_BASE', 'https://api.bithumb.com')
+BITHUMB_MARKET_URL = f'{BITHUMB_API_BASE}/v1/market/all'
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'markets.json')
+
+# 거래소와 디스크 캐시를 모두 사용할 수 없을 때의 기본 목록
+FALLBACK_MARKETS = [
+    {'market': 'KRW-BTC', 'korean_name': '비트코인', 'english_name': 'Bitcoin'},
+    {'market': 'KRW-ETH', 'korean_name': '이더리움', 'english_name': 'Ethereum'},
+    {'market': 'KRW-XRP', 'korean_name': '리플', 'english_name': 'Ripple'},
+    {'market': 'KRW-ADA', 'korean_name': '에이다', 'english_name': 'Cardano'},
+    {'market': 'KRW-DOT', 'korean_name': '폴카닷', 'english_name': 'Polkadot'},
+    {'market': 'KRW-LINK', 'korean_name': '체인링크', 'english_name': 'Chainlink'},
+    {'market': 'KRW-LTC', 'korean_name': '라이트코인', 'english_name': 'Litecoin'},
+    {'market': 'KRW-BCH', 'korean_name': '비트코인 캐시', 'english_name': 'Bitcoin Cash'},
+]
+
+
+def fetch_bithumb_markets() -> List[Dict[str, Any]]:
+    """Bithumb 마켓 목록 API 호출"""
+    response = scheduler.get(BITHUMB_MARKET_URL, headers={'accept': 'application/json'},
+                             params={'isDetails': 'false'})
+    response.raise_for_status()
+    return response.json()
+
+
+def load_fixture_markets(path: str = FIXTURE_PATH) -> List[Dict[str, Any]]:
+    """로컬 fixture 파일의 마켓 목록 (오프라인 / 테스트용)"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class MarketCatalog:
+    """마켓 목록 TTL 캐시 (만료되면 기존 목록을 계속 제공하면서 백그라운드에서 갱신)"""
+
+    def __init__(self, fetch_markets: Callable[[], List[Dict[str, Any]]], cache_path: Optional[str] = None,
+                 ttl_seconds: int = 3600):
+        """
+        Args:
+            fetch_markets: 거래소 형식({'market', 'korean_name', 'english_name'}) 목록을 반환하는 함수
+            cache_path: 디스크 캐시 파일 경로 (None 이면 메모리만 사용)
+            ttl_seconds: 캐시 유효 시간 (초)
+        """
+        self.fetch_markets = fetch_markets
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.raw_markets: List[Dict[str, Any]] = []
+        self.fetched_at = 0.0
+        self._views: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() - self.fetched_at >= self.ttl_seconds
+
+    def load(self) -> None:
+        """디스크 캐시가 유효하면 사용하고, 아니면 거래소에서 새로 조회"""
+        if self._load_disk_cache() and not self.is_expired:
+            return
+        if not self.refresh() and not self.raw_markets:
+            print("마켓 목록 조회 실패, 기본 목록 사용")
+            self._set_markets(FALLBACK_MARKETS, 0.0)
+
+    def refresh(self) -> bool:
+        """거래소에서 목록을 다시 조회 (실패하면 기존 목록 유지)"""
+        try:
+            markets = [
+                market for market in self.fetch_markets()
+                if isinstance(market, dict) and market.get('market')
+            ]
+        except Exception as e:
+            print(f"마켓 목록 조회 중 오류 발생: {e}")
+            return False
+        if not markets:
+            return False
+
+        self._set_markets(markets, time.time())
+        self._save_disk_cache()
+        return True
+
+    def markets(self, quote: Optional[str] = 'KRW') -> Dict[str, Any]:
+        """
+        API 응답용 마켓 목록과 ETag
+
+        Args:
+            quote: 기준 통화 (예: 'KRW', None 이면 전체)
+
+        Returns:
+            {'markets': [{'code', 'name'}, ...], 'etag': str}
+        """
+        key = quote or ''
+        # 목록과 그 목록의 view 캐시를 함께 읽음 (refresh 가 목록을 바꾸면 view 캐시도 새 dict 로 바뀌므로
+        # 이전 목록으로 만든 view 는 버려진 dict 에만 들어가고 새 목록에 섞이지 않음)
+        with self._lock:
+            raw_markets, views = self.raw_markets, self._views
+        view = views.get(key)
+        if view is None:
+            markets = [
+                {'code': market['market'], 'name': f"{market.get('korean_name', '')} ({market['market'].split('-')[-1]})"}
+                for market in raw_markets
+                if quote is None or market['market'].startswith(f'{quote}-')
+            ]
+            digest = hashlib.sha256(json.dumps(markets, ensure_ascii=False).encode()).hexdigest()[:32]
+            view = {'markets': markets, 'etag': f'"{digest}"'}
+            views[key] = view
+        return view
+
+    def market_codes(self, quote: Optional[str] = 'KRW') -> List[str]:
+        """마켓 코드 목록 (네트워크 호출 없음)"""
+        return [market['code'] for market in self.markets(quote)['markets']]
+
+    def _set_markets(self, markets: List[Dict[str, Any]], fetched_at: float) -> None:
+        with self._lock:
+            self.raw_markets = markets
+            self.fetched_at = fetched_at
+            self._views = {}
+
+    def _load_disk_cache(self) -> bool:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+            self._set_markets(cached['markets'], cached['fetched_at'])
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"마켓 목록 캐시 읽기 실패: {e}")
+            return False
+
+    def _save_disk_cache(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            # 쓰는 도중 읽히지 않도록 임시 파일에 쓴 뒤 교체
+            tmp_path = f'{self.cache_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': self.fetched_at, 'markets': self.raw_markets}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"마켓 목록 캐시 저장 실패: {e}")
@@ -0,0 +1,208 @@
+"""
+Monte Carlo 강건성 시뮬레이션
+과거 가격 경로를 재표본화한 수천 개의 가상 경로에 같은 매매 전략을 일괄(2D 배열) 적용하여
+수익률 / MDD / Sharpe Ratio 의 분포와 신뢰구간을 계산하는 모듈
+"""
+from typing import Optional, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+from crypto_simulator import (
+    calculate_indicator_arrays,
+    find_buy_sell_signal_arrays,
+    indicator_ready_mask,
+    add_technical_indicators,
+    find_optimal_buy_sell_signals,
+    CryptoBacktester
+)
+
+SIMULATION_METHODS = ('block_bootstrap', 'trade_shuffle')
+MAX_PATHS = 100000
+
+
+def block_bootstrap_paths(close: np.ndarray, n_paths: int, block_size: int,
+                          rng: np.random.Generator, n_bars: Optional[int] = None) -> np.ndarray:
+    """
+    로그 수익률의 순환 블록 부트스트랩으로 가격 경로 생성
+
+    Args:
+        close: 과거 종가 배열
+        n_paths: 생성할 경로 수
+        block_size: 블록 길이 (변동성 군집 등 단기 자기상관 보존)
+        rng: 난수 생성기
+        n_bars: 경로 길이 (기본값: 과거 데이터 길이)
+
+    Returns:
+        (n_bars, n_paths) 종가 배열 - 모든 경로는 과거 첫 종가에서 시작
+    """
+    log_returns = np.diff(np.log(close))
+    n_returns = len(log_returns)
+    n_steps = (n_bars or len(close)) - 1
+    n_blocks = -(-n_steps // block_size)
+
+    starts = rng.integers(0, n_returns, size=(n_blocks, n_paths))
+    offsets = np.arange(block_size)[None, :, None]
+    indices = ((starts[:, None, :] + offsets) % n_returns).reshape(n_blocks * block_size, n_paths)[:n_steps]
+
+    paths = np.empty((n_steps + 1, n_paths))
+    paths[0] = np.log(close[0])
+    np.cumsum(log_returns[indices], axis=0, out=paths[1:])
+    paths[1:] += paths[0]
+    return np.exp(paths)
+
+
+def simulate_strategy_batch(close: np.ndarray, initial_capital: float, rsi_oversold: float = 30,
+                            rsi_overbought: float = 70) -> Dict[str, np.ndarray]:
+    """
+    (시간, 경로) 종가 배열 전체에 CryptoBacktester 와 같은 매매 규칙을 일괄 적용
+
+    Returns:
+        경로별 'total_return'(%), 'max_drawdown'(%), 'sharpe_ratio', 'num_trades' 배열
+    """
+    indicators = calculate_indicator_arrays(close)
+    buy, sell = find_buy_sell_signal_arrays(close, indicators, rsi_oversold, rsi_overbought)
+
+    # 지표가 모두 계산된 봉에서만 매매 (run_backtest 전 dropna 와 동일)
+    tradable = indicator_ready_mask(indicators)
+    buy &= tradable
+    sell &= tradable
+    start = int(np.argmax(tradable.any(axis=1)))
+
+    n_bars, n_paths = close.shape
+    cash = np.full(n_paths, float(initial_capital))
+    coins = np.zeros(n_paths)
+    holding = np.zeros(n_paths, dtype=bool)
+    num_trades = np.zeros(n_paths, dtype=np.int64)
+    equity = np.empty((n_bars - start, n_paths))
+
+    for t in range(start, n_bars):
+        price = close[t]
+        entering = buy[t] & ~holding
+        exiting = sell[t] & holding & ~entering
+        coins = np.where(entering, cash / price, coins)
+        cash = np.where(entering, 0.0, np.where(exiting, coins * price, cash))
+        coins = np.where(exiting, 0.0, coins)
+        holding = (holding | entering) & ~exiting
+        num_trades += entering.astype(np.int64) + exiting.astype(np.int64)
+        equity[t - start] = cash + coins * price
+
+    # 마지막 포지션 청산
+    num_trades += holding.astype(np.int64)
+
+    peak = np.maximum.accumulate(equity, axis=0)
+    daily_returns = equity[1:] / equity[:-1] - 1
+    std = daily_returns.std(axis=0, ddof=1) if len(daily_returns) > 1 else np.zeros(n_paths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, daily_returns.mean(axis=0) / std * np.sqrt(252), 0.0)
+
+    return {
+        'total_return': (equity[-1] - initial_capital) / initial_capital * 100,
+        'max_drawdown': ((peak - equity) / peak).max(axis=0) * 100,
+        'sharpe_ratio': sharpe,
+        'num_trades': num_trades,
+    }
+
+
+def simulate_trade_shuffle(trade_returns: np.ndarray, n_paths: int, initial_capital: float,
+                           rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    과거 왕복 거래 수익률을 복원 추출로 재배열하여 거래 순서/구성에 따른 성과 분포 계산
+
+    Args:
+        trade_returns: 왕복 거래별 수익률 (소수, 예: 0.05)
+    """
+    samples = trade_returns[rng.integers(0, len(trade_returns), size=(len(trade_returns), n_paths))]
+    equity = initial_capital * np.vstack([np.ones((1, n_paths)), np.cumprod(1 + samples, axis=0)])
+    peak = np.maximum.accumulate(equity, axis=0)
+    std = samples.std(axis=0, ddof=1) if len(samples) > 1 else np.zeros(n_paths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, samples.mean(axis=0) / std * np.sqrt(252), 0.0)
+
+    return {
+        'total_return': (equity[-1] - initial_capital) / initial_capital * 100,
+        'max_drawdown': ((peak - equity) / peak).max(axis=0) * 100,
+        'sharpe_ratio': sharpe,
+        'num_trades': np.full(n_paths, 2 * len(trade_returns)),
+    }
+
+
+def summarize_distribution(values: np.ndarray, confidence: float = 0.95) -> Dict[str, float]:
+    """분포 요약 통계와 신뢰구간"""
+    tail = (1 - confidence) / 2 * 100
+    lower, p5, p25, median, p75, p95, upper = np.percentile(values, [tail, 5, 25, 50, 75, 95, 100 - tail])
+    return {
+        'mean': float(np.mean(values)),
+        'std': float(np.std(values)),
+        'median': float(median),
+        'ci_lower': float(lower),
+        'ci_upper': float(upper),
+        'percentiles': {'p5': float(p5), 'p25': float(p25), 'p75': float(p75), 'p95': float(p95)},
+    }
+
+
+def _historical_trade_returns(data: pd.DataFrame, initial_capital: float) -> np.ndarray:
+    """과거 데이터로 백테스트한 왕복 거래별 수익률"""
+    df = find_optimal_buy_sell_signals(add_technical_indicators(data)).dropna()
+    backtester = CryptoBacktester(initial_capital=initial_capital)
+    backtester.run_backtest(df)
+    prices = [trade['Price'] for trade in backtester.trades]
+    return np.array(prices[1::2]) / np.array(prices[0::2]) - 1
+
+
+def run_robustness_simulation(data: pd.DataFrame, method: str = 'block_bootstrap', n_paths: int = 1000,
+                              block_size: int = 20, n_bars: Optional[int] = None,
+                              initial_capital: float = 10000000, confidence: float = 0.95,
+                              seed: Optional[int] = None, batch_size: int = 2000) -> Dict[str, Any]:
+    """
+    전략 강건성 시뮬레이션 실행
+
+    Args:
+        data: OHLCV 데이터 (Close 필수)
+        method: 'block_bootstrap' (가격 경로 재표본화 후 전략 재실행) 또는
+                'trade_shuffle' (과거 거래 수익률 재표본화)
+        n_paths: 시뮬레이션 경로 수
+        block_size: 블록 부트스트랩 블록 길이
+        n_bars: 경로 길이 (기본값: 과거 데이터 길이)
+        initial_capital: 초기 자본금
+        confidence: 신뢰구간 수준
+        seed: 난수 시드 (재현용)
+        batch_size: 한 번에 계산할 경로 수 (메모리 사용량 제한)
+
+    Returns:
+        과거 경로 성과와 지표별 분포 요약
+    """
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f'Unsupported simulation method: {method}')
+    if not 1 <= n_paths <= MAX_PATHS:
+        raise ValueError(f'n_paths must be between 1 and {MAX_PATHS}')
+    if block_size < 1 or not 0 < confidence < 1:
+        raise ValueError('block_size must be positive and confidence must be in (0, 1)')
+
+    rng = np.random.default_rng(seed)
+    close = data['Close'].to_numpy(dtype=np.float64)
+    historical = simulate_strategy_batch(close[:, None], initial_capital)
+
+    if method == 'block_bootstrap':
+        batches = []
+        for batch_start in range(0, n_paths, batch_size):
+            paths = block_bootstrap_paths(close, min(batch_size, n_paths - batch_start), block_size, rng, n_bars)
+            batches.append(simulate_strategy_batch(paths, initial_capital))
+        results = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    else:
+        trade_returns = _historical_trade_returns(data, initial_capital)
+        if len(trade_returns) == 0:
+            raise ValueError('No completed trades to resample')
+        results = simulate_trade_shuffle(trade_returns, n_paths, initial_capital, rng)
+
+    return {
+        'method': method,
+        'n_paths': n_paths,
+        'confidence': confidence,
+        'historical': {key: float(values[0]) for key, values in historical.items()},
+        'distributions': {
+            key: summarize_distribution(results[key], confidence)
+            for key in ('total_return', 'max_drawdown', 'sharpe_ratio')
+        },
+        'probability_of_loss': float(np.mean(results['total_return'] < 0) * 100),
+    }
@@ -0,0 +1,102 @@
+"""
+멀티 타임프레임 신호 확인
+하나의 캔들 저장소에서 주기별 캔들을 만들고 주기마다 지표를 한 번만 계산한 뒤,
+기준 주기의 매매 신호를 다른 주기의 지표로 확인하는 모듈
+다른 주기의 값은 기준 봉 마감 시각까지 마감된 봉만 사용한다 (as-of join, look-ahead 없음).
+"""
+from typing import Optional, Dict, List
+
+import pandas as pd
+
+from crypto_simulator import add_technical_indicators, find_optimal_buy_sell_signals, INDICATOR_COLUMNS
+from candle_store import CandleStore, INTERVAL_SECONDS
+from indicator_cache import IndicatorCache
+
+# 확인 조건 종류
+# - rsi : 매수 시 RSI < rsi_confirm_buy, 매도 시 RSI > rsi_confirm_sell
+# - macd: 매수 시 MACD > Signal, 매도 시 MACD < Signal
+CONFIRMATION_KINDS = ('rsi', 'macd')
+
+
+def load_timeframe_indicators(store: CandleStore, market: str, intervals: List[str],
+                              count: Optional[int] = None,
+                              cache: Optional[IndicatorCache] = None) -> Dict[str, pd.DataFrame]:
+    """
+    같은 저장소에서 주기별 캔들을 가져와 주기마다 add_technical_indicators 를 한 번씩 적용
+
+    Args:
+        store: 캔들 저장소
+        market: 마켓 코드
+        intervals: 주기 목록
+        count: 주기별 최근 캔들 개수 (None 이면 전체)
+        cache: 지표 캐시 (지정 시 저장된 전체 구간의 지표를 캐시에서 가져오거나 이어서 계산한 뒤 count 개로 자름)
+
+    Returns:
+        주기 -> 지표가 추가된 데이터프레임
+    """
+    frames = {}
+    for interval in dict.fromkeys(intervals):
+        candles = store.get(market, interval, None if cache else count)
+        if candles is None or len(candles) == 0:
+            raise ValueError(f'No {interval} candles for {market}')
+        if cache is None:
+            frames[interval] = add_technical_indicators(candles)
+            continue
+        indicators = cache.get(
+            market, interval, candles.index.as_unit('ns').asi8,
+            {'Close': candles['Close'].to_numpy(), 'Volume': candles['Volume'].to_numpy()}, INDICATOR_COLUMNS
+        )
+        frame = candles.assign(**indicators)
+        frames[interval] = frame.iloc[-count:] if count else frame
+    return frames
+
+
+def align_asof(base: pd.DataFrame, base_interval: str, other: pd.DataFrame, other_interval: str,
+               columns: List[str]) -> pd.DataFrame:
+    """
+    다른 주기의 컬럼을 기준 주기 인덱스에 정렬
+    기준 봉마다 그 봉의 마감 시각 이전(같은 시각 포함)에 마감된 가장 최근 봉의 값을 사용한다.
+    """
+    base_close = (base.index + pd.Timedelta(seconds=INTERVAL_SECONDS[base_interval])).as_unit('ns')
+    other_close = (other.index + pd.Timedelta(seconds=INTERVAL_SECONDS[other_interval])).as_unit('ns')
+
+    left = pd.DataFrame({'close_time': base_close})
+    right = pd.DataFrame({'close_time': other_close, **{column: other[column].to_numpy() for column in columns}})
+    merged = pd.merge_asof(left, right, on='close_time', direction='backward')
+    merged.index = base.index
+    return merged[columns]
+
+
+def find_multi_timeframe_signals(frames: Dict[str, pd.DataFrame], base_interval: str,
+                                 confirmations: Dict[str, str], rsi_confirm_buy: float = 50,
+                                 rsi_confirm_sell: float = 50, **signal_params) -> pd.DataFrame:
+    """
+    기준 주기의 find_optimal_buy_sell_signals 신호를 다른 주기 지표로 확인
+
+    Args:
+        frames: load_timeframe_indicators 결과 (기준 주기 포함)
+        base_interval: 매매 신호를 만드는 기준 주기
+        confirmations: 주기 -> 확인 조건 종류 (예: {'4h': 'rsi', '1h': 'macd'})
+        rsi_confirm_buy / rsi_confirm_sell: rsi 확인 임계값
+        signal_params: find_optimal_buy_sell_signals 에 전달할 파라미터
+
+    Returns:
+        Buy_Signal / Sell_Signal 이 추가된 기준 주기 데이터프레임
+    """
+    base = frames[base_interval]
+    buy_filter = pd.Series(True, index=base.index)
+    sell_filter = pd.Series(True, index=base.index)
+
+    for interval, kind in confirmations.items():
+        if kind not in CONFIRMATION_KINDS:
+            raise ValueError(f'Unsupported confirmation kind: {kind}')
+        if kind == 'rsi':
+            aligned = align_asof(base, base_interval, frames[interval], interval, ['RSI'])
+            buy_filter &= aligned['RSI'] < rsi_confirm_buy
+            sell_filter &= aligned['RSI'] > rsi_confirm_sell
+        else:
+            aligned = align_asof(base, base_interval, frames[interval], interval, ['MACD', 'MACD_Signal'])
+            buy_filter &= aligned['MACD'] > aligned['MACD_Signal']
+            sell_filter &= aligned['MACD'] < aligned['MACD_Signal']
+
+    return find_optimal_buy_sell_signals(base, buy_filter=buy_filter, sell_filter=sell_filter, **signal_params)
@@ -0,0 +1,178 @@
+"""
+멀티 자산 포트폴리오 백테스터
+여러 마켓의 가격을 하나의 (날짜 x 자산) 배열로 정렬하고, 모든 자산의 매매 신호를 한 번에 계산한 뒤
+교체 가능한 비중 결정(sizing) / 리밸런싱 규칙으로 하나의 자본을 배분하는 모듈
+"""
+from typing import Optional, Dict, Any, Callable, Union
+
+import numpy as np
+import pandas as pd
+
+from crypto_simulator import (
+    calculate_indicator_arrays,
+    find_buy_sell_signal_arrays,
+    indicator_ready_mask
+)
+
+REBALANCE_MODES = ('on_signal', 'full')
+
+
+def build_price_panel(frames: Dict[str, pd.DataFrame], column: str = 'Close') -> pd.DataFrame:
+    """
+    마켓별 OHLCV 데이터를 (날짜 x 마켓) 패널로 정렬
+
+    Args:
+        frames: 마켓 코드 -> OHLCV 데이터프레임
+        column: 사용할 컬럼
+
+    Returns:
+        날짜 합집합 인덱스의 패널 - 상장 전 구간은 NaN, 중간 결측일은 직전 값으로 채움
+    """
+    panel = pd.concat({market: df[column] for market, df in frames.items()}, axis=1).sort_index()
+    return panel.ffill()
+
+
+# ===== 비중 결정 규칙 =====
+# 보유 중인 자산 mask 와 해당 시점의 context 를 받아 자산별 목표 비중(합계 <= 1)을 반환
+
+def equal_weight(holding: np.ndarray, context: Dict[str, np.ndarray]) -> np.ndarray:
+    """보유 자산에 자본 전체를 균등 배분"""
+    count = holding.sum()
+    return holding / count if count else np.zeros(len(holding))
+
+
+def equal_slot(holding: np.ndarray, context: Dict[str, np.ndarray]) -> np.ndarray:
+    """자산마다 전체 자본의 1/N 슬롯 배정 (보유하지 않는 슬롯은 현금)"""
+    return holding / len(holding)
+
+
+def inverse_volatility(holding: np.ndarray, context: Dict[str, np.ndarray]) -> np.ndarray:
+    """보유 자산에 최근 변동성의 역수에 비례해 배분"""
+    volatility = context['volatility']
+    inverse = np.where(holding & (volatility > 0), 1 / np.where(volatility > 0, volatility, 1), 0.0)
+    total = inverse.sum()
+    return inverse / total if total else equal_weight(holding, context)
+
+
+SIZING_RULES: Dict[str, Callable[[np.ndarray, Dict[str, np.ndarray]], np.ndarray]] = {
+    'equal_weight': equal_weight,
+    'equal_slot': equal_slot,
+    'inverse_volatility': inverse_volatility,
+}
+
+
+def run_portfolio_backtest(panel: pd.DataFrame, initial_capital: float = 10000000,
+                           sizing: Union[str, Callable] = 'equal_weight', rebalance: str = 'on_signal',
+                           rebalance_every: Optional[int] = None, fee_rate: float = 0.0,
+                           volatility_window: int = 20) -> Dict[str, Any]:
+    """
+    포트폴리오 백테스트 실행
+    자산별 진입/청산은 CryptoBacktester 와 같은 규칙(미보유 시 매수 신호로 진입, 보유 중 매도 신호로 청산)을 따른다.
+
+    Args:
+        panel: build_price_panel 로 만든 (날짜 x 마켓) 종가 패널
+        initial_capital: 초기 자본금
+        sizing: SIZING_RULES 의 이름 또는 (holding, context) -> 목표 비중 함수
+        rebalance: 'on_signal' (상태가 바뀐 자산만 매매) 또는 'full' (신호 발생 시 전체를 목표 비중으로 조정)
+        rebalance_every: 지정 시 N봉마다 전체 리밸런싱 추가 수행
+        fee_rate: 매매 금액 대비 수수료율
+        volatility_window: inverse_volatility 등에 제공되는 변동성 계산 구간
+
+    Returns:
+        포트폴리오 자산 곡선, 성과 지표, 자산별 요약
+    """
+    sizing_rule = SIZING_RULES.get(sizing) if isinstance(sizing, str) else sizing
+    if sizing_rule is None:
+        raise ValueError(f'Unsupported sizing rule: {sizing}')
+    if rebalance not in REBALANCE_MODES:
+        raise ValueError(f'Unsupported rebalance mode: {rebalance}')
+
+    close = panel.to_numpy(dtype=np.float64)
+    n_bars, n_assets = close.shape
+
+    # 모든 자산의 지표/신호를 한 번에 계산
+    indicators = calculate_indicator_arrays(close)
+    buy, sell = find_buy_sell_signal_arrays(close, indicators)
+    tradable = indicator_ready_mask(indicators)
+    buy &= tradable
+    sell &= tradable
+    if not tradable.any():
+        raise ValueError('Not enough data to compute indicators')
+    start = int(np.argmax(tradable.any(axis=1)))
+
+    log_returns = np.full(close.shape, np.nan)
+    log_returns[1:] = np.log(close[1:] / close[:-1])
+    volatility = pd.DataFrame(log_returns).rolling(volatility_window).std().to_numpy()
+
+    cash = float(initial_capital)
+    units = np.zeros(n_assets)
+    holding = np.zeros(n_assets, dtype=bool)
+    trade_counts = np.zeros(n_assets, dtype=np.int64)
+    equity = np.empty(n_bars - start)
+
+    for t in range(start, n_bars):
+        price = close[t]
+        valued = np.nan_to_num(price)
+        entering = buy[t] & ~holding
+        exiting = sell[t] & holding
+        holding = (holding | entering) & ~exiting
+        periodic = bool(rebalance_every) and (t - start) % rebalance_every == 0 and holding.any()
+
+        if entering.any() or exiting.any() or periodic:
+            context = {'volatility': volatility[t], 'price': price}
+            weights = np.asarray(sizing_rule(holding.copy(), context), dtype=np.float64)
+            total_value = cash + units @ valued
+            if rebalance == 'full' or periodic:
+                target_units = np.where(holding, weights * total_value / np.where(holding, price, 1), 0.0)
+            else:
+                target_units = np.where(exiting, 0.0, units)
+                target_units[entering] = weights[entering] * total_value / price[entering]
+
+            # 매도 먼저 체결 후 남은 현금 한도 내에서 매수
+            sell_units = np.maximum(units - target_units, 0.0)
+            cash += (sell_units @ valued) * (1 - fee_rate)
+            units -= sell_units
+            buy_units = np.maximum(target_units - units, 0.0)
+            buy_cost = (buy_units @ valued) * (1 + fee_rate)
+            if buy_cost > cash:
+                buy_units *= cash / buy_cost
+                buy_cost = cash
+            cash -= buy_cost
+            units += buy_units
+            trade_counts += entering | exiting
+
+        equity[t - start] = cash + units @ valued
+
+    # 마지막 포지션 청산
+    trade_counts += units > 0
+    final_value = cash + (units @ np.nan_to_num(close[-1])) * (1 - fee_rate)
+    equity[-1] = final_value
+
+    peak = np.maximum.accumulate(equity)
+    daily_returns = equity[1:] / equity[:-1] - 1
+    std = daily_returns.std(ddof=1) if len(daily_returns) > 1 else 0
+    first_price = panel.iloc[start:].bfill().iloc[0].to_numpy()
+    asset_returns = (close[-1] / first_price - 1) * 100
+
+    return {
+        'dates': panel.index[start:],
+        'equity': equity,
+        'metrics': {
+            'initial_capital': initial_capital,
+            'final_value': float(final_value),
+            'total_return': float((final_value - initial_capital) / initial_capital * 100),
+            'buy_hold_return': float(np.nanmean(asset_returns)),
+            'num_trades': int(trade_counts.sum()),
+            'max_drawdown': float(((peak - equity) / peak).max() * 100),
+            'sharpe_ratio': float(daily_returns.mean() / std * np.sqrt(252)) if std else 0.0,
+        },
+        'assets': [
+            {
+                'market': market,
+                'num_trades': int(trade_counts[i]),
+                'buy_hold_return': float(asset_returns[i]),
+                'signals': {'buy_count': int(buy[:, i].sum()), 'sell_count': int(sell[:, i].sum())},
+            }
+            for i, market in enumerate(panel.columns)
+        ],
+    }
@@ -0,0 +1,160 @@
+"""
+실시간 시세 팬아웃 허브
+WebSocket 클라이언트들이 구독한 마켓을 모아 거래소 현재가를 마켓당 한 번만 가져오고(업스트림 구독 1개),
+바뀐 시세를 그 마켓의 구독자 모두에게 나눠 보낸다.
+시세 메시지는 한 번만 JSON 으로 만들어 공유하고, 느린 클라이언트는 마켓별 최신 시세만 남기고
+이전 시세를 버려(conflate) 클라이언트당 메모리가 구독 마켓 수 이상 늘지 않는다.
+"""
+import json
+import time
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import crypto_simulator
+from http_scheduler import scheduler, request_priority, PRIORITY_BACKGROUND
+
+
+def fetch_bithumb_tickers(markets: List[str]) -> List[Dict[str, Any]]:
+    """
+    Bithumb 현재가 API 호출 (여러 마켓을 한 번에 조회)
+    주기적인 폴링이라 백그라운드 우선순위로 보내 사용자 요청이 먼저 처리되게 하고,
+    주소는 crypto_simulator.BITHUMB_API_BASE 를 호출 시점에 읽는다 (벤치마크의 가짜 거래소 등으로 바꿀 수 있음).
+    """
+    with request_priority(PRIORITY_BACKGROUND):
+        response = scheduler.get(f'{crypto_simulator.BITHUMB_API_BASE}/v1/ticker',
+                                 headers={'accept': 'application/json'},
+                                 params={'markets': ','.join(markets)})
+    response.raise_for_status()
+    return response.json()
+
+
+class Subscriber:
+    """클라이언트 한 명의 우편함 (마켓별로 아직 보내지 않은 최신 시세 한 개만 보관)"""
+
+    def __init__(self):
+        self.markets: Set[str] = set()
+        self.closed = False
+        self._pending: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+
+    def offer(self, market: str, message: str) -> bool:
+        """
+        시세 전달 (대기 중이면 즉시 반환)
+
+        Returns:
+            보내지 못한 이전 시세를 덮어썼으면 True
+        """
+        conflated = market in self._pending
+        self._pending[market] = message
+        self._ready.set()
+        return conflated
+
+    async def next_batch(self) -> List[str]:
+        """보낼 시세가 생길 때까지 기다렸다가 마켓별 최신 시세 목록 반환 (닫히면 빈 목록)"""
+        await self._ready.wait()
+        self._ready.clear()
+        if self.closed:
+            return []
+        batch, self._pending = list(self._pending.values()), {}
+        return batch
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+
+class PriceHub:
+    """마켓별 구독자 목록 + 업스트림 시세 수집 작업 (구독자가 있는 동안만 실행)"""
+
+    def __init__(self, fetch_tickers: Callable[[List[str]], List[Dict[str, Any]]], interval: float = 1.0):
+        """
+        Args:
+            fetch_tickers: 마켓 목록의 현재가를 가져오는 함수 (동기, 스레드에서 실행)
+            interval: 업스트림 수집 주기 (초)
+        """
+        self.fetch_tickers = fetch_tickers
+        self.interval = interval
+        self.stats = {'polls': 0, 'errors': 0, 'ticks': 0, 'deliveries': 0, 'conflated': 0}
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._latest: Dict[str, str] = {}  # 마켓 -> 마지막 시세 메시지 (새 구독자에게 바로 전송)
+        self._versions: Dict[str, tuple] = {}  # 마켓 -> 마지막 체결 (바뀌지 않은 시세는 다시 보내지 않음)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def markets(self) -> List[str]:
+        """업스트림에서 구독 중인 마켓"""
+        return sorted(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        return len({subscriber for subscribers in self._subscribers.values() for subscriber in subscribers})
+
+    def subscribe(self, subscriber: Subscriber, markets: Iterable[str]) -> None:
+        """마켓 구독 추가 (마지막 시세가 있으면 바로 전달, 수집 작업이 없으면 시작)"""
+        for market in markets:
+            subscriber.markets.add(market)
+            self._subscribers.setdefault(market, set()).add(subscriber)
+            if market in self._latest:
+                subscriber.offer(market, self._latest[market])
+        if self._subscribers and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def unsubscribe(self, subscriber: Subscriber, markets: Optional[Iterable[str]] = None) -> None:
+        """마켓 구독 해제 (markets 가 없으면 전체), 구독자가 없는 마켓은 업스트림에서도 제외"""
+        for market in list(subscriber.markets if markets is None else markets):
+            subscriber.markets.discard(market)
+            subscribers = self._subscribers.get(market)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[market]
+                self._latest.pop(market, None)
+                self._versions.pop(market, None)
+
+    def publish(self, tickers: Iterable[Dict[str, Any]]) -> int:
+        """
+        업스트림 시세를 구독자에게 전달 (이전과 같은 체결이면 건너뜀)
+
+        Returns:
+            전달한 시세 수
+        """
+        published = 0
+        for ticker in tickers:
+            market = ticker.get('market')
+            subscribers = self._subscribers.get(market)
+            if not subscribers:
+                continue
+            version = (ticker.get('trade_timestamp'), ticker.get('trade_price'), ticker.get('acc_trade_volume_24h'))
+            if self._versions.get(market) == version:
+                continue
+            self._versions[market] = version
+            message = json.dumps({'type': 'ticker', **ticker}, ensure_ascii=False, separators=(',', ':'))
+            self._latest[market] = message
+            for subscriber in subscribers:
+                if subscriber.offer(market, message):
+                    self.stats['conflated'] += 1
+            self.stats['ticks'] += 1
+            self.stats['deliveries'] += len(subscribers)
+            published += 1
+        return published
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            started = time.monotonic()
+            try:
+                tickers = await asyncio.to_thread(self.fetch_tickers, self.markets)
+                self.publish(tickers)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"시세 수집 실패: {e}")
+            self.stats['polls'] += 1
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    async def close(self) -> None:
+        """수집 작업 중지 + 모든 구독자 종료"""
+        if self._task is not None:
+            self._task.cancel()
+        for subscribers in list(self._subscribers.values()):
+            for subscriber in list(subscribers):
+                subscriber.close()
+                self.unsubscribe(subscriber)
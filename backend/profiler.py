@@ -0,0 +1,250 @@
+"""
+요청 단위 샘플링 프로파일러
+등록된 스레드(요청을 처리하는 이벤트 루프 스레드 + 요청이 넘긴 작업 스레드)의 호출 스택을
+일정 간격으로 읽어(sys._current_frames) 모으고,
+flamegraph 도구(flamegraph.pl, speedscope, inferno)가 읽는 collapsed stack 형식과
+함수별 상위 N 개 요약(self / total 샘플)을 파일로 저장하는 모듈
+작업 스레드는 profiled_to_thread / ProfiledIterator 로 넘긴 작업만 등록된다 (다른 프로세스의 작업은 샘플링하지 않음).
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Any, Callable, Iterator
+
+DEFAULT_INTERVAL = 0.005  # 샘플 간격 (초)
+DEFAULT_MAX_DEPTH = 128
+
+# 현재 요청을 프로파일 중인 프로파일러 (asyncio.to_thread / 스레드풀로 넘긴 작업에도 전달됨)
+_active_profiler: contextvars.ContextVar[Optional['SamplingProfiler']] = contextvars.ContextVar(
+    'active_profiler', default=None)
+
+
+def _frame_label(code) -> str:
+    name = getattr(code, 'co_qualname', code.co_name)  # Python 3.11+: 클래스명 포함
+    return f'{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """
+    스레드 스택 샘플러 (백그라운드 스레드에서 샘플링)
+    스택 맨 바깥에 스레드 구분('[event-loop]', '[worker]')을 붙여 스레드별로 나눠 본다.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = DEFAULT_INTERVAL,
+                 max_depth: int = DEFAULT_MAX_DEPTH, label: str = 'event-loop'):
+        """
+        Args:
+            thread_id: 처음부터 샘플링할 스레드 (None 이면 현재 스레드)
+            interval: 샘플 간격 (초)
+            max_depth: 스택 최대 깊이 (넘으면 바깥쪽 프레임을 버림)
+            label: thread_id 스레드의 구분 이름
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.threads: Dict[int, str] = {self.thread_id: label}  # 샘플링할 스레드 -> 구분 이름
+        self._threads_lock = threading.Lock()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    @contextmanager
+    def activate(self):
+        """이 블록에서 시작한 작업(태스크 / 작업 스레드)이 이 프로파일러를 찾을 수 있게 함"""
+        token = _active_profiler.set(self)
+        try:
+            yield self
+        finally:
+            _active_profiler.reset(token)
+
+    @contextmanager
+    def attach(self, label: str = 'worker'):
+        """블록을 실행하는 동안 현재 스레드도 샘플링 (이미 등록된 스레드면 그대로)"""
+        ident = threading.get_ident()
+        with self._threads_lock:
+            added = ident not in self.threads
+            if added:
+                self.threads[ident] = label
+        try:
+            yield
+        finally:
+            if added:
+                with self._threads_lock:
+                    self.threads.pop(ident, None)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id not in frames:
+                break
+            with self._threads_lock:
+                threads = list(self.threads.items())
+            for ident, label in threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(f'[{label}]')
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """collapsed stack 형식 ('바깥;...;안쪽 샘플수' 한 줄씩)"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        함수별 샘플 수 상위 limit 개
+
+        self: 스택 맨 안쪽(실제로 실행 중)이었던 샘플 수
+        total: 스택 어딘가에 있었던 샘플 수 (재귀는 한 번만 셈)
+        """
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                total[label] += count
+        samples = self.samples or 1
+        return [
+            {
+                'function': label,
+                'self_samples': own[label],
+                'total_samples': count,
+                'self_percent': round(own[label] / samples * 100, 2),
+                'total_percent': round(count / samples * 100, 2),
+            }
+            for label, count in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+
+
+async def profiled_to_thread(func: Callable, *args, **kwargs):
+    """asyncio.to_thread 와 같되, 프로파일 중인 요청이면 작업 스레드도 샘플링"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    def run():
+        with profiler.attach():
+            return func(*args, **kwargs)
+    return await asyncio.to_thread(run)
+
+
+class ProfiledIterator:
+    """
+    동기 이터레이터 래퍼 (StreamingResponse 가 스레드풀에서 next() 를 부를 때 그 스레드도 샘플링)
+    프로파일 중이 아니면 그대로 통과한다.
+    """
+
+    def __init__(self, iterator: Iterator):
+        self.iterator = iter(iterator)
+        self.profiler = _active_profiler.get()
+
+    def __iter__(self) -> 'ProfiledIterator':
+        return self
+
+    def __next__(self):
+        if self.profiler is None:
+            return next(self.iterator)
+        with self.profiler.attach():
+            return next(self.iterator)
+
+
+class ProfileStore:
+    """프로파일 결과 파일 보관 ({id}.collapsed + {id}.json, 오래된 것부터 삭제)"""
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, profiler: SamplingProfiler, info: Dict[str, Any], top: int = 30,
+             profile_id: Optional[str] = None) -> str:
+        """
+        프로파일 저장 후 id 반환
+
+        Args:
+            profiler: 샘플링이 끝난 프로파일러
+            info: 요청 정보 (경로, 쿼리 등)
+            top: 요약에 포함할 함수 수
+            profile_id: 미리 정한 id (응답 헤더를 먼저 보내는 경우, None 이면 새로 생성)
+        """
+        profile_id = profile_id or uuid.uuid4().hex
+        summary = {
+            'id': profile_id,
+            'created_at': time.time(),
+            'duration': round(profiler.duration, 6),
+            'interval': profiler.interval,
+            'samples': profiler.samples,
+            **info,
+            'top': profiler.top(top),
+        }
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f'{profile_id}.collapsed'), 'w', encoding='utf-8') as f:
+                f.write(profiler.collapsed())
+            with open(os.path.join(self.directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            self._prune()
+        return profile_id
+
+    def _prune(self) -> None:
+        summaries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in summaries[:max(len(summaries) - self.max_profiles, 0)]:
+            for suffix in ('.json', '.collapsed'):
+                path = os.path.join(self.directory, entry.name[:-len('.json')] + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def path(self, profile_id: str, kind: str) -> Optional[str]:
+        """
+        저장된 파일 경로 (없으면 None)
+
+        Args:
+            profile_id: save 가 반환한 id
+            kind: 'collapsed' 또는 'json'
+        """
+        if kind not in ('collapsed', 'json'):
+            raise ValueError(f'Unsupported profile format: {kind}')
+        try:
+            if uuid.UUID(hex=profile_id).hex != profile_id:
+                return None
+        except ValueError:
+            return None
+        path = os.path.join(self.directory, f'{profile_id}.{kind}')
+        return path if os.path.exists(path) else None
@@ -0,0 +1,143 @@
+"""
+마켓 스크리너
+모든 마켓의 최근 캔들로 지표 / 매매 신호 / 상승 확률을 한 번에 계산해 표로 캐시하는 모듈
+계산은 백그라운드 갱신 시에만 수행하고, 사용자 조회는 캐시된 표를 필터링 / 정렬만 한다.
+"""
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from crypto_simulator import (
+    add_technical_indicators_panel,
+    find_buy_sell_signal_arrays,
+    calculate_uptrend_probability_series
+)
+from portfolio import build_price_panel
+
+SORTABLE_FIELDS = (
+    'market', 'close', 'change_rate', 'rsi', 'macd', 'macd_hist',
+    'volume_ratio', 'uptrend_probability'
+)
+
+
+def _to_float(value) -> Optional[float]:
+    """JSON 직렬화 가능한 float (NaN/inf 는 None)"""
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def compute_screener_table(frames: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+    """
+    마켓별 캔들 데이터로 스크리너 표 계산 (모든 마켓을 하나의 패널로 일괄 계산)
+
+    Args:
+        frames: 마켓 코드 -> OHLCV 데이터프레임
+
+    Returns:
+        마켓별 최신 봉 기준 지표 / 신호 / 상승 확률 목록
+    """
+    frames = {market: df for market, df in frames.items() if df is not None and len(df) > 0}
+    if not frames:
+        return []
+
+    close = build_price_panel(frames, 'Close')
+    volume = pd.concat({market: df['Volume'] for market, df in frames.items()}, axis=1).reindex(close.index)
+    # 상장 전 구간은 NaN 유지 (0 으로 채우면 Volume_MA / volume_ratio 가 실제 봉 20개 전부터 계산됨),
+    # 종가를 직전 값으로 채운 중간 결측일만 거래량 0
+    panel = add_technical_indicators_panel(close, volume.fillna(0).where(close.notna()))
+
+    indicators = {name: panel[name].to_numpy() for name in ('RSI', 'MACD', 'MACD_Signal', 'BB_Upper', 'BB_Lower')}
+    buy, sell = find_buy_sell_signal_arrays(close.to_numpy(), indicators)
+    uptrend = calculate_uptrend_probability_series(panel).iloc[-1]
+
+    latest = panel.iloc[-1]
+    previous = close.iloc[-2] if len(close) > 1 else close.iloc[-1]
+    rows = []
+    for i, market in enumerate(close.columns):
+        volume_ma = latest[('Volume_MA', market)]
+        rows.append({
+            'market': market,
+            'date': frames[market].index[-1].strftime('%Y-%m-%d %H:%M:%S'),
+            'close': _to_float(latest[('Close', market)]),
+            'change_rate': _to_float((latest[('Close', market)] / previous[market] - 1) * 100),
+            'rsi': _to_float(latest[('RSI', market)]),
+            'macd': _to_float(latest[('MACD', market)]),
+            'macd_hist': _to_float(latest[('MACD_Hist', market)]),
+            'volume_ratio': _to_float(latest[('Volume', market)] / volume_ma) if volume_ma else None,
+            'buy_signal': int(buy[-1, i]),
+            'sell_signal': int(sell[-1, i]),
+            'uptrend_probability': _to_float(uptrend[market]),
+        })
+    return rows
+
+
+class MarketScreener:
+    """스크리너 표 캐시 (갱신은 백그라운드, 조회는 캐시 읽기만)"""
+
+    def __init__(self, load_candles: Callable[[str], Optional[pd.DataFrame]]):
+        """
+        Args:
+            load_candles: 마켓 코드 -> 최근 OHLCV 데이터프레임 (실패 시 None)
+        """
+        self.load_candles = load_candles
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, markets: List[str]) -> Dict[str, Any]:
+        """모든 마켓의 캔들을 불러와 표를 다시 계산하고 캐시 교체"""
+        with self._refresh_lock:
+            frames = {market: self.load_candles(market) for market in markets}
+            rows = compute_screener_table(frames)
+            # 조회 중인 요청이 있어도 안전하도록 새 객체로 한 번에 교체
+            self.snapshot = {
+                'updated_at': datetime.now().isoformat(),
+                'rows': rows,
+                'failed_markets': [market for market, df in frames.items() if df is None or len(df) == 0],
+            }
+            return self.snapshot
+
+    def query(self, signal: Optional[str] = None, min_uptrend: Optional[float] = None,
+              max_rsi: Optional[float] = None, sort_by: str = 'uptrend_probability',
+              descending: bool = True, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 표 필터링 / 정렬
+
+        Args:
+            signal: 'buy' 또는 'sell' (해당 신호가 발생한 마켓만)
+            min_uptrend: 최소 상승 확률
+            max_rsi: 최대 RSI
+            sort_by: 정렬 기준 필드 (SORTABLE_FIELDS)
+            descending: 내림차순 여부
+            limit: 최대 반환 개수
+
+        Returns:
+            {'updated_at', 'count', 'rows'} (아직 갱신 전이면 None)
+        """
+        if signal not in (None, 'buy', 'sell'):
+            raise ValueError(f'Unsupported signal filter: {signal}')
+        if sort_by not in SORTABLE_FIELDS:
+            raise ValueError(f'Unsupported sort field: {sort_by}')
+
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+
+        rows = snapshot['rows']
+        if signal:
+            rows = [row for row in rows if row[f'{signal}_signal']]
+        if min_uptrend is not None:
+            rows = [row for row in rows if row['uptrend_probability'] is not None and row['uptrend_probability'] >= min_uptrend]
+        if max_rsi is not None:
+            rows = [row for row in rows if row['rsi'] is not None and row['rsi'] <= max_rsi]
+
+        # 값이 없는 행은 정렬 방향과 관계없이 마지막
+        present = [row for row in rows if row[sort_by] is not None]
+        missing = [row for row in rows if row[sort_by] is None]
+        rows = sorted(present, key=lambda row: row[sort_by], reverse=descending) + missing
+        if limit is not None:
+            rows = rows[:limit]
+
+        return {'updated_at': snapshot['updated_at'], 'count': len(rows), 'rows': rows}
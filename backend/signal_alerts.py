@@ -0,0 +1,411 @@
+"""
+실시간 매매 신호 알림
+마켓별 지표 상태(RSI / MACD / 볼린저 밴드)를 마감된 봉마다 O(1) 로 갱신하고,
+find_optimal_buy_sell_signals 와 같은 매수 / 매도 조건이 성립하면 구독 중인 클라이언트(WebSocket / SSE)에 알림을 보낸다.
+같은 봉은 한 번만 처리하고, 연속 봉에서 이어지는 신호는 첫 봉만, 같은 방향 알림은 쿨다운 시간 안에 다시 보내지 않는다.
+"""
+import json
+import math
+import time
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from crypto_simulator import DEFAULT_INDICATOR_PARAMS
+from candle_store import INTERVAL_SECONDS
+
+NAN = float('nan')
+
+
+class StreamingIndicators:
+    """
+    마켓 하나의 지표 상태 (IndicatorPipeline 과 같은 정의, 봉마다 O(1) 갱신)
+
+    - RSI: 최근 rsi_period 개 상승 / 하락폭 평균 (첫 봉의 변화량은 0)
+    - MACD: EMA(fast) - EMA(slow), 시그널은 MACD 의 EMA (pandas ewm(adjust=False) 와 같이 첫 값부터 시작)
+    - 볼린저 밴드: 최근 bb_period 개 종가의 평균 ± bb_std × 표본 표준편차
+    이동 합계는 창이 한 바퀴 돌 때마다 (볼린저 밴드는 창이 평평할 때도) 창 안의 값으로 다시 계산해
+    부동소수점 오차가 쌓이지 않게 한다.
+    """
+
+    __slots__ = ('params', 'count', 'close', 'prev_close', 'rsi', 'macd', 'macd_signal', 'prev_macd',
+                 'prev_macd_signal', 'bb_middle', 'bb_upper', 'bb_lower', 'prev_bb_lower',
+                 '_fast_alpha', '_slow_alpha', '_signal_alpha', '_ema_fast', '_ema_slow',
+                 '_gains', '_losses', '_gain_sum', '_loss_sum', '_window', '_mean', '_m2')
+
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            params: DEFAULT_INDICATOR_PARAMS 덮어쓰기
+        """
+        self.params = {**DEFAULT_INDICATOR_PARAMS, **(params or {})}
+        self.count = 0
+        self.close = self.prev_close = NAN
+        self.rsi = self.macd = self.macd_signal = self.prev_macd = self.prev_macd_signal = NAN
+        self.bb_middle = self.bb_upper = self.bb_lower = self.prev_bb_lower = NAN
+        self._fast_alpha = 2 / (self.params['macd_fast'] + 1)
+        self._slow_alpha = 2 / (self.params['macd_slow'] + 1)
+        self._signal_alpha = 2 / (self.params['macd_signal'] + 1)
+        self._ema_fast = self._ema_slow = NAN
+        self._gains: Deque[float] = deque(maxlen=self.params['rsi_period'])
+        self._losses: Deque[float] = deque(maxlen=self.params['rsi_period'])
+        self._gain_sum = self._loss_sum = 0.0
+        self._window: Deque[float] = deque(maxlen=self.params['bb_period'])
+        self._mean = self._m2 = 0.0
+
+    def update(self, close: float) -> None:
+        """마감된 봉의 종가 반영"""
+        self.prev_close, self.prev_macd, self.prev_macd_signal = self.close, self.macd, self.macd_signal
+        self.prev_bb_lower = self.bb_lower
+        self.close = close
+        self.count += 1
+
+        # RSI
+        delta = close - self.prev_close if self.count > 1 else 0.0
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        period = self.params['rsi_period']
+        if len(self._gains) == period:
+            self._gain_sum -= self._gains[0]
+            self._loss_sum -= self._losses[0]
+        self._gains.append(gain)
+        self._losses.append(loss)
+        if self.count % period == 0:
+            self._gain_sum, self._loss_sum = sum(self._gains), sum(self._losses)
+        else:
+            self._gain_sum += gain
+            self._loss_sum += loss
+        if len(self._gains) == period:
+            average_gain, average_loss = self._gain_sum / period, self._loss_sum / period
+            if average_loss > 0:
+                self.rsi = 100 - 100 / (1 + average_gain / average_loss)
+            else:
+                self.rsi = 100.0 if average_gain > 0 else NAN
+
+        # MACD
+        if self.count == 1:
+            self._ema_fast = self._ema_slow = close
+            self.macd = 0.0
+            self.macd_signal = 0.0
+        else:
+            self._ema_fast += self._fast_alpha * (close - self._ema_fast)
+            self._ema_slow += self._slow_alpha * (close - self._ema_slow)
+            self.macd = self._ema_fast - self._ema_slow
+            self.macd_signal += self._signal_alpha * (self.macd - self.macd_signal)
+
+        # 볼린저 밴드 (이동 창 Welford)
+        window = self.params['bb_period']
+        if len(self._window) == window:
+            removed = self._window[0]
+            self._window.append(close)
+            previous_mean = self._mean
+            self._mean += (close - removed) / window
+            self._m2 += (close - removed) * (close - self._mean + removed - previous_mean)
+        else:
+            self._window.append(close)
+            previous_mean = self._mean
+            self._mean += (close - previous_mean) / len(self._window)
+            self._m2 += (close - previous_mean) * (close - self._mean)
+        if self.count % window == 0:
+            self._resync_window()
+        if len(self._window) == window:
+            if self._m2 <= 1e-12 * self._mean ** 2 * window:
+                # 평평한 창: 이동 평균에 남은 오차로 하단 밴드가 종가보다 커져 돌파 신호가 잘못 나지 않도록
+                # 창에서 평균을 다시 계산하고 잡음 수준의 분산은 0 으로 (모든 값이 같으면 bb_lower == close)
+                self._resync_window()
+                if self._m2 <= 1e-12 * self._mean ** 2 * window:
+                    self._m2 = 0.0
+            std = math.sqrt(max(self._m2, 0.0) / (window - 1))
+            self.bb_middle = self._mean
+            self.bb_upper = self._mean + std * self.params['bb_std']
+            self.bb_lower = self._mean - std * self.params['bb_std']
+
+    def _resync_window(self) -> None:
+        """볼린저 밴드 창의 평균 / 제곱편차 합을 창 안의 값으로 다시 계산"""
+        if min(self._window) == max(self._window):
+            self._mean, self._m2 = self._window[0], 0.0
+            return
+        self._mean = math.fsum(self._window) / len(self._window)
+        self._m2 = math.fsum((value - self._mean) ** 2 for value in self._window)
+
+    def signals(self, rsi_oversold: float = 30, rsi_overbought: float = 70) -> Tuple[List[str], List[str]]:
+        """
+        마지막 봉의 매수 / 매도 조건 (find_buy_sell_signal_arrays 와 같은 조건, 지표가 없으면 불성립)
+
+        Returns:
+            (매수 사유 목록, 매도 사유 목록) - 비어 있으면 신호 없음
+        """
+        buy, sell = [], []
+        if self.rsi < rsi_oversold and self.macd > self.macd_signal and self.prev_macd <= self.prev_macd_signal:
+            buy.append('rsi_oversold_macd_golden_cross')
+        if self.close < self.bb_lower and self.prev_close >= self.prev_bb_lower:
+            buy.append('bollinger_lower_break')
+        if self.rsi > rsi_overbought and self.macd < self.macd_signal and self.prev_macd >= self.prev_macd_signal:
+            sell.append('rsi_overbought_macd_dead_cross')
+        if self.close > self.bb_upper:
+            sell.append('bollinger_upper_break')
+        return buy, sell
+
+
+def _number(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class SignalAlertEngine:
+    """마켓별 지표 상태와 알림 판단 (같은 봉 중복 / 연속 신호 / 쿨다운 처리)"""
+
+    def __init__(self, interval: str = '1h', cooldown_seconds: float = 3600, params: Optional[Dict[str, Any]] = None,
+                 rsi_oversold: float = 30, rsi_overbought: float = 70):
+        """
+        Args:
+            interval: 캔들 주기 (알림에 표시)
+            cooldown_seconds: 같은 마켓 / 같은 방향 알림 사이 최소 간격 (봉 시각 기준, 초)
+            params: 지표 파라미터 (DEFAULT_INDICATOR_PARAMS 덮어쓰기)
+            rsi_oversold / rsi_overbought: RSI 과매도 / 과매수 기준
+        """
+        self.interval = interval
+        self.cooldown = pd.Timedelta(seconds=cooldown_seconds)
+        self.params = params
+        self.rsi_oversold = rsi_oversold
+        self.rsi_overbought = rsi_overbought
+        self.stats = {'updates': 0, 'signals': 0, 'alerts': 0, 'suppressed': 0}
+        self._indicators: Dict[str, StreamingIndicators] = {}
+        self._last_time: Dict[str, pd.Timestamp] = {}
+        self._active: Dict[Tuple[str, str], bool] = {}
+        self._last_alert: Dict[Tuple[str, str], pd.Timestamp] = {}
+        self._sequence = 0
+
+    @property
+    def markets(self) -> List[str]:
+        return sorted(self._indicators)
+
+    def last_time(self, market: str) -> Optional[pd.Timestamp]:
+        """마지막으로 반영한 봉 시각 (없으면 None)"""
+        return self._last_time.get(market)
+
+    def reset(self, market: str) -> None:
+        """마켓 상태 삭제 (다시 warm_up 해야 함)"""
+        self._indicators.pop(market, None)
+        self._last_time.pop(market, None)
+        for side in ('buy', 'sell'):
+            self._active.pop((market, side), None)
+
+    def warm_up(self, market: str, candles: pd.DataFrame) -> None:
+        """과거 봉으로 지표 상태를 채움 (알림 없음, 이미 반영한 봉은 건너뜀)"""
+        for timestamp, close in zip(candles.index, candles['Close'].to_numpy(dtype=float)):
+            self.on_candle(market, timestamp, close, notify=False)
+
+    def on_candle(self, market: str, timestamp: pd.Timestamp, close: float, notify: bool = True) -> List[Dict[str, Any]]:
+        """
+        마감된 봉 반영 후 새 알림 목록 반환
+
+        Args:
+            market: 마켓 코드
+            timestamp: 봉 시작 시각
+            close: 종가
+            notify: False 면 상태만 갱신 (warm-up)
+        """
+        last = self._last_time.get(market)
+        if last is not None and timestamp <= last:
+            return []
+        close = float(close)
+        indicators = self._indicators.get(market)
+        if indicators is None:
+            indicators = self._indicators[market] = StreamingIndicators(self.params)
+        indicators.update(close)
+        self._last_time[market] = timestamp
+        self.stats['updates'] += 1
+
+        alerts = []
+        for side, reasons in zip(('buy', 'sell'), indicators.signals(self.rsi_oversold, self.rsi_overbought)):
+            key = (market, side)
+            was_active, self._active[key] = self._active.get(key, False), bool(reasons)
+            if not reasons or not notify:
+                continue
+            self.stats['signals'] += 1
+            last_alert = self._last_alert.get(key)
+            if was_active or (last_alert is not None and timestamp - last_alert < self.cooldown):
+                self.stats['suppressed'] += 1
+                continue
+            self._last_alert[key] = timestamp
+            self._sequence += 1
+            self.stats['alerts'] += 1
+            alerts.append({
+                'id': self._sequence,
+                'market': market,
+                'interval': self.interval,
+                'signal': side,
+                'reasons': reasons,
+                'time': timestamp.strftime('%Y-%m-%d %H:%M'),
+                'close': close,
+                'rsi': _number(indicators.rsi),
+                'macd': _number(indicators.macd),
+                'macd_signal': _number(indicators.macd_signal),
+                'bb_upper': _number(indicators.bb_upper),
+                'bb_lower': _number(indicators.bb_lower),
+            })
+        return alerts
+
+
+class AlertSubscription:
+    """클라이언트 한 명의 알림 대기열 (가득 차면 가장 오래된 알림을 버림)"""
+
+    def __init__(self, markets: Optional[Set[str]] = None, queue_size: int = 100):
+        """
+        Args:
+            markets: 받을 마켓 (None 이면 전체)
+            queue_size: 보내지 못한 알림 최대 개수
+        """
+        self.markets = markets
+        self.dropped = 0
+        self._queue: Deque[Tuple[int, str]] = deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+
+    def accepts(self, market: str) -> bool:
+        return self.markets is None or market in self.markets
+
+    def put(self, alert_id: int, message: str) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append((alert_id, message))
+        self._ready.set()
+
+    async def get(self) -> Tuple[int, str]:
+        """다음 알림 (id, JSON) - 올 때까지 대기"""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+
+class AlertBroker:
+    """알림 팬아웃 (JSON 은 한 번만 만들고, 최근 알림은 재연결 / 조회용으로 보관)"""
+
+    def __init__(self, history: int = 500, queue_size: int = 100):
+        """
+        Args:
+            history: 보관할 최근 알림 수
+            queue_size: 구독자별 대기열 크기
+        """
+        self.queue_size = queue_size
+        self.stats = {'published': 0, 'deliveries': 0}
+        self._history: Deque[Tuple[int, str, str]] = deque(maxlen=history)  # (id, 마켓, JSON)
+        self._subscriptions: Set[AlertSubscription] = set()
+
+    def subscribe(self, markets: Optional[Iterable[str]] = None) -> AlertSubscription:
+        subscription = AlertSubscription(set(markets) if markets else None, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AlertSubscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def dropped(self) -> int:
+        return sum(subscription.dropped for subscription in self._subscriptions)
+
+    def publish(self, alert: Dict[str, Any]) -> None:
+        """알림 전송 (이벤트 루프 스레드에서 호출)"""
+        message = json.dumps({'type': 'alert', **alert}, ensure_ascii=False, separators=(',', ':'))
+        self._history.append((alert['id'], alert['market'], message))
+        self.stats['published'] += 1
+        for subscription in self._subscriptions:
+            if subscription.accepts(alert['market']):
+                subscription.put(alert['id'], message)
+                self.stats['deliveries'] += 1
+
+    def recent(self, markets: Optional[Iterable[str]] = None, after: int = 0,
+               limit: Optional[int] = None) -> List[Tuple[int, str]]:
+        """보관 중인 알림 중 id 가 after 보다 큰 것 (오래된 순, limit 이 있으면 최근 limit 개)"""
+        markets = set(markets) if markets else None
+        items = [(alert_id, message) for alert_id, market, message in self._history
+                 if alert_id > after and (markets is None or market in markets)]
+        return items[-limit:] if limit else items
+
+
+class SignalAlertService:
+    """
+    마켓 목록의 마감된 봉을 주기마다 가져와 엔진에 반영하고 알림을 전송
+    처음 보는 마켓은 warmup 개 과거 봉으로 상태를 채우고, 이후에는 놓친 봉만 가져온다.
+    """
+
+    def __init__(self, engine: SignalAlertEngine, broker: AlertBroker,
+                 fetch_candles: Callable[[str, int], Optional[pd.DataFrame]], warmup: int = 200,
+                 delay_seconds: float = 3.0, concurrency: int = 8):
+        """
+        Args:
+            engine: 신호 판단 엔진 (engine.interval 주기 봉 사용)
+            broker: 알림 전송
+            fetch_candles: (마켓, 개수) -> 최근 봉 데이터프레임 (KST 봉 시작 시각 인덱스, 'Close' 컬럼, 진행 중인 봉 포함 가능)
+            warmup: 처음 가져올 과거 봉 개수 (최대 200, 요청 한 번)
+            delay_seconds: 봉 마감 후 조회까지 기다리는 시간 (거래소 반영 지연)
+            concurrency: 동시에 조회할 마켓 수 (거래소 한도는 스케줄러가 적용)
+        """
+        self.engine = engine
+        self.broker = broker
+        self.fetch_candles = fetch_candles
+        self.warmup = warmup
+        self.delay_seconds = delay_seconds
+        self.concurrency = concurrency
+        self.interval = pd.Timedelta(seconds=INTERVAL_SECONDS[engine.interval])
+        self.stats = {'rounds': 0, 'fetch_errors': 0, 'last_round_seconds': 0.0}
+
+    def _closed_candles(self, market: str, now: pd.Timestamp) -> Optional[pd.DataFrame]:
+        """마지막 반영 이후 마감된 봉 (놓친 봉이 warmup 개를 넘으면 상태를 초기화하고 다시 채움)"""
+        last = self.engine.last_time(market)
+        if last is None:
+            count = self.warmup
+        else:
+            count = int((now - last) / self.interval) + 2
+            if count > self.warmup:
+                self.engine.reset(market)
+                count = self.warmup
+        candles = self.fetch_candles(market, max(min(count, self.warmup), 1))
+        if candles is None:
+            return None
+        return candles[candles.index + self.interval <= now]
+
+    async def poll(self, markets: Iterable[str]) -> int:
+        """
+        한 번 조회해서 반영
+
+        Returns:
+            보낸 알림 수
+        """
+        started = time.perf_counter()
+        now = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(market):
+            async with semaphore:
+                try:
+                    return market, await asyncio.to_thread(self._closed_candles, market, now)
+                except Exception as e:
+                    print(f"{market} 봉 조회 실패: {e}")
+                    return market, None
+
+        sent = 0
+        for market, candles in await asyncio.gather(*(fetch(market) for market in markets)):
+            if candles is None:
+                self.stats['fetch_errors'] += 1
+                continue
+            if self.engine.last_time(market) is None:
+                # 처음 보는 마켓은 지난 봉으로 상태만 채움 (과거 신호는 알리지 않음)
+                self.engine.warm_up(market, candles)
+                continue
+            for timestamp, close in zip(candles.index, candles['Close'].to_numpy(dtype=float)):
+                for alert in self.engine.on_candle(market, timestamp, close):
+                    self.broker.publish(alert)
+                    sent += 1
+        self.stats['rounds'] += 1
+        self.stats['last_round_seconds'] = time.perf_counter() - started
+        return sent
+
+    def seconds_until_next_close(self) -> float:
+        """다음 봉 마감 + delay_seconds 까지 남은 시간 (거래소 봉은 UTC 기준으로 나뉨, 일봉은 KST 09:00 시작)"""
+        now = pd.Timestamp.now(tz='UTC')
+        next_close = now.floor(self.interval) + self.interval
+        return (next_close - now).total_seconds() + self.delay_seconds
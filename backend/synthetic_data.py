@@ -0,0 +1,258 @@
+"""
+합성 시장 데이터 생성기
+부하 테스트 / 벤치마크용 대용량 OHLCV 데이터를 벡터화해 생성하는 모듈
+- GBM 기본 경로 + 포아송 점프 + 로그 변동성 AR(1) (GARCH 와 비슷한 변동성 군집) + 마르코프 국면 전환
+- 상관관계가 있는 다중 자산, 분/시간/일봉 주기
+- 호출마다 독립된 numpy.random.Generator 사용 (같은 시드면 chunk 크기와 관계없이 같은 데이터)
+- chunk 단위로 CandleStore 디스크 형식에 바로 기록해 전체를 메모리에 올리지 않음
+"""
+from typing import Optional, Dict, List, Any, Iterator, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+from candle_store import INTERVAL_SECONDS, OHLCV_COLUMNS, market_directory, write_columns
+
+SECONDS_PER_YEAR = 365 * 86400
+
+# 국면별 연율 drift / 변동성 배수 / 평균 지속 기간(일)
+DEFAULT_REGIMES = [
+    {'name': 'calm', 'drift': 0.3, 'volatility_scale': 0.7, 'mean_duration_days': 60},
+    {'name': 'volatile', 'drift': 0.0, 'volatility_scale': 1.5, 'mean_duration_days': 20},
+    {'name': 'crash', 'drift': -3.0, 'volatility_scale': 2.5, 'mean_duration_days': 5},
+]
+
+# 자주 쓰는 모델 조합 (SyntheticMarketGenerator 인자)
+PRESETS: Dict[str, Dict[str, Any]] = {
+    'gbm': {},
+    'jump': {'jump_intensity': 12.0, 'jump_mean': -0.01, 'jump_std': 0.05},
+    'garch': {'vol_of_vol': 0.5, 'vol_half_life_days': 10.0},
+    'regime': {'regimes': DEFAULT_REGIMES, 'vol_of_vol': 0.3, 'jump_intensity': 6.0, 'jump_std': 0.04},
+}
+
+
+class SyntheticMarketGenerator:
+    """상태를 유지하며 chunk 단위로 이어서 생성하는 합성 캔들 생성기"""
+
+    def __init__(self, markets: Union[int, Sequence[str]] = 1, interval: str = '1d', seed: Optional[int] = None,
+                 start: str = '2020-01-01', initial_price: Union[float, Sequence[float]] = 50000000,
+                 drift: float = 0.1, volatility: float = 0.8, correlation: Union[float, np.ndarray] = 0.0,
+                 jump_intensity: float = 0.0, jump_mean: float = 0.0, jump_std: float = 0.0,
+                 vol_of_vol: float = 0.0, vol_half_life_days: float = 10.0,
+                 regimes: Optional[List[Dict[str, Any]]] = None, daily_volume: float = 1000.0):
+        """
+        Args:
+            markets: 자산 개수 또는 마켓 코드 목록
+            interval: 캔들 주기 (INTERVAL_SECONDS 의 키)
+            seed: 난수 시드 (None 이면 매번 다른 데이터)
+            start: 첫 캔들 시각
+            initial_price: 자산별 시작 가격
+            drift / volatility: 연율 기대 수익률 / 변동성 (국면이 있으면 drift 대신 국면 drift 사용)
+            correlation: 자산 간 수익률 상관계수 (스칼라 또는 상관행렬)
+            jump_intensity: 연간 평균 점프 횟수 (0 이면 점프 없음)
+            jump_mean / jump_std: 점프 크기(로그 수익률)의 평균 / 표준편차
+            vol_of_vol: 로그 변동성의 정상 표준편차 (0 이면 변동성 일정)
+            vol_half_life_days: 변동성 충격의 반감기 (일)
+            regimes: 국면 목록 (DEFAULT_REGIMES 형식, None 이면 국면 전환 없음)
+            daily_volume: 자산별 하루 평균 거래량
+        """
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f'Unsupported candle interval: {interval}')
+        self.markets = [f'SYN-{i + 1}' for i in range(markets)] if isinstance(markets, int) else list(markets)
+        n_assets = len(self.markets)
+        if n_assets == 0:
+            raise ValueError('At least one market is required')
+
+        self.interval = interval
+        self.interval_seconds = INTERVAL_SECONDS[interval]
+        self.dt = self.interval_seconds / SECONDS_PER_YEAR
+        self.start = pd.Timestamp(start)
+        self.volatility = volatility
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.daily_volume = daily_volume
+
+        correlation_matrix = np.asarray(correlation, dtype=np.float64)
+        if correlation_matrix.ndim == 0:
+            correlation_matrix = np.full((n_assets, n_assets), float(correlation))
+            np.fill_diagonal(correlation_matrix, 1.0)
+        try:
+            self.cholesky = np.linalg.cholesky(correlation_matrix)
+        except np.linalg.LinAlgError:
+            raise ValueError('Correlation matrix must be positive definite')
+
+        bars_per_day = 86400 / self.interval_seconds
+        self.vol_persistence = 0.5 ** (1 / max(vol_half_life_days * bars_per_day, 1e-9))
+        self.vol_shock = vol_of_vol * np.sqrt(1 - self.vol_persistence ** 2)
+
+        self.regimes = regimes or [{'name': 'base', 'drift': drift, 'volatility_scale': 1.0, 'mean_duration_days': np.inf}]
+        self.regime_drift = np.array([regime['drift'] for regime in self.regimes])
+        self.regime_volatility = np.array([regime['volatility_scale'] for regime in self.regimes])
+        self.regime_bars = np.array([regime['mean_duration_days'] * bars_per_day for regime in self.regimes])
+
+        # 구성 요소별 독립 난수 스트림 - 막대당 소비량이 고정되어 chunk 크기와 무관하게 같은 경로
+        streams = np.random.SeedSequence(seed).spawn(7)
+        (self.rng_returns, self.rng_volatility, self.rng_jump_count, self.rng_jump_size,
+         self.rng_regime, self.rng_range, self.rng_volume) = [np.random.default_rng(stream) for stream in streams]
+
+        # 이어서 생성하기 위한 상태
+        self.log_price = np.log(np.broadcast_to(np.asarray(initial_price, dtype=np.float64), (n_assets,))).copy()
+        self.log_volatility = np.zeros(n_assets)
+        self.regime = 0
+        self.regime_remaining = self._draw_duration(0)
+        self.position = 0
+
+    def _draw_duration(self, regime: int) -> int:
+        mean_bars = self.regime_bars[regime]
+        if not np.isfinite(mean_bars):
+            return np.iinfo(np.int64).max
+        return int(self.rng_regime.geometric(1 / max(mean_bars, 1)))
+
+    def _regime_path(self, n_bars: int) -> np.ndarray:
+        """막대별 국면 번호 (지속 기간 단위로 채워 벡터화)"""
+        path = np.empty(n_bars, dtype=np.int64)
+        filled = 0
+        while filled < n_bars:
+            if self.regime_remaining == 0:
+                others = [i for i in range(len(self.regimes)) if i != self.regime]
+                self.regime = int(others[self.rng_regime.integers(len(others))])
+                self.regime_remaining = self._draw_duration(self.regime)
+            run = min(self.regime_remaining, n_bars - filled)
+            path[filled:filled + run] = self.regime
+            filled += run
+            self.regime_remaining -= run
+        return path
+
+    def next_chunk(self, n_bars: int) -> Dict[str, pd.DataFrame]:
+        """
+        다음 n_bars 개 캔들 생성
+
+        Returns:
+            마켓 코드 -> OHLCV 데이터프레임
+        """
+        n_assets = len(self.markets)
+        shape = (n_bars, n_assets)
+        regime = self._regime_path(n_bars)
+
+        # 로그 변동성 AR(1): h_t = phi * h_{t-1} + eta_t
+        if self.vol_shock:
+            shocks = self.vol_shock * self.rng_volatility.standard_normal(shape)
+            log_volatility, _ = lfilter([1.0], [1.0, -self.vol_persistence], shocks, axis=0,
+                                        zi=(self.vol_persistence * self.log_volatility)[None, :])
+            self.log_volatility = log_volatility[-1]
+            sigma = self.volatility * self.regime_volatility[regime][:, None] * np.exp(log_volatility)
+        else:
+            sigma = np.broadcast_to(self.volatility * self.regime_volatility[regime][:, None], shape)
+
+        noise = self.rng_returns.standard_normal(shape) @ self.cholesky.T
+        step_sigma = sigma * np.sqrt(self.dt)
+        log_returns = (self.regime_drift[regime][:, None] - 0.5 * sigma ** 2) * self.dt + step_sigma * noise
+
+        if self.jump_intensity:
+            counts = self.rng_jump_count.poisson(self.jump_intensity * self.dt, shape)
+            log_returns += counts * self.jump_mean + np.sqrt(counts) * self.jump_std * self.rng_jump_size.standard_normal(shape)
+
+        log_close = self.log_price + np.cumsum(log_returns, axis=0)
+        log_open = np.vstack([self.log_price[None, :], log_close[:-1]])
+        self.log_price = log_close[-1].copy()
+
+        # 시가 -> 종가 브라운 브리지의 최대 / 최소 표본으로 고가 / 저가 생성
+        uniforms = self.rng_range.random((*shape, 2))
+        spread = -2 * step_sigma[..., None] ** 2 * np.log1p(-uniforms)
+        high = np.exp(log_open + (log_returns + np.sqrt(log_returns ** 2 + spread[..., 0])) / 2)
+        low = np.exp(log_open + (log_returns - np.sqrt(log_returns ** 2 + spread[..., 1])) / 2)
+
+        # 거래량: 로그정규 잡음 x 움직임 크기
+        bar_volume = self.daily_volume * self.interval_seconds / 86400
+        volume = bar_volume * np.exp(0.5 * self.rng_volume.standard_normal(shape) - 0.125) \
+            * (0.5 + np.abs(log_returns) / np.maximum(step_sigma, 1e-12))
+
+        index = pd.DatetimeIndex(
+            self.start + pd.to_timedelta((self.position + np.arange(n_bars)) * self.interval_seconds, unit='s'),
+            name='Date'
+        )
+        self.position += n_bars
+
+        open_, close = np.exp(log_open), np.exp(log_close)
+        return {
+            market: pd.DataFrame({
+                'Open': open_[:, i], 'High': high[:, i], 'Low': low[:, i], 'Close': close[:, i], 'Volume': volume[:, i]
+            }, index=index)
+            for i, market in enumerate(self.markets)
+        }
+
+    def iter_chunks(self, n_bars: int, chunk_size: int = 250000) -> Iterator[Dict[str, pd.DataFrame]]:
+        """n_bars 개를 chunk_size 단위로 나눠 생성"""
+        remaining = n_bars
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            remaining -= size
+            yield self.next_chunk(size)
+
+
+def generate_market_data(n_bars: int, preset: str = 'gbm', **params) -> Dict[str, pd.DataFrame]:
+    """
+    합성 데이터를 메모리에 한 번에 생성
+
+    Args:
+        n_bars: 캔들 개수
+        preset: PRESETS 의 이름 (params 로 개별 값 덮어쓰기)
+        params: SyntheticMarketGenerator 인자
+
+    Returns:
+        마켓 코드 -> OHLCV 데이터프레임
+    """
+    if preset not in PRESETS:
+        raise ValueError(f'Unsupported preset: {preset}')
+    generator = SyntheticMarketGenerator(**{**PRESETS[preset], **params})
+    return generator.next_chunk(n_bars)
+
+
+def write_synthetic_candle_store(directory: str, n_bars: int, preset: str = 'gbm', chunk_size: int = 250000,
+                                 **params) -> Dict[str, Any]:
+    """
+    합성 데이터를 chunk 단위로 CandleStore 디스크 형식({directory}/{market}/{interval}/*.bin)에 기록
+    같은 주기를 base_interval 로 하는 CandleStore 나 fake_exchange --candle-store 에서 바로 읽을 수 있다.
+
+    Returns:
+        {'markets', 'interval', 'bars', 'start', 'end'}
+    """
+    if preset not in PRESETS:
+        raise ValueError(f'Unsupported preset: {preset}')
+    generator = SyntheticMarketGenerator(**{**PRESETS[preset], **params})
+    written = 0
+    first = last = None
+    for chunk in generator.iter_chunks(n_bars, chunk_size):
+        for market, frame in chunk.items():
+            write_columns(market_directory(directory, market, generator.interval), written, frame.index,
+                          {column: frame[column].to_numpy() for column in OHLCV_COLUMNS})
+        first = frame.index[0] if first is None else first
+        last = frame.index[-1]
+        written += len(frame)
+    return {'markets': generator.markets, 'interval': generator.interval, 'bars': written,
+            'start': str(first), 'end': str(last)}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='합성 캔들 데이터를 CandleStore 디스크 형식으로 생성')
+    parser.add_argument('directory')
+    parser.add_argument('--bars', type=int, default=1000000)
+    parser.add_argument('--markets', type=int, default=1)
+    parser.add_argument('--interval', default='1m')
+    parser.add_argument('--preset', default='regime', choices=sorted(PRESETS))
+    parser.add_argument('--correlation', type=float, default=0.5)
+    parser.add_argument('--chunk-size', type=int, default=250000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = write_synthetic_candle_store(
+        args.directory, args.bars, preset=args.preset, chunk_size=args.chunk_size,
+        markets=args.markets, interval=args.interval, correlation=args.correlation, seed=args.seed
+    )
+    print(f"{summary} ({time.perf_counter() - started:.1f}s)")
@@ -0,0 +1,163 @@
+"""
+성능 계측 모듈
+파이프라인 단계 / DB 호출 / 거래소 호출의 소요 시간을 히스토그램으로 모으고,
+캐시 적중률 / 대기열 길이 / 거래소 한도 여유 같은 현재 상태 값은 수집 시점에만 읽어
+Prometheus 텍스트 형식(/metrics)으로 내보낸다.
+기록은 버킷 카운터 증가뿐이라 /metrics 를 아무도 조회하지 않으면 추가 비용이 거의 없다.
+"""
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# 소요 시간 버킷 (초) - 수 ms 단위 지표 계산부터 수 초 단위 거래소 수집까지
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 수집 함수가 반환하는 값: (이름, 타입, 설명, [(레이블, 값), ...])
+Sample = Tuple[Dict[str, str], float]
+MetricFamily = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (레이블 조합별 버킷 카운트 / 합계 / 개수)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 -> [버킷별 개수(마지막은 +Inf), 합계]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """블록 실행 시간을 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict[tuple, Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for key, (counts, total) in sorted(self.snapshot().items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), counts):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, 'le': _format_value(float(bound))})
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """계측 값 모음 + 수집 시점에 호출되는 상태 수집 함수"""
+
+    def __init__(self, prefix: str = 'backtest'):
+        self.prefix = prefix
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(f'{self.prefix}_{name}', documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """/metrics 조회 때만 호출되는 상태 수집 함수 등록"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"메트릭 수집 실패: {e}")
+                continue
+            for name, kind, documentation, samples in families:
+                name = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+# 프로세스 전역 레지스트리와 공용 계측 값
+registry = MetricsRegistry()
+
+HTTP_SECONDS = registry.histogram(
+    'http_request_duration_seconds', 'API 요청 처리 시간', ('method', 'route', 'status'))
+STAGE_SECONDS = registry.histogram(
+    'stage_duration_seconds', '파이프라인 단계별 소요 시간', ('stage',))
+DB_SECONDS = registry.histogram(
+    'db_query_duration_seconds', '매매 일지 DB 작업 시간', ('operation',))
+EXCHANGE_SECONDS = registry.histogram(
+    'exchange_request_duration_seconds', '거래소 HTTP 호출 시간 (재시도는 각각 기록)', ('host', 'method', 'status'))
+
+
+def span(stage: str):
+    """
+    파이프라인 단계 시간 측정
+
+    사용 예:
+        with span('backtest.indicators'):
+            ...
+    """
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def timed(histogram: Histogram, **labels):
+    """함수 실행 시간을 histogram 에 기록하는 데코레이터"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else 0.0
@@ -0,0 +1,5 @@
+"""backend 모듈을 테스트에서 바로 import 할 수 있도록 경로 추가 (저장소 루트에서 실행해도 동작)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
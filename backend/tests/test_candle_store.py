@@ -0,0 +1,60 @@
+"""캔들 저장소 동기화: 마지막 저장 이후 빈 구간 채우기와 너무 오래된 저장분 교체"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from candle_store import CandleStore, OHLCV_COLUMNS
+
+NOW = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None).floor('1min')
+
+
+def candles(end, count, value=1.0):
+    index = pd.date_range(end=end, periods=count, freq='1min').as_unit('ns')
+    index.name = 'Date'
+    return pd.DataFrame(np.full((count, len(OHLCV_COLUMNS)), value), index=index, columns=OHLCV_COLUMNS)
+
+
+@pytest.fixture
+def exchange():
+    """현재 시각까지 요청 개수만큼 돌려주는 가짜 거래소 (요청 개수 기록)"""
+    calls = []
+
+    def fetch_candles(market, count, interval):
+        calls.append(count)
+        return candles(NOW, count, value=2.0)
+
+    return fetch_candles, calls
+
+
+def test_sync_fills_gap_since_last_candle(exchange, tmp_path):
+    fetch_candles, calls = exchange
+    store = CandleStore(fetch_candles, directory=str(tmp_path), max_fetch=1000)
+    store.append('KRW-BTC', candles(NOW - pd.Timedelta(minutes=300), 100))
+
+    store.sync('KRW-BTC', 50)
+    assert calls[0] >= 301
+    stored = store.get('KRW-BTC', '1m')
+    assert len(stored) == len(pd.date_range(stored.index[0], NOW, freq='1min'))
+
+
+def test_sync_replaces_stale_prefix_beyond_max_fetch(exchange, tmp_path):
+    fetch_candles, calls = exchange
+    store = CandleStore(fetch_candles, directory=str(tmp_path), max_fetch=1000)
+    store.append('KRW-BTC', candles(NOW - pd.Timedelta(days=30), 500))
+    assert len(store.get('KRW-BTC', '5m')) > 0
+
+    store.sync('KRW-BTC', 200)
+    assert calls == [200]
+    stored = store.get('KRW-BTC', '1m')
+    assert len(stored) == 200 and (stored['Close'] == 2.0).all()
+    assert store.get('KRW-BTC', '5m').index[0] >= stored.index[0].floor('5min')
+    # 디스크도 교체된 캔들만 남음
+    assert len(CandleStore(None, directory=str(tmp_path)).get('KRW-BTC', '1m')) == 200
+
+
+def test_sync_without_limit_fetches_whole_gap(exchange):
+    fetch_candles, calls = exchange
+    store = CandleStore(fetch_candles)
+    store.append('KRW-BTC', candles(NOW - pd.Timedelta(days=2), 10))
+    store.sync('KRW-BTC', 10)
+    assert calls[0] >= 2 * 1440
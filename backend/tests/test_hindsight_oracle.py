@@ -0,0 +1,58 @@
+"""사후 최적 거래(find_hindsight_optimal_trades)를 완전 탐색 결과와 비교"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto_simulator import find_hindsight_optimal_trades
+
+
+def brute_force_log_return(log_price, fee_cost, max_trades):
+    """최대 max_trades 번 왕복 거래의 최대 로그 수익 (모든 매수 / 매도 시점 조합을 탐색)"""
+    n = len(log_price)
+
+    @lru_cache(maxsize=None)
+    def best(t, used, holding):
+        if t == n:
+            return 0.0 if not holding else -np.inf
+        result = best(t + 1, used, holding)
+        if holding:
+            result = max(result, log_price[t] - fee_cost + best(t, used, False))
+        elif max_trades is None or used < max_trades:
+            result = max(result, -log_price[t] + best(t + 1, used + 1, True))
+        return result
+
+    return best(0, 0, False)
+
+
+def frame(close):
+    return pd.DataFrame({'Close': close}, index=pd.date_range('2024-01-01', periods=len(close), freq='min'))
+
+
+@pytest.mark.parametrize('fee_rate', [0.0, 0.0005, 0.05])
+def test_matches_brute_force(fee_rate):
+    rng = np.random.default_rng(7)
+    fee_cost = -2 * np.log1p(-fee_rate)
+    for _ in range(300):
+        n = int(rng.integers(2, 12))
+        # 소수점 0~1자리 반올림으로 같은 가격(동점)도 자주 나오게 함
+        close = np.round(rng.uniform(1, 5, n), int(rng.integers(0, 2)))
+        max_trades = [None, 1, 2, 3][int(rng.integers(0, 4))]
+        result = find_hindsight_optimal_trades(frame(close), max_trades=max_trades, fee_rate=fee_rate)
+
+        expected = np.expm1(brute_force_log_return(tuple(np.log(close)), fee_cost, max_trades)) * 100
+        assert result['return'] == pytest.approx(expected, abs=1e-9)
+        trades = result['trades']
+        assert max_trades is None or len(trades) <= max_trades
+        assert all(buy < sell for buy, sell in trades)
+        assert all(trades[i][1] <= trades[i + 1][0] for i in range(len(trades) - 1))
+
+
+def test_large_limit_equals_unlimited():
+    rng = np.random.default_rng(1)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+    unlimited = find_hindsight_optimal_trades(frame(close), fee_rate=0.0005)
+    limited = find_hindsight_optimal_trades(frame(close), max_trades=len(close), fee_rate=0.0005)
+    assert limited['return'] == pytest.approx(unlimited['return'], rel=1e-9)
+    assert limited['num_trades'] == unlimited['num_trades']
@@ -0,0 +1,104 @@
+"""거래소 요청 스케줄러의 재시도 / 우선순위와 업비트 인증 헤더 재생성"""
+import threading
+import time
+
+import jwt
+import pytest
+
+import upbit_proxy
+from http_scheduler import RequestScheduler, TokenBucket, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class FakeSession:
+    """정해진 상태 코드를 차례로 응답하고 받은 요청을 기록"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return FakeResponse(self.statuses.pop(0), body={'ok': True})
+
+
+def make_scheduler(statuses):
+    scheduler = RequestScheduler(host_limits={}, default_limit=(1000.0, 100), backoff_seconds=0)
+    scheduler.session = FakeSession(statuses)
+    return scheduler
+
+
+def test_retries_idempotent_requests():
+    scheduler = make_scheduler([503, 429, 200])
+    response = scheduler.get('https://exchange.test/v1/ticker')
+    assert response.status_code == 200
+    metrics = scheduler.metrics()['exchange.test']
+    assert metrics['retries'] == 2
+    assert metrics['rate_limited'] == 1
+
+
+def test_post_is_not_retried_on_server_error():
+    scheduler = make_scheduler([503, 200])
+    assert scheduler.post('https://exchange.test/v1/orders').status_code == 503
+    assert len(scheduler.session.calls) == 1
+
+
+def test_gives_up_after_max_retries():
+    scheduler = make_scheduler([503] * 4)
+    scheduler.max_retries = 3
+    assert scheduler.get('https://exchange.test/v1/ticker').status_code == 503
+    assert len(scheduler.session.calls) == 4
+
+
+def test_interactive_requests_go_first():
+    bucket = TokenBucket(rate=1000.0, burst=1)
+    bucket.block(0.2)
+    order = []
+
+    def acquire(priority, sequence, name):
+        bucket.acquire(priority, sequence)
+        order.append(name)
+
+    # 백그라운드 요청이 먼저 줄을 서도 대기 중에 들어온 사용자 요청이 먼저 나감
+    background = threading.Thread(target=acquire, args=(PRIORITY_BACKGROUND, 0, 'background'))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=acquire, args=(PRIORITY_INTERACTIVE, 1, 'interactive'))
+    interactive.start()
+    background.join()
+    interactive.join()
+    assert order == ['interactive', 'background']
+
+
+def test_upbit_retry_signs_a_fresh_token(monkeypatch):
+    scheduler = make_scheduler([429, 429, 200])
+    monkeypatch.setattr(upbit_proxy, 'scheduler', scheduler)
+    monkeypatch.setattr(upbit_proxy, 'ACCESS_KEY', 'access')
+    monkeypatch.setattr(upbit_proxy, 'SECRET_KEY', 'test-secret-key-of-at-least-32-bytes')
+
+    assert upbit_proxy.call_upbit_api('/v1/orders/chance', params={'market': 'KRW-BTC'}) == {'ok': True}
+    tokens = [kwargs['headers']['Authorization'].split(' ', 1)[1] for _, _, kwargs in scheduler.session.calls]
+    payloads = [jwt.decode(token, 'test-secret-key-of-at-least-32-bytes', algorithms=['HS256']) for token in tokens]
+    assert len(payloads) == 3
+    assert len({payload['nonce'] for payload in payloads}) == 3
+    assert all(payload['query_hash'] == payloads[0]['query_hash'] for payload in payloads)
+
+
+def test_upbit_requires_credentials(monkeypatch):
+    monkeypatch.setattr(upbit_proxy, 'scheduler', make_scheduler([200]))
+    monkeypatch.setattr(upbit_proxy, 'ACCESS_KEY', None)
+    with pytest.raises(ValueError):
+        upbit_proxy.call_upbit_api('/v1/accounts')
@@ -0,0 +1,108 @@
+"""지표 캐시 조회 결과가 요청 캔들만으로 새로 계산한 값과 같은지 확인 (적중 / 구간 / 이어 계산 / 무효화 / 디스크)"""
+import threading
+
+import numpy as np
+import pytest
+
+from crypto_simulator import IndicatorPipeline
+from indicator_cache import IndicatorCache
+
+NAMES = ['RSI', 'MACD', 'MACD_Signal', 'SMA_20', 'SMA_50', 'BB_Upper', 'Volume_MA']
+ROWS = 3000
+
+
+@pytest.fixture(scope='module')
+def series():
+    rng = np.random.default_rng(0)
+    timestamps = np.arange(ROWS, dtype=np.int64) * 60 * 10 ** 9
+    close = 5e7 * np.exp(np.cumsum(rng.normal(0, 0.003, ROWS)))
+    volume = rng.integers(1, 100, ROWS).astype(np.float64)
+    return timestamps, close, volume
+
+
+def get(cache, series, start, end, volume=None, market='KRW-BTC'):
+    timestamps, close, base_volume = series
+    volume = base_volume if volume is None else volume
+    return cache.get(market, '1m', timestamps[start:end], {'Close': close[start:end], 'Volume': volume[start:end]}, NAMES)
+
+
+def assert_fresh(arrays, series, start, end, volume=None):
+    """앞쪽 NaN 행은 정확히 같고, 값은 (더 긴 이력에서 이어진 EMA 차이가 사라지는) 뒤쪽 100개가 같아야 함"""
+    _, close, base_volume = series
+    volume = base_volume if volume is None else volume
+    expected = IndicatorPipeline({'Close': close[start:end], 'Volume': volume[start:end]}).compute(NAMES)
+    for name in NAMES:
+        actual = np.asarray(arrays[name])
+        assert len(actual) == end - start, name
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected[name]), err_msg=name)
+        valid = ~np.isnan(expected[name])
+        np.testing.assert_allclose(actual[valid][-100:], expected[name][valid][-100:], rtol=1e-6, err_msg=name)
+
+
+def test_hit_window_and_extend(series):
+    cache = IndicatorCache()
+    assert_fresh(get(cache, series, 0, 2000), series, 0, 2000)
+    assert_fresh(get(cache, series, 0, 2000), series, 0, 2000)
+    assert cache.stats['hits'] == 1
+
+    # 앞을 잘라낸 구간 -> 계산 없이 잘라서 반환, 앞쪽 NaN 도 새로 계산한 것과 같음
+    assert_fresh(get(cache, series, 500, 2000), series, 500, 2000)
+    assert cache.stats['hits'] == 2
+
+    # 한 칸씩 밀린 창 -> 새 캔들만 이어서 계산
+    assert_fresh(get(cache, series, 600, 2100), series, 600, 2100)
+    assert cache.stats == {**cache.stats, 'hits': 2, 'extends': 1, 'misses': 1}
+
+
+def test_changed_last_candle_is_recomputed(series):
+    cache = IndicatorCache()
+    get(cache, series, 0, 2000)
+    volume = series[2].copy()
+    volume[1999] += 10  # 진행 중이던 마지막 캔들이 갱신됨
+    assert_fresh(get(cache, series, 0, 2000, volume=volume), series, 0, 2000, volume=volume)
+    assert cache.stats['hits'] == 0
+
+    # 중간 캔들이 달라지면 그 행부터 다시 계산
+    volume[1000] += 10
+    assert_fresh(get(cache, series, 0, 2000, volume=volume), series, 0, 2000, volume=volume)
+    assert cache.stats['extends'] == 2
+
+    # 첫 캔들부터 다르면 새로 계산
+    volume[0] += 10
+    assert_fresh(get(cache, series, 0, 2000, volume=volume), series, 0, 2000, volume=volume)
+    assert cache.stats['misses'] == 2
+
+
+def test_flush_and_disk_load(series, tmp_path):
+    cache = IndicatorCache(directory=str(tmp_path))
+    get(cache, series, 0, 2000)
+    assert cache.stats['disk_writes'] == 0  # 조회 중에는 디스크에 쓰지 않음
+    cache.flush()
+    assert cache.stats['disk_writes'] == 1
+
+    reloaded = IndicatorCache(directory=str(tmp_path))
+    assert_fresh(get(reloaded, series, 1000, ROWS), series, 1000, ROWS)
+    assert reloaded.stats['disk_loads'] == 1
+    assert reloaded.stats['extends'] == 1
+
+
+def test_eviction_writes_to_disk(series, tmp_path):
+    cache = IndicatorCache(max_entries=1, directory=str(tmp_path))
+    get(cache, series, 0, 500, market='KRW-BTC')
+    get(cache, series, 0, 500, market='KRW-ETH')
+    assert len(cache) == 1
+    assert cache.stats['disk_writes'] == 1
+
+    assert_fresh(get(cache, series, 0, 500, market='KRW-BTC'), series, 0, 500)
+    assert cache.stats['disk_loads'] == 1
+
+
+def test_same_key_is_computed_once(series):
+    cache = IndicatorCache()
+    threads = [threading.Thread(target=get, args=(cache, series, 0, ROWS)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats['misses'] == 1
+    assert cache.stats['hits'] == 3
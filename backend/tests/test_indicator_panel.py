@@ -0,0 +1,48 @@
+"""여러 마켓 패널 지표가 마켓별 add_technical_indicators 와 같은지 확인 (늦게 상장한 마켓 포함)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto_simulator import (
+    add_technical_indicators, add_technical_indicators_panel, generate_sample_data, INDICATOR_COLUMNS
+)
+from screener import compute_screener_table
+
+
+@pytest.fixture(scope='module')
+def frames():
+    return {
+        'KRW-BTC': generate_sample_data(300, seed=1),
+        'KRW-NEW': generate_sample_data(300, seed=2).iloc[120:],  # 패널 시작 후 상장
+        'KRW-ETH': generate_sample_data(300, seed=3),
+    }
+
+
+def test_panel_matches_per_market(frames):
+    close = pd.concat({market: df['Close'] for market, df in frames.items()}, axis=1)
+    volume = pd.concat({market: df['Volume'] for market, df in frames.items()}, axis=1)
+    panel = add_technical_indicators_panel(close, volume)
+
+    for market, df in frames.items():
+        expected = add_technical_indicators(df.copy())
+        actual = panel.xs(market, axis=1, level=1).loc[df.index]
+        for column in INDICATOR_COLUMNS:
+            values, reference = actual[column].to_numpy(float), expected[column].to_numpy(float)
+            np.testing.assert_array_equal(np.isnan(values), np.isnan(reference), err_msg=f'{market} {column}')
+            np.testing.assert_allclose(values[~np.isnan(values)], reference[~np.isnan(reference)],
+                                       rtol=1e-9, err_msg=f'{market} {column}')
+    # 상장 전 구간은 모든 지표가 NaN
+    assert panel.xs('KRW-NEW', axis=1, level=1).iloc[:120].isna().all().all()
+
+
+def test_screener_waits_for_real_bars_of_new_listing():
+    frames = {
+        'KRW-BTC': generate_sample_data(200, seed=1),
+        'KRW-NEW': generate_sample_data(200, seed=2).iloc[-10:],  # 상장 10봉
+    }
+    rows = {row['market']: row for row in compute_screener_table(frames)}
+    assert rows['KRW-NEW']['rsi'] is None
+    assert rows['KRW-NEW']['volume_ratio'] is None
+    assert rows['KRW-NEW']['buy_signal'] == 0 and rows['KRW-NEW']['sell_signal'] == 0
+    assert rows['KRW-BTC']['rsi'] is not None
+    assert rows['KRW-BTC']['volume_ratio'] is not None
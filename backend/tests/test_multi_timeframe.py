@@ -0,0 +1,62 @@
+"""멀티 타임프레임 백테스트가 확인 주기에 맞는 기준 주기 캔들만 받아 기본 days 로 동작하는지 확인"""
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app_fastapi
+from candle_store import CandleStore, INTERVAL_SECONDS
+from crypto_simulator import generate_sample_data
+from indicator_cache import IndicatorCache
+
+CONFIRMATIONS = {'4h': 'rsi', '1h': 'macd'}
+
+
+@pytest.fixture
+def exchange(monkeypatch, tmp_path):
+    """요청 주기 그대로 캔들을 돌려주는 가짜 거래소 (호출 주기 / 개수 기록) + 임시 공용 저장소"""
+    calls = []
+
+    def collect_historical_data(market='KRW-BTC', days=1000, interval='1d'):
+        calls.append((interval, days))
+        return generate_sample_data(days, freq=pd.Timedelta(seconds=INTERVAL_SECONDS[interval]))
+
+    minute_store = CandleStore(collect_historical_data, base_interval='1m', directory=str(tmp_path))
+    monkeypatch.setattr(app_fastapi, 'collect_historical_data', collect_historical_data)
+    monkeypatch.setattr(app_fastapi, 'CANDLE_STORE_DIR', str(tmp_path))
+    monkeypatch.setattr(app_fastapi, 'candle_store', minute_store)
+    monkeypatch.setattr(app_fastapi, 'candle_stores', {'1m': minute_store})
+    monkeypatch.setattr(app_fastapi, 'indicator_cache', IndicatorCache(directory=None))
+    return calls
+
+
+def test_base_interval_divides_every_interval():
+    assert app_fastapi.timeframe_base_interval(['4h', '1h']) == '1h'
+    assert app_fastapi.timeframe_base_interval(['4h']) == '4h'
+    assert app_fastapi.timeframe_base_interval(['15m', '10m']) == '5m'
+    assert app_fastapi.timeframe_base_interval(['1h', '3m']) == '3m'
+
+
+@pytest.mark.parametrize('use_api', [False, True])
+def test_daily_with_hourly_confirmations_at_default_days(exchange, use_api):
+    days = app_fastapi.BacktestRequest().days
+    response = TestClient(app_fastapi.app).post('/api/backtest', json={
+        'interval': '1d', 'confirmations': CONFIRMATIONS, 'use_api': use_api
+    })
+    assert response.status_code == 200, response.text
+    assert response.json()['confirmations'] == CONFIRMATIONS
+
+    if use_api:
+        # 1시간봉은 60분봉 API 로 받고 1분봉은 받지 않음 (4h 워밍업까지 덮는 개수만)
+        intervals = dict(exchange)
+        assert set(intervals) == {'1h', '1d'}
+        assert intervals['1h'] == days * 24 + app_fastapi.TIMEFRAME_WARMUP_CANDLES * 4
+        assert app_fastapi.candle_stores['1h'].get('KRW-BTC', '4h') is not None
+
+
+def test_frames_cover_requested_days(exchange):
+    frames = app_fastapi.load_timeframe_frames('KRW-BTC', 500, True, '1d', CONFIRMATIONS)
+    assert len(frames['1d']) == 500
+    for interval in CONFIRMATIONS:
+        # 기준 주기 첫 봉 이전까지 확인 주기 지표가 워밍업되어 있음
+        assert frames[interval].index[0] < frames['1d'].index[0]
+        assert frames[interval]['RSI'].loc[frames['1d'].index[0]:].notna().all()
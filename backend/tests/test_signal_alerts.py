@@ -0,0 +1,48 @@
+"""실시간 지표 상태의 신호가 배치 find_optimal_buy_sell_signals 와 같은지 확인 (평평한 구간 포함)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from crypto_simulator import add_technical_indicators, find_optimal_buy_sell_signals
+from signal_alerts import StreamingIndicators
+
+
+def batch_signals(close):
+    index = pd.date_range('2024-01-01', periods=len(close), freq='h')
+    data = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1.0}, index=index)
+    signals = find_optimal_buy_sell_signals(add_technical_indicators(data))
+    return signals['Buy_Signal'].to_numpy(bool), signals['Sell_Signal'].to_numpy(bool)
+
+
+def streaming_signals(close):
+    indicators = StreamingIndicators()
+    buy, sell = [], []
+    for value in close:
+        indicators.update(float(value))
+        buy_reasons, sell_reasons = indicators.signals()
+        buy.append(bool(buy_reasons))
+        sell.append(bool(sell_reasons))
+    return np.array(buy), np.array(sell)
+
+
+def test_flat_window_lower_band_equals_close():
+    indicators = StreamingIndicators()
+    for value in [26.3, 26.1, 25.9, 26.2] + [26.0] * 40:
+        indicators.update(value)
+        buy, _ = indicators.signals()
+    assert indicators.bb_lower == indicators.bb_middle == 26.0
+    assert buy == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_batch_with_flat_runs(seed):
+    # 호가 단위가 큰 저가 코인처럼 가격이 자주 멈춰 있는 시계열
+    rng = np.random.default_rng(seed)
+    close = np.maximum(np.round(26 + np.cumsum(rng.normal(0, 0.05, 3000)), 1), 1.0)
+    for start in rng.integers(0, 2900, 30):
+        close[start:start + rng.integers(20, 60)] = close[start]
+
+    batch_buy, batch_sell = batch_signals(close)
+    stream_buy, stream_sell = streaming_signals(close)
+    np.testing.assert_array_equal(np.flatnonzero(stream_buy), np.flatnonzero(batch_buy))
+    np.testing.assert_array_equal(np.flatnonzero(stream_sell), np.flatnonzero(batch_sell))
@@ -0,0 +1,135 @@
+"""체결 집계 결과를 pandas 리샘플링과 비교하고 봉 마감 / 늦은 체결 / 저장 처리 확인"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from candle_store import CandleStore, resample_ohlcv, OHLCV_COLUMNS
+from tick_aggregator import TickAggregator, KST_OFFSET_NS, store_candles
+
+MINUTE = 60 * 10 ** 9
+START = 1_700_000_400 * 10 ** 9  # 1시간 경계
+
+
+def random_trades(seed=0, count=5000, span=180 * MINUTE):
+    """30초 뒤부터 시작하는 정렬된 체결 (같은 시각 체결과 체결 없는 분 포함)"""
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.integers(START + MINUTE // 2, START + span, count))
+    times[1::7] = times[0::7][:len(times[1::7])]
+    times = np.sort(times)
+    times = times[(times - START) // MINUTE % 13 != 5]
+    prices = np.round(5e7 + np.cumsum(rng.normal(0, 1e4, len(times))), -3)
+    volumes = rng.uniform(0.001, 1.0, len(times))
+    return times, prices, volumes
+
+
+def expected_bars(times, prices, volumes, rule):
+    """체결을 pandas 로 직접 리샘플링 (체결 없는 구간은 제외, KST 인덱스)"""
+    trades = pd.DataFrame({'Price': prices, 'Volume': volumes},
+                          index=pd.DatetimeIndex((times + KST_OFFSET_NS).view('datetime64[ns]')))
+    grouped = trades.resample(rule)
+    frame = pd.DataFrame({
+        'Open': grouped['Price'].first(),
+        'High': grouped['Price'].max(),
+        'Low': grouped['Price'].min(),
+        'Close': grouped['Price'].last(),
+        'Volume': grouped['Volume'].sum(),
+    }).dropna(subset=['Open'])
+    frame.index.name = 'Date'
+    return frame
+
+
+def feed(aggregator, times, prices, volumes, market='KRW-BTC'):
+    for timestamp, price, volume in zip(times.tolist(), prices.tolist(), volumes.tolist()):
+        aggregator.add_trade(market, timestamp, price, volume)
+
+
+@pytest.mark.parametrize('interval, rule', [('1m', '1min'), ('5m', '5min'), ('1h', '1h')])
+def test_bars_match_pandas_resample(interval, rule):
+    times, prices, volumes = random_trades()
+    aggregator = TickAggregator(intervals=('1m', '5m', '1h'), capacity=10_000)
+    feed(aggregator, times, prices, volumes)
+    aggregator.advance(int(times[-1]) + 3600 * 10 ** 9)
+
+    expected = expected_bars(times, prices, volumes, rule).iloc[1:]  # 관찰 시작 전에 열린 첫 봉은 partial
+    actual = aggregator.bars('KRW-BTC', interval)
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False, check_index_type=False, check_exact=False)
+
+
+def test_longer_interval_matches_resampled_base_bars():
+    times, prices, volumes = random_trades(seed=1)
+    aggregator = TickAggregator(intervals=('1m', '5m'), capacity=10_000)
+    feed(aggregator, times, prices, volumes)
+    aggregator.advance(int(times[-1]) + MINUTE * 5)
+
+    resampled = resample_ohlcv(aggregator.bars('KRW-BTC', '1m'), '5m')
+    five = aggregator.bars('KRW-BTC', '5m')
+    # 첫 5분 봉은 partial 이라 저장되지 않음 -> 1분 봉에서 만든 첫 구간 제외
+    pd.testing.assert_frame_equal(resampled.iloc[1:], five, check_freq=False, check_exact=False)
+
+
+def test_advance_closes_bar_at_its_end():
+    aggregator = TickAggregator(intervals=('1m',))
+    aggregator.add_trade('KRW-BTC', START - 1, 100.0, 1.0)  # 관찰 시작 (partial 봉)
+    aggregator.add_trade('KRW-BTC', START + 10 ** 9, 101.0, 2.0)
+    aggregator.add_trade('KRW-BTC', START + 30 * 10 ** 9, 99.0, 1.0)
+
+    assert aggregator.advance(START + MINUTE - 1) == []
+    finished = aggregator.advance(START + MINUTE)
+    assert [(market, interval) for market, interval, _ in finished] == [('KRW-BTC', '1m')]
+    bar = finished[0][2]
+    assert (bar.open, bar.high, bar.low, bar.close, bar.volume) == (101.0, 101.0, 99.0, 99.0, 3.0)
+    assert aggregator.current('KRW-BTC', '1m') is None
+    assert aggregator.stats['partial'] == 1
+    assert len(aggregator.bars('KRW-BTC', '1m')) == 1
+
+
+def test_late_trade_is_dropped():
+    aggregator = TickAggregator(intervals=('1m', '5m'))
+    aggregator.add_trade('KRW-BTC', START - 1, 100.0, 1.0)
+    aggregator.add_trade('KRW-BTC', START + MINUTE, 100.0, 1.0)
+    assert aggregator.add_trade('KRW-BTC', START + MINUTE - 1, 200.0, 1.0) == []
+    assert aggregator.stats['late'] == 1
+    assert aggregator.current('KRW-BTC', '5m').high == 100.0
+
+
+def test_gap_marks_following_bar_partial():
+    aggregator = TickAggregator(intervals=('1m',))
+    aggregator.add_trade('KRW-BTC', START - 1, 100.0, 1.0)
+    aggregator.add_trade('KRW-BTC', START + 10 ** 9, 100.0, 1.0)
+    aggregator.mark_gap('KRW-BTC', START + 20 * 10 ** 9)
+    aggregator.advance(START + MINUTE)
+    assert len(aggregator.bars('KRW-BTC', '1m')) == 0
+    assert aggregator.stats['partial'] == 2
+
+
+def test_take_pending_and_store_fill_the_gap(tmp_path):
+    # sync 는 현재 시각까지 비어 있는 구간을 받으므로 최근 10분 캔들로 구성
+    latest = pd.Timestamp.now(tz='Asia/Seoul').tz_localize(None).floor('1min')
+    frame_index = pd.date_range(end=latest - pd.Timedelta(minutes=1), periods=10, freq='1min').as_unit('ns')
+    exchange = pd.DataFrame(np.arange(50, dtype=float).reshape(10, 5) + 100, index=frame_index, columns=OHLCV_COLUMNS)
+    exchange.index.name = 'Date'
+    calls = []
+
+    def fetch_candles(market, count, interval):
+        calls.append(count)
+        return exchange.iloc[-count:]
+
+    store = CandleStore(fetch_candles, directory=str(tmp_path))
+    store.append('KRW-BTC', exchange.iloc[:4])
+
+    # 거래소에는 있지만 저장되지 않은 6개 다음 구간의 체결 봉
+    aggregator = TickAggregator(intervals=('1m',), flush_interval='1m')
+    minute = (frame_index[-1] + pd.Timedelta(minutes=1)).value - KST_OFFSET_NS
+    aggregator.add_trade('KRW-BTC', minute - 1, 1.0, 1.0)
+    aggregator.add_trade('KRW-BTC', minute, 2.0, 1.0)
+    aggregator.advance(minute + MINUTE)
+    pending = aggregator.take_pending()
+    assert list(pending) == ['KRW-BTC'] and len(pending['KRW-BTC']) == 1
+    assert aggregator.take_pending() == {}
+
+    assert store_candles(store, pending) == 1
+    stored = store.get('KRW-BTC', '1m')
+    assert len(stored) == 11
+    assert (stored.index.as_unit('ns').to_series().diff().dropna() == pd.Timedelta(minutes=1)).all()
+    assert stored['Close'].iloc[-1] == 2.0
+    assert calls and calls[0] >= 6
@@ -0,0 +1,43 @@
+"""walk-forward 병렬 / 순차 실행 결과 일치와 입력 검증"""
+import os
+
+import pytest
+
+import walk_forward
+from crypto_simulator import generate_sample_data, add_technical_indicators
+
+
+@pytest.fixture(scope='module')
+def data():
+    return add_technical_indicators(generate_sample_data(800)).dropna()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # CPU 코어가 하나인 환경에서도 병렬 경로를 타도록 코어 수를 늘리고, 끝나면 공유 풀 종료
+    monkeypatch.setattr(os, 'cpu_count', lambda: 3)
+    yield
+    walk_forward.shutdown_executor()
+
+
+@pytest.mark.parametrize('mode', ['rolling', 'anchored'])
+def test_parallel_matches_serial(data, pool, mode):
+    serial = walk_forward.run_walk_forward(data, 200, 60, mode, max_workers=1)
+    parallel = walk_forward.run_walk_forward(data, 200, 60, mode, max_workers=3)
+    assert serial['num_folds'] > 3
+    assert parallel == serial
+
+
+def test_max_workers_clamped_to_cpu_count(data, pool):
+    walk_forward.run_walk_forward(data, 200, 60, max_workers=64)
+    assert walk_forward._executor._max_workers == 3
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'param_grid': {'rsi_period': [14]}}, 'Unsupported param_grid keys'),
+    ({'param_grid': {'rsi_oversold': []}}, 'must not be empty'),
+    ({'max_workers': 0}, 'max_workers'),
+])
+def test_invalid_arguments(data, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        walk_forward.run_walk_forward(data, 200, 60, **kwargs)
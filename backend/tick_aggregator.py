@@ -0,0 +1,497 @@
+"""
+체결 → 캔들 집계기
+거래소 체결 내역(/v1/trades/ticks)을 받아 여러 주기의 OHLCV 봉을 동시에 만드는 모듈
+마켓 / 주기마다 마감된 봉을 고정 크기 링 버퍼에 보관하고 진행 중인 봉은 따로 유지해 실시간 차트에 제공하며,
+마감된 기준 주기(1분) 봉은 CandleStore 에 기록해 거래소 캔들 API 를 다시 부르지 않게 한다.
+받은 체결을 JSON lines 파일로 녹화하고 배속 재생할 수 있어 네트워크 없이 집계 결과를 검증할 수 있다.
+
+실행 예:
+    python tick_aggregator.py record --markets KRW-BTC,KRW-ETH --seconds 600 --output data/trades.jsonl
+    python tick_aggregator.py replay data/trades.jsonl --speed 60 --intervals 1m,5m,1h
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+import crypto_simulator
+from http_scheduler import scheduler, request_priority, PRIORITY_BACKGROUND
+from candle_store import CandleStore, INTERVAL_SECONDS, OHLCV_COLUMNS
+
+# 봉은 거래소와 같이 UTC 기준으로 나누고, 인덱스는 CandleStore 와 같은 KST 시각(타임존 없음)으로 표시
+KST_OFFSET_NS = 9 * 3600 * 10 ** 9
+
+
+def fetch_bithumb_trades(market: str, count: int) -> List[Dict[str, Any]]:
+    """
+    Bithumb 최근 체결 내역 API 호출 (최신순)
+    price_hub.fetch_bithumb_tickers 와 같이 백그라운드 우선순위, 주소는 crypto_simulator.BITHUMB_API_BASE
+    """
+    with request_priority(PRIORITY_BACKGROUND):
+        response = scheduler.get(f'{crypto_simulator.BITHUMB_API_BASE}/v1/trades/ticks',
+                                 headers={'accept': 'application/json'},
+                                 params={'market': market, 'count': count})
+    response.raise_for_status()
+    return response.json()
+
+
+def parse_trade(trade: Dict[str, Any]) -> Tuple[int, float, float, int]:
+    """체결 한 건 -> (UTC epoch ns, 가격, 수량, 체결 번호)"""
+    return (int(trade['timestamp']) * 10 ** 6, float(trade['trade_price']), float(trade['trade_volume']),
+            int(trade.get('sequential_id', 0)))
+
+
+class Bar:
+    """진행 중인 봉 (start / end 는 UTC epoch ns)"""
+
+    __slots__ = ('start', 'end', 'open', 'high', 'low', 'close', 'volume', 'trades')
+
+    def __init__(self, start: int, end: int, price: float, volume: float):
+        self.start = start
+        self.end = end
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.trades = 1
+
+    def add(self, price: float, volume: float) -> None:
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += volume
+        self.trades += 1
+
+    @property
+    def date(self) -> pd.Timestamp:
+        """봉 시작 시각 (KST)"""
+        return pd.Timestamp(self.start + KST_OFFSET_NS)
+
+
+class CandleRing:
+    """마감된 봉을 최근 capacity 개만 보관하는 링 버퍼 (가득 차면 가장 오래된 봉부터 덮어씀)"""
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f'Ring capacity must be positive: {capacity}')
+        self.capacity = capacity
+        self._starts = np.zeros(capacity, dtype=np.int64)
+        self._values = np.zeros((capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._head = 0  # 다음에 쓸 위치
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, bar: Bar) -> None:
+        self._starts[self._head] = bar.start
+        self._values[self._head] = (bar.open, bar.high, bar.low, bar.close, bar.volume)
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def to_frame(self, count: Optional[int] = None) -> pd.DataFrame:
+        """최근 count 개 봉 (None 이면 전체, 오래된 순, KST 봉 시작 시각 인덱스)"""
+        count = self._size if count is None else max(min(count, self._size), 0)
+        positions = np.arange(self._head - count, self._head) % self.capacity
+        index = pd.DatetimeIndex((self._starts[positions] + KST_OFFSET_NS).view('datetime64[ns]'), name='Date')
+        return pd.DataFrame(self._values[positions], index=index, columns=OHLCV_COLUMNS)
+
+
+class TickAggregator:
+    """
+    마켓별 체결을 여러 주기의 봉으로 동시에 집계 (체결당 O(주기 수))
+
+    - 봉은 다음 구간의 체결이 오거나 advance(now) 로 마감 시각이 지나면 마감
+    - 이미 마감된 구간의 체결(늦게 도착한 체결)은 버림 (모든 주기에서 같이 버려 주기 간 값이 어긋나지 않음)
+    - 관찰을 시작하기 전 / 놓친 체결이 있을 수 있는 구간에 걸친 봉(partial)은 마감해도 보관 / 저장하지 않음
+    - 체결이 없는 구간은 거래소 캔들과 같이 봉을 만들지 않음
+    """
+
+    def __init__(self, intervals: Iterable[str] = ('1m',), capacity: int = 1440,
+                 flush_interval: Optional[str] = None):
+        """
+        Args:
+            intervals: 집계할 주기 (INTERVAL_SECONDS 의 키)
+            capacity: 마켓 / 주기별로 보관할 마감된 봉 개수
+            flush_interval: take_pending 으로 내보낼 주기 (예: CandleStore.base_interval, intervals 에 없으면 추가)
+        """
+        intervals = set(intervals) | ({flush_interval} if flush_interval else set())
+        for interval in intervals:
+            if interval not in INTERVAL_SECONDS:
+                raise ValueError(f'Unsupported candle interval: {interval}')
+        if not intervals:
+            raise ValueError('At least one candle interval is required')
+        if capacity < 1:
+            raise ValueError(f'Ring capacity must be positive: {capacity}')
+        self.intervals = tuple(sorted(intervals, key=INTERVAL_SECONDS.get))
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.stats = {'trades': 0, 'late': 0, 'bars': 0, 'partial': 0}
+        self._periods = tuple(INTERVAL_SECONDS[interval] * 10 ** 9 for interval in self.intervals)
+        self._positions = {interval: position for position, interval in enumerate(self.intervals)}
+        self._flush_position = self._positions.get(flush_interval)
+        self._bars: Dict[str, List[Optional[Bar]]] = {}
+        self._rings: Dict[str, List[CandleRing]] = {}
+        self._since: Dict[str, int] = {}  # 마켓 -> 빠짐없이 본 체결의 시작 시각 (이보다 먼저 시작한 봉은 partial)
+        self._closed_until: Dict[str, int] = {}  # 마켓 -> 마지막으로 마감한 가장 짧은 주기 봉의 끝
+        self._pending: Dict[str, List[Bar]] = {}
+        self._next_end: Optional[int] = None  # 진행 중인 봉의 가장 이른 마감 시각 이하 (advance 빠른 경로)
+
+    @property
+    def markets(self) -> List[str]:
+        """체결을 받은 마켓"""
+        return sorted(self._bars)
+
+    def add_trade(self, market: str, timestamp: int, price: float, volume: float) -> List[Tuple[str, str, Bar]]:
+        """
+        체결 한 건 반영
+
+        Args:
+            market: 마켓 코드
+            timestamp: 체결 시각 (UTC epoch ns)
+            price / volume: 체결 가격 / 수량
+
+        Returns:
+            이 체결로 마감된 봉 목록 [(마켓, 주기, 봉)]
+        """
+        bars = self._bars.get(market)
+        if bars is None:
+            bars = self._bars[market] = [None] * len(self.intervals)
+            self._rings[market] = [CandleRing(self.capacity) for _ in self.intervals]
+            self._since[market] = timestamp + 1
+            self._closed_until[market] = 0
+        shortest = bars[0]
+        if timestamp < (shortest.start if shortest is not None else self._closed_until[market]):
+            self.stats['late'] += 1
+            return []
+
+        self.stats['trades'] += 1
+        finished = []
+        for position, period in enumerate(self._periods):
+            bar = bars[position]
+            if bar is not None and timestamp >= bar.end:
+                bars[position] = None
+                self._finish(market, position, bar, finished)
+                bar = None
+            if bar is None:
+                start = timestamp - timestamp % period
+                bars[position] = Bar(start, start + period, price, volume)
+                if self._next_end is None or start + period < self._next_end:
+                    self._next_end = start + period
+            else:
+                bar.add(price, volume)
+        return finished
+
+    def advance(self, now: int) -> List[Tuple[str, str, Bar]]:
+        """
+        마감 시각이 now (UTC epoch ns) 이하인 진행 중인 봉 마감 (다음 체결을 기다리지 않고 정해진 시각에 마감)
+
+        Returns:
+            마감된 봉 목록 [(마켓, 주기, 봉)]
+        """
+        if self._next_end is None or now < self._next_end:
+            return []
+        finished = []
+        next_end = None
+        for market, bars in self._bars.items():
+            for position, bar in enumerate(bars):
+                if bar is None:
+                    continue
+                if bar.end <= now:
+                    bars[position] = None
+                    self._finish(market, position, bar, finished)
+                elif next_end is None or bar.end < next_end:
+                    next_end = bar.end
+        self._next_end = next_end
+        return finished
+
+    def mark_gap(self, market: str, timestamp: int) -> None:
+        """timestamp (UTC epoch ns) 이전 체결을 놓쳤을 수 있음 -> 그 시각 이전에 시작한 봉은 저장하지 않음"""
+        if market in self._since:
+            self._since[market] = max(self._since[market], timestamp + 1)
+
+    def _finish(self, market: str, position: int, bar: Bar, finished: List[Tuple[str, str, Bar]]) -> None:
+        if position == 0:
+            self._closed_until[market] = bar.end
+        if bar.start < self._since[market]:
+            self.stats['partial'] += 1
+            return
+        self._rings[market][position].append(bar)
+        if position == self._flush_position:
+            self._pending.setdefault(market, []).append(bar)
+        self.stats['bars'] += 1
+        finished.append((market, self.intervals[position], bar))
+
+    def _position(self, interval: str) -> int:
+        if interval not in self._positions:
+            raise ValueError(f'Interval {interval} is not aggregated (available: {", ".join(self.intervals)})')
+        return self._positions[interval]
+
+    def bars(self, market: str, interval: str, count: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """마감된 최근 봉 (링 버퍼, 체결을 받은 적 없는 마켓이면 None)"""
+        position = self._position(interval)
+        rings = self._rings.get(market)
+        return rings[position].to_frame(count) if rings is not None else None
+
+    def current(self, market: str, interval: str) -> Optional[Bar]:
+        """진행 중인 봉 (없으면 None)"""
+        position = self._position(interval)
+        bars = self._bars.get(market)
+        return bars[position] if bars is not None else None
+
+    def is_partial(self, market: str, bar: Bar) -> bool:
+        """놓친 체결이 있을 수 있는 봉인지"""
+        return bar.start < self._since.get(market, 0)
+
+    def take_pending(self) -> Dict[str, pd.DataFrame]:
+        """지난 호출 이후 마감된 flush_interval 봉 (마켓 -> OHLCV 데이터프레임, KST 인덱스)"""
+        pending, self._pending = self._pending, {}
+        frames = {}
+        for market, bars in pending.items():
+            index = pd.DatetimeIndex(np.array([bar.start + KST_OFFSET_NS for bar in bars], dtype='datetime64[ns]'),
+                                     name='Date')
+            frames[market] = pd.DataFrame(
+                [(bar.open, bar.high, bar.low, bar.close, bar.volume) for bar in bars],
+                index=index, columns=OHLCV_COLUMNS
+            )
+        return frames
+
+
+def store_candles(store: CandleStore, frames: Dict[str, pd.DataFrame], max_fill: int = 1000) -> int:
+    """
+    take_pending 결과를 캔들 저장소에 기록 (디스크 쓰기 / 거래소 호출이 있으므로 스레드에서 실행)
+    저장된 봉과 사이가 비어 있으면 sync 로 마지막 저장 시각 이후를 먼저 채우고,
+    빈 구간이 max_fill 개보다 길면 그 마켓은 기록하지 않는다 (백그라운드 기록이 긴 수집이 되지 않도록).
+
+    Returns:
+        기록한 봉 수
+    """
+    period = pd.Timedelta(seconds=INTERVAL_SECONDS[store.base_interval])
+    written = 0
+    for market, candles in frames.items():
+        stored = store.get(market, store.base_interval)
+        if stored is not None and len(stored) > 0 and stored.index[-1] + period < candles.index[0]:
+            missing = int((candles.index[0] - stored.index[-1]) / period) - 1
+            if missing > max_fill:
+                print(f"{market} 저장된 봉과 {missing}개 떨어져 있어 체결 봉을 기록하지 않음")
+                continue
+            store.sync(market, len(stored))
+        store.append(market, candles)
+        written += len(candles)
+    return written
+
+
+class TradeRecorder:
+    """받은 체결을 JSON lines 파일에 이어 쓰기 (replay 로 다시 재생, 첫 기록 때 파일을 엶)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def write(self, trades: Iterable[Dict[str, Any]]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.writelines(json.dumps(trade, ensure_ascii=False, separators=(',', ':')) + '\n'
+                              for trade in trades)
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_trades(path: str) -> List[Dict[str, Any]]:
+    """녹화된 체결 파일 읽기 (체결 시각 순으로 정렬, 마켓별 조회 순서와 무관하게 재생되도록)"""
+    with open(path, encoding='utf-8') as f:
+        trades = [json.loads(line) for line in f if line.strip()]
+    trades.sort(key=lambda trade: (int(trade['timestamp']), int(trade.get('sequential_id', 0))))
+    return trades
+
+
+async def replay_trades(aggregator: TickAggregator, trades: Iterable[Dict[str, Any]], speed: float = 0.0) -> int:
+    """
+    녹화된 체결을 시각 순서대로 다시 집계
+
+    Args:
+        aggregator: 체결을 넣을 집계기
+        trades: 체결 목록 (load_trades, 시각 순)
+        speed: 재생 배속 (60 이면 1분을 1초에, 0 이면 기다리지 않고 최대 속도)
+
+    Returns:
+        재생한 체결 수
+    """
+    first = started = None
+    replayed = 0
+    for trade in trades:
+        timestamp, price, volume, _ = parse_trade(trade)
+        if speed > 0:
+            if first is None:
+                first, started = timestamp, time.monotonic()
+            delay = (timestamp - first) / 10 ** 9 / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        aggregator.advance(timestamp)
+        aggregator.add_trade(trade['market'], timestamp, price, volume)
+        replayed += 1
+    return replayed
+
+
+class TradeFeed:
+    """마켓별 최근 체결을 주기적으로 조회해 새 체결만 집계기에 전달"""
+
+    def __init__(self, aggregator: TickAggregator, fetch_trades: Callable[[str, int], List[Dict[str, Any]]],
+                 count: int = 200, close_delay_seconds: float = 2.0, concurrency: int = 8,
+                 recorder: Optional[TradeRecorder] = None):
+        """
+        Args:
+            aggregator: 체결을 넣을 집계기
+            fetch_trades: (마켓, 개수) -> 최근 체결 목록 (Bithumb /v1/trades/ticks 형식, 동기, 스레드에서 실행)
+            count: 한 번에 조회할 체결 수 (조회 간격 동안의 체결보다 많아야 빠짐없이 집계됨)
+            close_delay_seconds: 봉 마감 시각 후 마감까지 기다리는 시간 (거래소 체결 반영 지연)
+            concurrency: 동시에 조회할 마켓 수 (거래소 한도는 스케줄러가 적용)
+            recorder: 받은 새 체결을 녹화할 파일 (없으면 녹화 안 함)
+        """
+        self.aggregator = aggregator
+        self.fetch_trades = fetch_trades
+        self.count = count
+        self.close_delay_seconds = close_delay_seconds
+        self.concurrency = concurrency
+        self.recorder = recorder
+        self.stats = {'polls': 0, 'fetch_errors': 0, 'gaps': 0, 'last_poll_seconds': 0.0}
+        # 마켓 -> (마지막 체결 시각, 그 시각의 체결 번호들), 체결 번호는 순서를 보장하지 않아 시각으로 새 체결을 가림
+        self._last: Dict[str, Tuple[int, Set[int]]] = {}
+
+    def ingest(self, market: str, trades: List[Dict[str, Any]]) -> int:
+        """
+        조회한 체결 중 새 체결만 시각 순으로 집계
+        이미 본 체결이 하나도 없으면 조회 범위 앞쪽에 놓친 체결이 있을 수 있으므로 그 구간의 봉은 저장하지 않는다.
+
+        Returns:
+            새 체결 수
+        """
+        last = self._last.get(market)
+        fresh = []
+        for trade in trades:
+            timestamp, price, volume, sequence = parse_trade(trade)
+            if last is not None and (timestamp < last[0] or (timestamp == last[0] and sequence in last[1])):
+                continue
+            fresh.append((timestamp, sequence, price, volume, trade))
+        if not fresh:
+            return 0
+        fresh.sort(key=lambda item: (item[0], item[1]))
+        if last is not None and len(fresh) == len(trades):
+            self.stats['gaps'] += 1
+            self.aggregator.mark_gap(market, fresh[0][0])
+
+        for timestamp, _, price, volume, _ in fresh:
+            self.aggregator.add_trade(market, timestamp, price, volume)
+        newest = fresh[-1][0]
+        sequences = {sequence for timestamp, sequence, *_ in fresh if timestamp == newest}
+        if last is not None and last[0] == newest:
+            sequences |= last[1]
+        self._last[market] = (newest, sequences)
+        if self.recorder is not None:
+            self.recorder.write(item[4] for item in fresh)
+        return len(fresh)
+
+    async def poll(self, markets: Iterable[str]) -> int:
+        """
+        한 번 조회해서 반영하고 마감 시각이 지난 봉 마감
+
+        Returns:
+            새 체결 수
+        """
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(market):
+            async with semaphore:
+                try:
+                    return market, await asyncio.to_thread(self.fetch_trades, market, self.count)
+                except Exception as e:
+                    print(f"{market} 체결 조회 실패: {e}")
+                    return market, None
+
+        received = 0
+        for market, trades in await asyncio.gather(*(fetch(market) for market in markets)):
+            if trades is None:
+                self.stats['fetch_errors'] += 1
+                continue
+            received += self.ingest(market, trades)
+        self.aggregator.advance(time.time_ns() - int(self.close_delay_seconds * 10 ** 9))
+        self.stats['polls'] += 1
+        self.stats['last_poll_seconds'] = time.perf_counter() - started
+        return received
+
+
+async def _record(args) -> None:
+    aggregator = TickAggregator(['1m'], capacity=args.capacity)
+    recorder = TradeRecorder(args.output)
+    feed = TradeFeed(aggregator, fetch_bithumb_trades, count=args.count, recorder=recorder)
+    markets = [code.strip() for code in args.markets.split(',') if code.strip()]
+    deadline = time.monotonic() + args.seconds
+    try:
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            received = await feed.poll(markets)
+            print(f"새 체결 {received}건 (누적 {aggregator.stats['trades']}건, 누락 의심 {feed.stats['gaps']}회)")
+            await asyncio.sleep(max(args.poll_seconds - (time.monotonic() - started), 0))
+    finally:
+        recorder.close()
+    print(f"녹화 완료: {args.output}")
+
+
+async def _replay(args) -> None:
+    intervals = [interval.strip() for interval in args.intervals.split(',') if interval.strip()]
+    store = CandleStore(None, directory=args.store) if args.store else None
+    aggregator = TickAggregator(intervals, capacity=args.capacity, flush_interval=store.base_interval if store else None)
+    trades = load_trades(args.path)
+    started = time.perf_counter()
+    replayed = await replay_trades(aggregator, trades, speed=args.speed)
+    elapsed = time.perf_counter() - started
+    print(f"체결 {replayed}건 재생: {elapsed:.2f}초 ({replayed / max(elapsed, 1e-9):,.0f}건/초)")
+    print(f"통계: {aggregator.stats}")
+    for market in aggregator.markets:
+        for interval in aggregator.intervals:
+            bars = aggregator.bars(market, interval)
+            current = aggregator.current(market, interval)
+            last = bars.iloc[-1] if len(bars) else None
+            print(f"{market} {interval}: 마감 {len(bars)}개"
+                  + (f", 마지막 {bars.index[-1]:%Y-%m-%d %H:%M} 종가 {last['Close']:,.0f}" if last is not None else '')
+                  + (f", 진행 중 {current.date:%H:%M} 체결 {current.trades}건" if current is not None else ''))
+    if store is not None:
+        print(f"캔들 저장소에 {store_candles(store, aggregator.take_pending())}개 기록: {args.store}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='체결 → 캔들 집계기 (녹화 / 재생)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='거래소(BITHUMB_API_BASE) 체결을 파일로 녹화')
+    record.add_argument('--markets', default='KRW-BTC', help='마켓 목록 (쉼표 구분)')
+    record.add_argument('--seconds', type=float, default=600, help='녹화 시간')
+    record.add_argument('--poll-seconds', type=float, default=1.0, help='조회 간격')
+    record.add_argument('--count', type=int, default=200, help='한 번에 조회할 체결 수')
+    record.add_argument('--capacity', type=int, default=1440)
+    record.add_argument('--output', default='data/trades.jsonl')
+
+    replay = commands.add_parser('replay', help='녹화한 체결을 배속 재생해 봉 집계')
+    replay.add_argument('path', help='녹화 파일 (JSON lines)')
+    replay.add_argument('--speed', type=float, default=0.0, help='재생 배속 (0 이면 최대 속도)')
+    replay.add_argument('--intervals', default='1m,5m,15m,1h')
+    replay.add_argument('--capacity', type=int, default=1440)
+    replay.add_argument('--store', default=None, help='마감된 1분봉을 기록할 CandleStore 디렉토리')
+    args = parser.parse_args()
+
+    asyncio.run(_record(args) if args.command == 'record' else _replay(args))
+
+
+if __name__ == '__main__':
+    main()
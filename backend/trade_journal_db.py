@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import List, Optional, Dict
 import uuid
 
+from telemetry import DB_SECONDS, timed
+
 # 데이터베이스 파일 경로
 DB_FILE = 'trade_journal.db'
 
@@ -44,6 +46,7 @@ def init_db():
     conn.commit()
     conn.close()
 
+@timed(DB_SECONDS, operation='create_trade')
 def create_trade(data: Dict) -> Dict:
     """트레이드 생성"""
     conn = get_connection()
@@ -72,6 +75,7 @@ def create_trade(data: Dict) -> Dict:
 
     return get_trade_by_id(trade_id)
 
+@timed(DB_SECONDS, operation='get_all_trades')
 def get_all_trades(filters: Optional[Dict] = None) -> List[Dict]:
     """모든 트레이드 조회 (필터링 옵션 포함)"""
     conn = get_connection()
@@ -105,6 +109,7 @@ def get_all_trades(filters: Optional[Dict] = None) -> List[Dict]:
 
     return [dict(row) for row in rows]
 
+@timed(DB_SECONDS, operation='get_trade_by_id')
 def get_trade_by_id(trade_id: str) -> Optional[Dict]:
     """ID로 트레이드 조회"""
     conn = get_connection()
@@ -116,6 +121,7 @@ def get_trade_by_id(trade_id: str) -> Optional[Dict]:
 
     return dict(row) if row else None
 
+@timed(DB_SECONDS, operation='update_trade')
 def update_trade(trade_id: str, data: Dict) -> Optional[Dict]:
     """트레이드 수정"""
     existing = get_trade_by_id(trade_id)
@@ -165,6 +171,7 @@ def update_trade(trade_id: str, data: Dict) -> Optional[Dict]:
 
     return get_trade_by_id(trade_id)
 
+@timed(DB_SECONDS, operation='delete_trade')
 def delete_trade(trade_id: str) -> bool:
     """트레이드 삭제"""
     conn = get_connection()
@@ -178,6 +185,7 @@ def delete_trade(trade_id: str) -> bool:
 
     return deleted
 
+@timed(DB_SECONDS, operation='get_statistics')
 def get_statistics() -> Dict:
     """통계 계산"""
     conn = get_connection()
@@ -212,6 +220,7 @@ def get_statistics() -> Dict:
         'average_total_return': round(avg_total_return, 2),
     }
 
+@timed(DB_SECONDS, operation='clear_all_trades')
 def clear_all_trades() -> bool:
     """모든 트레이드 삭제 (개발용)"""
     conn = get_connection()
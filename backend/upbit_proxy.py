@@ -6,14 +6,15 @@ import os
 import jwt
 import uuid
 import hashlib
-import requests
 from urllib.parse import urlencode, unquote
 from typing import Optional, Dict, Any
 
+from http_scheduler import scheduler
+
 # 환경변수에서 API 키 로드
 ACCESS_KEY = os.getenv('UPBIT_ACCESS_KEY')
 SECRET_KEY = os.getenv('UPBIT_SECRET_KEY')
-UPBIT_API_BASE = 'https://api.upbit.com'
+UPBIT_API_BASE = os.getenv('UPBIT_API_BASE', 'https://api.upbit.com')
 
 
 def generate_jwt_token(query_params: Optional[Dict[str, Any]] = None) -> str:
@@ -62,20 +63,17 @@ def call_upbit_api(endpoint: str, method: str = 'GET', params: Optional[Dict] =
     """
     url = f"{UPBIT_API_BASE}{endpoint}"
 
-    # JWT 토큰 생성
-    token = generate_jwt_token(params if method == 'GET' else None)
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Accept': 'application/json',
-    }
+    headers = {'Accept': 'application/json'}
+
+    def auth_headers() -> Dict[str, str]:
+        """JWT 인증 헤더 (업비트는 같은 nonce 를 거부하므로 재시도마다 새로 서명)"""
+        return {'Authorization': f"Bearer {generate_jwt_token(params if method == 'GET' else None)}"}
 
-    # API 호출
-    if method == 'GET':
-        response = requests.get(url, headers=headers, params=params)
+    # API 호출 (공용 스케줄러로 호스트 한도 / 재시도 적용)
+    if method in ('GET', 'DELETE'):
+        response = scheduler.request(method, url, headers=headers, headers_factory=auth_headers, params=params)
     elif method == 'POST':
-        response = requests.post(url, headers=headers, json=params)
-    elif method == 'DELETE':
-        response = requests.delete(url, headers=headers, params=params)
+        response = scheduler.post(url, headers=headers, headers_factory=auth_headers, json=params)
     else:
         raise ValueError(f'Unsupported HTTP method: {method}')
 
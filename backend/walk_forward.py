@@ -0,0 +1,202 @@
+"""
+Walk-forward 최적화
+학습 구간에서 매매 파라미터를 최적화하고 바로 다음 검증 구간에서 표본 외 성과를 측정하는 모듈
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import product
+from typing import Optional, Dict, List, Any
+
+import pandas as pd
+
+from crypto_simulator import find_optimal_buy_sell_signals, CryptoBacktester
+
+# 기본 파라미터 탐색 범위 (find_optimal_buy_sell_signals 의 인자)
+DEFAULT_PARAM_GRID = {
+    'rsi_oversold': [20, 25, 30, 35],
+    'rsi_overbought': [65, 70, 75, 80],
+}
+PARAM_NAMES = frozenset(DEFAULT_PARAM_GRID)
+
+# 요청마다 프로세스를 새로 띄우지 않도록 CPU 코어 수만큼의 프로세스 풀을 재사용
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """공유 프로세스 풀 (처음 사용할 때 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _executor
+
+
+def shutdown_executor():
+    """공유 프로세스 풀 종료 (서버 종료 시 호출, 다음 사용 때 다시 생성)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def expand_param_grid(param_grid: Optional[Dict[str, List[Any]]]) -> List[Dict[str, Any]]:
+    """파라미터 탐색 범위 검증 후 모든 조합 목록 생성 (지원하지 않는 이름 / 빈 후보 목록이면 ValueError)"""
+    grid = param_grid or DEFAULT_PARAM_GRID
+    unknown = sorted(set(grid) - PARAM_NAMES)
+    if unknown:
+        raise ValueError(f"Unsupported param_grid keys: {', '.join(unknown)} "
+                         f"(available: {', '.join(sorted(PARAM_NAMES))})")
+    empty = sorted(name for name, values in grid.items() if not values)
+    if empty:
+        raise ValueError(f"param_grid values must not be empty: {', '.join(empty)}")
+    return [dict(zip(grid.keys(), values)) for values in product(*grid.values())]
+
+
+def generate_folds(n: int, train_size: int, test_size: int, mode: str = 'rolling') -> List[Dict[str, int]]:
+    """
+    학습/검증 구간 인덱스 생성
+
+    Args:
+        n: 전체 봉 개수
+        train_size: 학습 구간 길이 (봉)
+        test_size: 검증 구간 길이 (봉), 다음 fold 로 이동하는 간격이기도 함
+        mode: 'rolling' (학습 구간이 함께 이동) 또는 'anchored' (학습 시작점 고정)
+
+    Returns:
+        fold 별 {'train_start', 'train_end', 'test_start', 'test_end'} 목록 (end 는 미포함)
+    """
+    if mode not in ('rolling', 'anchored'):
+        raise ValueError(f'Unsupported walk-forward mode: {mode}')
+    if train_size < 1 or test_size < 1:
+        raise ValueError('train_size and test_size must be positive')
+
+    folds = []
+    train_end = train_size
+    while train_end + test_size <= n:
+        folds.append({
+            'train_start': 0 if mode == 'anchored' else train_end - train_size,
+            'train_end': train_end,
+            'test_start': train_end,
+            'test_end': train_end + test_size,
+        })
+        train_end += test_size
+    return folds
+
+
+def _window_signals(data: pd.DataFrame, start: int, end: int, params: Dict[str, Any]) -> pd.DataFrame:
+    """지표가 계산된 전체 데이터에서 [start, end) 구간의 매매 신호 계산 (교차 판정용 직전 1봉 포함)"""
+    lookback = max(start - 1, 0)
+    signals = find_optimal_buy_sell_signals(data.iloc[lookback:end], **params)
+    return signals.iloc[start - lookback:]
+
+
+def _total_return(data: pd.DataFrame, initial_capital: float) -> float:
+    """해당 구간 백테스트의 총 수익률(%)"""
+    backtester = CryptoBacktester(initial_capital=initial_capital)
+    backtester.run_backtest(data)
+    if not backtester.trades:
+        return 0.0
+    final_value = backtester.trades[-1]['Total_Value']
+    return (final_value - initial_capital) / initial_capital * 100
+
+
+def _run_folds(windows: List[pd.DataFrame], folds: List[Dict[str, int]], param_sets: List[Dict[str, Any]],
+               initial_capital: float) -> List[Dict[str, Any]]:
+    """작업 프로세스 한 번에 여러 fold 를 순서대로 실행"""
+    return [_run_fold(window, fold, param_sets, initial_capital) for window, fold in zip(windows, folds)]
+
+
+def _run_fold(data: pd.DataFrame, fold: Dict[str, int], param_sets: List[Dict[str, Any]],
+              initial_capital: float) -> Dict[str, Any]:
+    """한 fold 실행: 학습 구간에서 최적 파라미터 탐색 후 검증 구간 평가"""
+    best_params, best_return = None, None
+    for params in param_sets:
+        train = _window_signals(data, fold['train_start'], fold['train_end'], params)
+        train_return = _total_return(train, initial_capital)
+        if best_return is None or train_return > best_return:
+            best_params, best_return = params, train_return
+
+    test = _window_signals(data, fold['test_start'], fold['test_end'], best_params)
+    return {
+        'train_period': {'start': data.index[fold['train_start']], 'end': data.index[fold['train_end'] - 1]},
+        'test_period': {'start': data.index[fold['test_start']], 'end': data.index[fold['test_end'] - 1]},
+        'best_params': best_params,
+        'train_return': best_return,
+        'test_return': _total_return(test, initial_capital),
+    }
+
+
+def run_walk_forward(data: pd.DataFrame, train_size: int, test_size: int, mode: str = 'rolling',
+                     param_grid: Optional[Dict[str, List[Any]]] = None, initial_capital: float = 10000000,
+                     max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Walk-forward 최적화 실행
+
+    Args:
+        data: add_technical_indicators 가 적용된 전체 데이터 (지표는 한 번만 계산하고 fold 별로 슬라이스)
+        train_size: 학습 구간 길이 (봉)
+        test_size: 검증 구간 길이 (봉)
+        mode: 'rolling' 또는 'anchored'
+        param_grid: 파라미터 이름 -> 후보 값 목록 (기본 DEFAULT_PARAM_GRID, 이름은 PARAM_NAMES 중에서)
+        initial_capital: fold 별 초기 자본금
+        max_workers: 병렬 프로세스 수 (기본 / 최대 CPU 코어 수, 1이면 현재 프로세스에서 순차 실행)
+
+    Returns:
+        fold 별 결과와 표본 외 종합 성과
+    """
+    folds = generate_folds(len(data), train_size, test_size, mode)
+    if not folds:
+        raise ValueError('Not enough data for a single train/test fold')
+
+    param_sets = expand_param_grid(param_grid)
+    if max_workers is not None and max_workers < 1:
+        raise ValueError('max_workers must be positive')
+
+    cpu_count = os.cpu_count() or 1
+    workers = min(max_workers or cpu_count, cpu_count, len(folds))
+    if workers == 1:
+        results = [_run_fold(data, fold, param_sets, initial_capital) for fold in folds]
+    else:
+        # fold 마다 필요한 구간만 잘라서 전달 (프로세스 간 직렬화 비용 최소화)
+        # 첫 봉의 교차 판정에 직전 1봉이 필요하므로 학습 시작 1봉 전부터 자름 (순차 실행과 같은 신호)
+        offsets = [max(fold['train_start'] - 1, 0) for fold in folds]
+        windows = [data.iloc[offset:fold['test_end']] for offset, fold in zip(offsets, folds)]
+        local_folds = [{key: value - offset for key, value in fold.items()} for offset, fold in zip(offsets, folds)]
+        # 공유 풀에서 요청당 workers 개 작업만 동시에 실행 (fold 길이가 다른 anchored 모드도 고르게 나눔)
+        futures = [
+            _get_executor().submit(_run_folds, windows[index::workers], local_folds[index::workers],
+                                   param_sets, initial_capital)
+            for index in range(workers)
+        ]
+        results = [None] * len(folds)
+        try:
+            for index, future in enumerate(futures):
+                results[index::workers] = future.result()
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽으면 풀을 버리고 다음 요청에서 새로 생성
+            shutdown_executor()
+            raise
+
+    # 검증 구간을 이어 붙인 복리 수익률
+    compounded = 1.0
+    for result in results:
+        compounded *= 1 + result['test_return'] / 100
+    mean_train = sum(r['train_return'] for r in results) / len(results)
+    mean_test = sum(r['test_return'] for r in results) / len(results)
+
+    return {
+        'mode': mode,
+        'num_folds': len(results),
+        'folds': results,
+        'summary': {
+            'oos_total_return': (compounded - 1) * 100,
+            'mean_train_return': mean_train,
+            'mean_test_return': mean_test,
+            # 학습 대비 검증 성과 비율 (과최적화 지표)
+            'walk_forward_efficiency': (mean_test / mean_train * 100) if mean_train > 0 else 0,
+        }
+    }